@@ -0,0 +1,92 @@
+# dash_serving/data_refresh.py
+#
+# Keeps the served dataset of a Dash app as one immutable (context, version)
+# snapshot and replaces it from a background thread when the CSVs in its data/
+# folder change, so new data_gen.py output or upstream exports show up without
+# a restart. Each app's scripts/data_refresh.py is a symlink to this file.
+#
+# Requests only read the current snapshot reference: they never stat files,
+# wait for a reload or see a half-loaded dataset. The refresher polls the data
+# version (file sizes and mtimes), waits until it has been stable for one poll
+# so files still being written are not read, then loads and prepares (e.g.
+# pre-renders figures for) the new context entirely off the request path. A
+# version that changed again during the load is discarded and retried. The
+# swap is a single reference assignment, after which on_swap invalidates
+# whatever was cached for the old version.
+#
+# start() runs the polls on a thread, for the single-process development server.
+# Under serve.py --workers the parent calls refresh() itself and re-forks the
+# workers after a swap, so the new dataset is loaded once, not once per worker.
+
+import time
+import logging
+from threading import Thread, Lock
+
+REFRESH_INTERVAL = 2.0
+
+
+class SnapshotStore:
+    def __init__(self, load, version, interval=REFRESH_INTERVAL, prepare=None, on_swap=None):
+        # load() -> context, version() -> data version; prepare(context, version) runs before a swap
+        self.load = load
+        self.version = version
+        self.interval = interval
+        self.prepare = prepare
+        self.on_swap = on_swap
+        self.pending = None
+        self.lock = Lock()
+        self.thread = None
+        initial = self.version()
+        self.snapshot = (self.load(), initial)
+
+    def current(self):
+        return self.snapshot
+
+    def refresh(self):
+        # One poll; True if a new snapshot was swapped in
+        with self.lock:
+            version = self.version()
+            if version == self.snapshot[1]:
+                self.pending = None
+                return False
+            if version != self.pending:
+                # Changed since the last poll: writers may still be busy, look again next time
+                self.pending = version
+                return False
+
+            start = time.perf_counter()
+            context = self.load()
+            if self.version() != version:
+                return False
+            if self.prepare is not None:
+                self.prepare(context, version)
+            old_version = self.snapshot[1]
+            self.snapshot = (context, version)
+            self.pending = None
+            if self.on_swap is not None:
+                self.on_swap(old_version, version)
+            logging.info(f"Swapped in data version {version} ({time.perf_counter() - start:.2f}s to load)")
+            return True
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.refresh()
+            except Exception:
+                # Keep serving the current snapshot; the next poll tries again
+                logging.exception("Data refresh failed")
+
+    def start(self):
+        # Single-process serving only; serve() polls refresh() in the parent instead
+        if self.interval > 0 and (self.thread is None or not self.thread.is_alive()):
+            self.thread = Thread(target=self.run, name="data-refresh", daemon=True)
+            self.thread.start()
+        return self
+
+
+def purge_version(cache, lock, version):
+    # Drop cache entries whose key contains the given data version
+    with lock:
+        for key in [key for key in cache if version in key]:
+            cache.pop(key, None)
@@ -0,0 +1,164 @@
+# dash_serving/load_test.py
+#
+# Local load test for the production serving mode: starts a dashboard's
+# dash_viz.py (scripts/dash_viz.py of the current folder by default) with
+# each --workers count in turn, waits for it to answer, and replays the page's
+# requests (the layout plus every Dash callback with its initial input values,
+# discovered from /_dash-dependencies) from several client processes over
+# keep-alive connections. Prints throughput and latency per worker count, so
+# scaling with workers shows directly (up to the machine's core count).
+#
+# Usage (from a dashboard folder):
+#   python ../dash_serving/load_test.py --workers 1 2 4 --clients 8 --requests 4000
+
+import os
+import sys
+import gzip
+import json
+import time
+import signal
+import argparse
+import subprocess
+import http.client
+from multiprocessing import Pool
+
+import numpy as np
+
+STARTUP_TIMEOUT = 300
+
+
+def fetch(conn, method, path, body=None):
+    headers = {"Accept-Encoding": "gzip"}
+    if body is not None:
+        headers["Content-Type"] = "application/json"
+    conn.request(method, path, body=body, headers=headers)
+    response = conn.getresponse()
+    data = response.read()
+    if response.status != 200:
+        raise RuntimeError(f"{method} {path} returned {response.status}")
+    return gzip.decompress(data) if response.getheader("Content-Encoding") == "gzip" else data
+
+
+def layout_props(node, props=None):
+    # Component id -> props of every component in the layout JSON
+    props = {} if props is None else props
+    if isinstance(node, list):
+        for child in node:
+            layout_props(child, props)
+    elif isinstance(node, dict):
+        if "props" in node:
+            if isinstance(node["props"].get("id"), str):
+                props[node["props"]["id"]] = node["props"]
+            layout_props(node["props"].get("children"), props)
+    return props
+
+
+def split_outputs(output):
+    # "chart.figure" or "..a.children...b.figure.." -> output spec(s) as the renderer sends them
+    def spec(item):
+        component, prop = item.rsplit(".", 1)
+        return {"id": component, "property": prop}
+    if output.startswith(".."):
+        return [spec(item) for item in output[2:-2].split("...")]
+    return spec(output)
+
+
+def callback_requests(host, port):
+    # (method, path, body) for the layout and every server-side callback
+    conn = http.client.HTTPConnection(host, port)
+    layout = json.loads(fetch(conn, "GET", "/_dash-layout"))
+    dependencies = json.loads(fetch(conn, "GET", "/_dash-dependencies"))
+    conn.close()
+
+    props = layout_props(layout)
+    requests = [("GET", "/_dash-layout", None)]
+    for dep in dependencies:
+        ids = [item["id"] for item in dep["inputs"] + dep.get("state", [])]
+        if dep.get("clientside_function") or not all(isinstance(i, str) and i in props for i in ids):
+            continue
+
+        def values(items):
+            return [{"id": item["id"], "property": item["property"],
+                     "value": props[item["id"]].get(item["property"])} for item in items]
+        body = {
+            "output": dep["output"],
+            "outputs": split_outputs(dep["output"]),
+            "inputs": values(dep["inputs"]),
+            "state": values(dep.get("state", [])),
+            "changedPropIds": [f"{item['id']}.{item['property']}" for item in dep["inputs"]],
+        }
+        requests.append(("POST", "/_dash-update-component", json.dumps(body)))
+    return requests
+
+
+def run_client(job):
+    host, port, requests, n_requests, start_at = job
+    time.sleep(max(0.0, start_at - time.time()))
+    conn = http.client.HTTPConnection(host, port)
+    latencies = []
+    for i in range(n_requests):
+        method, path, body = requests[i % len(requests)]
+        start = time.perf_counter()
+        fetch(conn, method, path, body)
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+    return latencies
+
+
+def wait_until_ready(host, port, process, timeout=STARTUP_TIMEOUT):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("dash_viz.py exited during startup")
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=5)
+            fetch(conn, "GET", "/")
+            conn.close()
+            return
+        except (OSError, RuntimeError):
+            time.sleep(0.5)
+    raise RuntimeError(f"dash_viz.py did not answer within {timeout}s")
+
+
+def load_test(workers, args, extra):
+    process = subprocess.Popen(
+        [sys.executable, args.script, "--workers", str(workers), "--host", args.host, "--port", str(args.port), *extra],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(args.host, args.port, process)
+        requests = callback_requests(args.host, args.port)
+        # One warm-up pass so every worker has served each request once
+        run_client((args.host, args.port, requests, len(requests) * workers, 0))
+
+        per_client = args.requests // args.clients
+        start_at = time.time() + 1
+        with Pool(args.clients) as pool:
+            results = pool.map(run_client, [(args.host, args.port, requests, per_client, start_at)] * args.clients)
+        elapsed = time.time() - start_at
+        latencies = np.concatenate(results) * 1000
+        return len(latencies) / elapsed, *np.percentile(latencies, [50, 99])
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput of dash_viz.py --workers N for several N",
+                                     epilog="Arguments after -- are passed on to dash_viz.py")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent client processes")
+    parser.add_argument("--requests", type=int, default=4000, help="Requests per run, over all clients")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8060)
+    parser.add_argument("--script", default=os.path.join("scripts", "dash_viz.py"),
+                        help="Dash app to start (default: scripts/dash_viz.py of the current folder)")
+    args, extra = parser.parse_known_args()
+    extra = [a for a in extra if a != "--"]
+
+    print(f"{'workers':>8} {'req/s':>10} {'p50 ms':>10} {'p99 ms':>10}")
+    baseline = None
+    for workers in args.workers:
+        throughput, p50, p99 = load_test(workers, args, extra)
+        baseline = baseline or throughput
+        print(f"{workers:>8} {throughput:>10.1f} {p50:>10.2f} {p99:>10.2f}   x{throughput / baseline:.2f}")
+    print(f"({os.cpu_count()} CPU cores available)")
@@ -0,0 +1,208 @@
+# dash_serving/serve.py
+#
+# Production launch mode for the Dash apps (gender-pay-gap-dashboard and
+# saas-growth-retention-dashboard, dash_viz.py --workers N) without Flask's
+# single-threaded debug server. Each app's scripts/serve.py is a symlink to
+# this file, so both import the same module with a plain `from serve import`.
+#
+# The app is created in the parent, so datasets are loaded and figure caches
+# warmed once, then the parent opens the listening socket and forks N workers
+# that all accept on it. The loaded frames are shared copy-on-write; gc.freeze()
+# keeps the collector from touching (and so copying) those pages in workers.
+# Each worker runs a threaded werkzeug server behind ResponseMiddleware, which
+# gzips compressible responses for clients that accept it and gives versioned
+# static assets (Dash component suites, /assets/?m=...) a one-year public
+# cache lifetime; streamed responses pass through untouched. The parent
+# restarts workers that die and stops them all on SIGINT/SIGTERM.
+#
+# Data refreshes run in the parent only. A refresher in every worker would load
+# each new dataset N times, once per process, since copy-on-write sharing ends
+# at fork. Instead the parent polls `refresh` every `refresh_interval` seconds.
+# When it swaps in a new snapshot, the parent forks a fresh set of workers that
+# share it and retires the old ones. Those stop accepting and finish the
+# requests they are serving (up to DRAIN_TIMEOUT) before exiting. So a refresh
+# costs one copy of the dataset, plus the old one until the old workers are gone.
+
+import os
+import gc
+import gzip
+import time
+import signal
+import socket
+import logging
+from threading import Lock, Thread
+
+from cachetools import LRUCache
+from werkzeug.serving import make_server
+from werkzeug.wrappers import Request, Response
+
+COMPRESS_MIN_SIZE = 500
+COMPRESS_LEVEL = 6
+COMPRESS_TYPES = ("text/", "application/json", "application/javascript", "image/svg+xml")
+STATIC_PREFIXES = ("/_dash-component-suites/", "/assets/")
+STATIC_MAX_AGE = 365 * 24 * 3600
+# Compressed static bodies kept per worker, as they never change for a URL
+STATIC_CACHE_SIZE = 64
+# Seconds a retired worker gets to finish its in-flight requests
+DRAIN_TIMEOUT = 10.0
+
+
+class ResponseMiddleware:
+    def __init__(self, app, level=COMPRESS_LEVEL):
+        self.app = app
+        self.level = level
+        self.static_cache = LRUCache(maxsize=STATIC_CACHE_SIZE)
+        self.lock = Lock()
+        # Requests being handled, so a retired worker knows when it has drained
+        self.in_flight = 0
+
+    def versioned_static(self, request, response):
+        # Fingerprinted suites already carry a max-age; assets are versioned by query string
+        return (request.path.startswith(STATIC_PREFIXES) and response.status_code == 200
+                and (response.cache_control.max_age is not None or bool(request.query_string)))
+
+    def compressible(self, request, response):
+        # Only buffered bodies carry a Content-Length; streams (e.g. event streams) have none
+        return ("gzip" in request.headers.get("Accept-Encoding", "")
+                and response.status_code == 200
+                and "Content-Encoding" not in response.headers
+                and (response.mimetype or "").startswith(COMPRESS_TYPES)
+                and (response.content_length or 0) >= COMPRESS_MIN_SIZE)
+
+    def __call__(self, environ, start_response):
+        with self.lock:
+            self.in_flight += 1
+        try:
+            return self.handle(environ, start_response)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def handle(self, environ, start_response):
+        request = Request(environ)
+        response = Response.from_app(self.app, environ)
+        static = self.versioned_static(request, response)
+        if static:
+            response.cache_control.public = True
+            response.cache_control.max_age = STATIC_MAX_AGE
+            response.cache_control.immutable = True
+        if self.compressible(request, response):
+            if static:
+                with self.lock:
+                    body = self.static_cache.get(request.full_path)
+                if body is None:
+                    body = gzip.compress(response.get_data(), compresslevel=self.level)
+                    with self.lock:
+                        self.static_cache[request.full_path] = body
+            else:
+                body = gzip.compress(response.get_data(), compresslevel=self.level)
+            response.set_data(body)
+            response.headers["Content-Encoding"] = "gzip"
+            response.vary.add("Accept-Encoding")
+        return response(environ, start_response)
+
+
+def run_worker(wsgi_app, host, port, sock):
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    server = make_server(host, port, wsgi_app, threaded=True, fd=sock.fileno())
+
+    def retire(signum, frame):
+        # shutdown() waits for serve_forever() to return, so it cannot run on this thread
+        Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, retire)
+    server.serve_forever()
+    # No longer accepting; let the request threads finish their responses
+    deadline = time.monotonic() + DRAIN_TIMEOUT
+    while wsgi_app.in_flight and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+def share_loaded():
+    # Everything loaded so far is shared copy-on-write with workers forked from here on
+    gc.unfreeze()
+    gc.collect()
+    gc.freeze()
+
+
+def serve(app, host="127.0.0.1", port=8050, workers=2, on_worker_start=None, refresh=None, refresh_interval=0):
+    # Fork `workers` processes serving the already-loaded Dash app on one socket;
+    # on_worker_start runs in each worker, e.g. to start its background threads.
+    # refresh() is polled in the parent and returns True when it swapped in new data
+    wsgi_app = ResponseMiddleware(app.server)
+    sock = socket.create_server((host, port), backlog=1024)
+    sock.set_inheritable(True)
+    logging.info(f"Serving on http://{host}:{port} with {workers} workers")
+    share_loaded()
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            try:
+                if on_worker_start is not None:
+                    on_worker_start()
+                run_worker(wsgi_app, host, port, sock)
+            finally:
+                os._exit(0)
+        return pid
+
+    def retire(pids):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    children = {spawn() for _ in range(workers)}
+    # Workers serving an older snapshot, draining before they exit
+    retired = set()
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        retire(children)
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    poll = min(refresh_interval, 0.5) if refresh is not None and refresh_interval > 0 else None
+    next_refresh = time.monotonic() + refresh_interval
+    while children or retired:
+        if poll is None:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+        else:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                if not stopping and time.monotonic() >= next_refresh:
+                    next_refresh = time.monotonic() + refresh_interval
+                    try:
+                        swapped = refresh()
+                    except Exception:
+                        # Keep the current workers and data; the next poll tries again
+                        logging.exception("Data refresh failed")
+                        swapped = False
+                    if swapped:
+                        share_loaded()
+                        old = children
+                        children = {spawn() for _ in range(workers)}
+                        retired |= old
+                        retire(old)
+                        logging.info(f"Started {workers} workers on the new data, retiring {len(old)}")
+                time.sleep(poll)
+                continue
+        if pid in retired:
+            retired.discard(pid)
+            continue
+        children.discard(pid)
+        if not stopping:
+            logging.warning(f"Worker {pid} exited ({status}), starting a new one")
+            children.add(spawn())
+    sock.close()
@@ -0,0 +1,297 @@
+# scripts/comparison_table.py
+#
+# Paged, sortable company x year comparison table.
+#
+# The table is shipped as one compact columnar JSON payload instead of an HTML
+# row per company-year: company names are dictionary-encoded, and every column
+# carries a precomputed sort permutation (ascending, missing values last), so
+# sorting by a gap column and reading "the top 50 widest gaps" only touches the
+# rows on the requested page. The page script renders one page at a time;
+# dash_viz.py answers the same queries server-side at /api/comparison.
+
+import html
+import json
+import numpy as np
+import pandas as pd
+
+PAGE_SIZE = 25
+
+
+class ComparisonIndex:
+    def __init__(self, df_comp):
+        self.df = df_comp.reset_index(drop=True)
+        self.columns = list(self.df.columns)
+        self.percent_columns = [col for col in self.columns if "%" in col]
+        self.order, self.valid = {}, {}
+        for col in self.columns:
+            values = self.df[col]
+            # Stable ascending order with missing values last; descending reverses only the valid part.
+            # Text columns may be object or pandas' str dtype, so test for numbers rather than for object
+            order = np.argsort(values.to_numpy(), kind="stable") if pd.api.types.is_numeric_dtype(values) else \
+                np.argsort(values.fillna("").to_numpy(dtype=str), kind="stable")
+            missing = values.isna().to_numpy()[order]
+            self.order[col] = np.concatenate([order[~missing], order[missing]])
+            self.valid[col] = int((~missing).sum())
+
+    def __len__(self):
+        return len(self.df)
+
+    def sorted_rows(self, sort=None, descending=True):
+        if sort is None:
+            return np.arange(len(self.df))
+        order, valid = self.order[sort], self.valid[sort]
+        if not descending:
+            return order
+        return np.concatenate([order[:valid][::-1], order[valid:]])
+
+    def query(self, sort=None, descending=True, offset=0, limit=PAGE_SIZE, search=""):
+        # One page of rows, e.g. query("Mean Hourly Gap (%)", limit=50) for the 50 widest mean hourly gaps
+        rows = self.sorted_rows(sort, descending)
+        if search:
+            hit = self.df["Company"].fillna("").str.lower().str.contains(search.lower(), regex=False).to_numpy()
+            rows = rows[hit[rows]]
+        page = rows[offset:offset + limit]
+        records = self.df.iloc[page].astype(object).where(self.df.iloc[page].notna(), None)
+        return {"total": len(rows), "offset": offset, "rows": records.to_dict("records")}
+
+    def payload(self):
+        # Columnar JSON for the page script: values per column, company names as codes.
+        # A missing name is encoded as "" so it renders as an empty cell, not "nan"
+        companies, codes = np.unique(self.df["Company"].fillna("").to_numpy(dtype=str), return_inverse=True)
+        values = {}
+        for col in self.columns:
+            if col == "Company":
+                values[col] = codes.tolist()
+            else:
+                column = self.df[col]
+                values[col] = column.astype(object).where(column.notna(), None).tolist()
+        return {
+            "columns": self.columns,
+            "percent": self.percent_columns,
+            "companies": companies.tolist(),
+            "values": values,
+            "order": {col: order.tolist() for col, order in self.order.items()},
+            "valid": self.valid,
+        }
+
+
+comparison_js = """
+(function() {
+    const table = JSON.parse(document.getElementById("comparison-data").textContent);
+    const body = document.querySelector("#comparison-table tbody");
+    const search = document.getElementById("comparisonSearch");
+    const info = document.getElementById("comparisonInfo");
+    const pageSize = Number(document.getElementById("comparison-table").dataset.pageSize);
+    const n = table.values[table.columns[0]].length;
+    let sortCol = null, descending = true, page = 0, view = null;
+
+    function escapeHtml(text) {
+        const div = document.createElement("div");
+        div.textContent = text;
+        return div.innerHTML;
+    }
+
+    function rowAt(i) {
+        if (sortCol === null) return i;
+        const order = table.order[sortCol], valid = table.valid[sortCol];
+        return descending && i < valid ? order[valid - 1 - i] : order[i];
+    }
+
+    // Rows in display order; without a search this reads only the rows of the current page
+    function currentView() {
+        if (view) return view;
+        const q = search.value.trim().toLowerCase();
+        if (!q) {
+            view = {count: n, at: rowAt};
+        } else {
+            const hit = table.companies.map(function(name) { return name.toLowerCase().includes(q); });
+            const codes = table.values.Company, rows = [];
+            for (let i = 0; i < n; i++) {
+                const r = rowAt(i);
+                if (hit[codes[r]]) rows.push(r);
+            }
+            view = {count: rows.length, at: function(i) { return rows[i]; }};
+        }
+        return view;
+    }
+
+    function cell(col, r) {
+        const value = table.values[col][r];
+        if (col === "Company") return escapeHtml(table.companies[value]);
+        if (value === null) return "";
+        return table.percent.includes(col) ? `${value.toFixed(1)}%` : escapeHtml(String(value));
+    }
+
+    function render() {
+        const v = currentView();
+        const pages = Math.max(1, Math.ceil(v.count / pageSize));
+        page = Math.min(page, pages - 1);
+        const start = page * pageSize, end = Math.min(start + pageSize, v.count);
+        let html = "";
+        for (let i = start; i < end; i++) {
+            const r = v.at(i);
+            html += "<tr>" + table.columns.map(function(col) { return `<td>${cell(col, r)}</td>`; }).join("") + "</tr>";
+        }
+        body.innerHTML = html;
+        info.textContent = v.count ? `Rows ${start + 1}–${end} of ${v.count}` : "No matching rows";
+        document.querySelectorAll("#comparison-table th").forEach(function(th) {
+            th.dataset.sort = th.dataset.column === sortCol ? (descending ? "desc" : "asc") : "";
+        });
+    }
+
+    // Exports cover every row of the current search and sort, like the DataTables buttons did
+    function exportRows() {
+        const v = currentView(), rows = [];
+        for (let i = 0; i < v.count; i++) {
+            const r = v.at(i);
+            rows.push(table.columns.map(function(col) {
+                const value = table.values[col][r];
+                return col === "Company" ? table.companies[value] : value;
+            }));
+        }
+        return rows;
+    }
+
+    function download(content, type, name) {
+        const link = document.createElement("a");
+        link.href = URL.createObjectURL(new Blob([content], {type: type}));
+        link.download = name;
+        link.click();
+        URL.revokeObjectURL(link.href);
+    }
+
+    function downloadCsv() {
+        const quote = function(text) { return /[",\\n]/.test(text) ? `"${text.replace(/"/g, '""')}"` : text; };
+        const lines = [table.columns.map(quote).join(",")].concat(exportRows().map(function(row) {
+            return row.map(function(value) { return value === null ? "" : quote(String(value)); }).join(",");
+        }));
+        download(lines.join("\\n"), "text/csv", "pay_gap_comparison.csv");
+    }
+
+    // SpreadsheetML opens in Excel with numeric cells kept numeric, without a zip library
+    function downloadExcel() {
+        const xmlCell = function(value) {
+            if (value === null) return "<Cell/>";
+            const type = typeof value === "number" ? "Number" : "String";
+            return `<Cell><Data ss:Type="${type}">${escapeHtml(String(value))}</Data></Cell>`;
+        };
+        const xmlRow = function(row) { return "<Row>" + row.map(xmlCell).join("") + "</Row>"; };
+        const xml = '<?xml version="1.0"?>' +
+            '<Workbook xmlns="urn:schemas-microsoft-com:office:spreadsheet" ' +
+            'xmlns:ss="urn:schemas-microsoft-com:office:spreadsheet">' +
+            '<Worksheet ss:Name="Comparison"><Table>' +
+            xmlRow(table.columns) + exportRows().map(xmlRow).join("") +
+            "</Table></Worksheet></Workbook>";
+        download(xml, "application/vnd.ms-excel", "pay_gap_comparison.xls");
+    }
+
+    function copyRows() {
+        const text = [table.columns.join("\\t")].concat(exportRows().map(function(row) {
+            return row.map(function(value) { return value === null ? "" : String(value); }).join("\\t");
+        })).join("\\n");
+        const done = function() { info.textContent = `Copied ${text.split("\\n").length - 1} rows`; };
+        if (navigator.clipboard) {
+            navigator.clipboard.writeText(text).then(done);
+            return;
+        }
+        const area = document.createElement("textarea");
+        area.value = text;
+        document.body.appendChild(area);
+        area.select();
+        document.execCommand("copy");
+        document.body.removeChild(area);
+        done();
+    }
+
+    function printRows() {
+        const head = table.columns.map(function(col) { return `<th>${escapeHtml(col)}</th>`; }).join("");
+        const v = currentView();
+        let rows = "";
+        for (let i = 0; i < v.count; i++) {
+            const r = v.at(i);
+            rows += "<tr>" + table.columns.map(function(col) { return `<td>${cell(col, r)}</td>`; }).join("") + "</tr>";
+        }
+        const win = window.open("", "_blank");
+        win.document.write(`<title>Comparison Table</title>` +
+            `<style>table{border-collapse:collapse;font:12px sans-serif}td,th{border:1px solid #ccc;padding:3px 6px}</style>` +
+            `<table><thead><tr>${head}</tr></thead><tbody>${rows}</tbody></table>`);
+        win.document.close();
+        win.focus();
+        win.print();
+    }
+
+    document.querySelectorAll("#comparison-table th").forEach(function(th) {
+        th.addEventListener("click", function() {
+            // First click sorts descending (widest gaps first), the next one ascending
+            descending = th.dataset.column === sortCol ? !descending : true;
+            sortCol = th.dataset.column;
+            page = 0; view = null;
+            render();
+        });
+    });
+    search.addEventListener("input", function() { page = 0; view = null; render(); });
+    document.getElementById("comparisonPrev").addEventListener("click", function() { page = Math.max(0, page - 1); render(); });
+    document.getElementById("comparisonNext").addEventListener("click", function() { page += 1; render(); });
+    document.getElementById("comparisonCsv").addEventListener("click", downloadCsv);
+    document.getElementById("comparisonExcel").addEventListener("click", downloadExcel);
+    document.getElementById("comparisonCopy").addEventListener("click", copyRows);
+    document.getElementById("comparisonPrint").addEventListener("click", printRows);
+    render();
+})();
+"""
+
+comparison_css = """
+        #comparison-table thead th {
+            cursor: pointer;
+        }
+        #comparison-table thead th[data-sort="desc"]::after {
+            content: " \\25BC";
+        }
+        #comparison-table thead th[data-sort="asc"]::after {
+            content: " \\25B2";
+        }
+        .comparison-controls {
+            display: flex;
+            align-items: center;
+            gap: 10px;
+            margin-bottom: 8px;
+        }
+        .comparison-controls input {
+            padding: 6px 10px;
+            border: 1px solid #ccc;
+            border-radius: 6px;
+        }
+        .comparison-info {
+            font-size: 13px;
+            color: #999;
+        }
+"""
+
+
+def comparison_table_html(df_comp, page_size=PAGE_SIZE):
+    if df_comp.empty:
+        return "<p>No comparison data available</p>"
+    index = ComparisonIndex(df_comp)
+    payload = json.dumps(index.payload(), separators=(",", ":"), ensure_ascii=False).replace("</", "<\\/")
+    headers = "".join(f'<th data-column="{html.escape(col)}">{html.escape(col)}</th>' for col in index.columns)
+    return f"""
+    <h3 style='margin:10px; text-align: center;'>Comparison Table (Multi-company/year)</h3>
+    <p style='text-align: left; font-size: 14px; color: gray;'>Click a column header to sort; search filters by company. Use the buttons to download, copy, or print the matching rows</p>
+    <style>{comparison_css}    </style>
+    <div class="comparison-controls">
+        <input id="comparisonSearch" type="search" placeholder="Search company" autocomplete="off">
+        <button id="comparisonPrev" class="dt-button">Previous</button>
+        <button id="comparisonNext" class="dt-button">Next</button>
+        <button id="comparisonCsv" class="dt-button">CSV</button>
+        <button id="comparisonExcel" class="dt-button">Excel</button>
+        <button id="comparisonCopy" class="dt-button">Copy</button>
+        <button id="comparisonPrint" class="dt-button">Print</button>
+        <span id="comparisonInfo" class="comparison-info"></span>
+    </div>
+    <table id="comparison-table" class="display" style="width:100%" data-page-size="{page_size}">
+        <thead><tr>{headers}</tr></thead>
+        <tbody></tbody>
+    </table>
+    <script type="application/json" id="comparison-data">{payload}</script>
+    <script>{comparison_js}</script>
+    """
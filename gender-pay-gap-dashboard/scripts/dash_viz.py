@@ -0,0 +1,264 @@
+# scripts/dash_viz.py
+#
+# Live Dash version of the gender pay gap dashboard. The year and company
+# dropdowns drive one callback that builds the KPI cards, bonus table and the
+# four charts from the same figure functions viz.py renders statically.
+#
+# Rendered selections are kept in a bounded LRU cache keyed by
+# (year, company, data version), so hot selections are served from memory.
+# The data is a snapshot that a background thread swaps when a CSV in the data
+# folder is rewritten (see data_refresh.py): the new version's default
+# selection is rendered before the swap and the old version's entries are
+# purged after it. Callback latency is recorded and reported as
+# p50/p99 in the log and at /latency. /api/comparison serves paged, sorted rows
+# of the comparison table (see comparison_table.py).
+#
+# Usage (from the dashboard folder):
+#   python scripts/dash_viz.py --port 8050 --cache-size 256 --refresh 2
+#   python scripts/dash_viz.py --workers 4 --host 0.0.0.0   # forked workers, see serve.py
+
+import time
+import argparse
+import logging
+from collections import deque
+from threading import Lock
+
+import numpy as np
+from cachetools import LRUCache, cached
+from cachetools.keys import hashkey
+from dash import Dash, html, dcc, Input, Output
+from flask import request
+import plotly.graph_objects as go
+
+from serve import serve
+from data_refresh import SnapshotStore, purge_version, REFRESH_INTERVAL
+from data_context import GenderDataContext, data_version
+from comparison_table import ComparisonIndex, PAGE_SIZE
+from viz import (FONT_FAMILY, base_css, card_css, cube_css, kpi_values, kpi_subtext,
+                 quartile_figure, sankey_figure, treemap_figure, heatmap_figure, scenario_figure,
+                 histogram_figure, default_partition)
+
+CACHE_SIZE = 256
+LATENCY_WINDOW = 1000
+REPORT_EVERY = 100
+
+
+class LatencyRecorder:
+    def __init__(self, window=LATENCY_WINDOW):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.lock = Lock()
+
+    def record(self, seconds):
+        with self.lock:
+            self.samples.append(seconds * 1000)
+            self.count += 1
+            report = self.count % REPORT_EVERY == 0
+        if report:
+            logging.info(self.summary_line())
+
+    def summary(self):
+        with self.lock:
+            samples = np.array(self.samples)
+        if len(samples) == 0:
+            return {"count": self.count, "p50_ms": None, "p99_ms": None}
+        p50, p99 = np.percentile(samples, [50, 99])
+        return {"count": self.count, "p50_ms": round(p50, 3), "p99_ms": round(p99, 3)}
+
+    def summary_line(self):
+        stats = self.summary()
+        return f"callbacks={stats['count']} p50={stats['p50_ms']}ms p99={stats['p99_ms']}ms"
+
+
+def empty_figure(message):
+    fig = go.Figure()
+    fig.add_annotation(text=message, showarrow=False, font=dict(size=16, color="#999999"))
+    fig.update_layout(xaxis=dict(visible=False), yaxis=dict(visible=False),
+                      plot_bgcolor="white", paper_bgcolor="white")
+    return fig
+
+
+def kpi_cards(part):
+    return html.Div(className="card-grid", children=[
+        html.Div(className="summary-card", children=[
+            html.Div(title, className="summary-title"),
+            html.Div(f"{gap}%", className="summary-value"),
+            html.Div(kpi_subtext(bound), className="summary-subtext"),
+        ])
+        for title, gap, bound in kpi_values(part)
+    ])
+
+
+def bonus_table(part):
+    if part.bonus.empty:
+        return html.P("No bonus data available")
+    rows = [html.Tr([html.Td(gender), html.Td(f"{participation}%")])
+            for gender, participation in zip(part.bonus["Gender"], part.bonus["Bonus Participation (%)"])]
+    return html.Div(className="bonus-table-wrapper", children=[
+        html.H3(f"Bonus Participation ({part.year}) – {part.company}", style={"textAlign": "center"}),
+        html.Table(className="bonus-table", children=[
+            html.Thead(html.Tr([html.Th("Gender"), html.Th("Bonus Participation (%)")])),
+            html.Tbody(rows),
+        ]),
+    ])
+
+
+FIGURES = [
+    ("quartiles", quartile_figure, "No quartile data available"),
+    ("sankey", sankey_figure, "No sankey data available"),
+    ("treemap", treemap_figure, "No data for treemap"),
+    ("heatmap", heatmap_figure, "No heatmap data available"),
+    ("histogram", histogram_figure, "No pay distribution data available (run payroll_engine.py)"),
+    ("scenarios", scenario_figure, "No scenario data available (run scenario_engine.py)"),
+]
+
+
+def render_selection(data, year, company):
+    part = data.partition(year, company)
+    figures = []
+    for _, build, message in FIGURES:
+        fig = build(part)
+        # Plain dicts skip re-validating the figure on every cache hit
+        figures.append((fig if fig is not None else empty_figure(message)).to_plotly_json())
+    return (kpi_cards(part), bonus_table(part), *figures)
+
+
+def create_app(data_dir="data", cache_size=CACHE_SIZE, refresh_interval=REFRESH_INTERVAL):
+    latency = LatencyRecorder()
+    cache = LRUCache(maxsize=cache_size)
+    cache_lock = Lock()
+
+    # The context is not part of the key: the data version identifies it
+    @cached(cache, key=lambda data, year, company, version: hashkey(year, company, version), lock=cache_lock, info=True)
+    def cached_selection(data, year, company, version):
+        return render_selection(data, year, company)
+
+    def prepare(data, version):
+        # Render the selection a new page load opens with before it goes live
+        default = default_partition(data)
+        cached_selection(data, default.year, default.company, version)
+
+    store = SnapshotStore(lambda: GenderDataContext.load(data_dir), lambda: data_version(data_dir),
+                          refresh_interval, prepare=prepare,
+                          on_swap=lambda old, new: purge_version(cache, cache_lock, old))
+    prepare(*store.current())
+
+    # Sort permutations are built once per data version
+    @cached(LRUCache(maxsize=1), key=lambda data, version: version, lock=Lock())
+    def comparison_index(data, version):
+        return ComparisonIndex(data.frames["comp"])
+
+    app = Dash(__name__)
+    app.title = "Ireland Gender Pay Gap Dashboard"
+    app.index_string = f"""<!DOCTYPE html>
+<html>
+<head>
+    {{%metas%}}
+    <title>{{%title%}}</title>
+    {{%favicon%}}
+    {{%css%}}
+    <style>{base_css}{card_css}{cube_css}    </style>
+</head>
+<body class="bg-light p-4">
+    {{%app_entry%}}
+    <footer>
+        {{%config%}}
+        {{%scripts%}}
+        {{%renderer%}}
+    </footer>
+</body>
+</html>
+"""
+
+    def graph_card(name):
+        return html.Div(className="card", children=dcc.Graph(id=f"chart-{name}", config={"responsive": True}))
+
+    def serve_layout():
+        # Built per page load so the dropdowns follow the current snapshot
+        data, _ = store.current()
+        default = default_partition(data)
+        return html.Div(style={"fontFamily": FONT_FAMILY}, children=[
+            html.Div("Ireland Gender Pay Gap Dashboard", className="dashboard-title"),
+            html.Div(className="filter-bar", children=[
+                html.Label("Select Year:", htmlFor="yearToggle"),
+                dcc.Dropdown(id="yearToggle", options=data.years, value=default.year, clearable=False,
+                             style={"width": "140px"}),
+                html.Label("Select Company:", htmlFor="companyToggle"),
+                dcc.Dropdown(id="companyToggle", options=data.companies, value=default.company, clearable=False,
+                             style={"width": "320px"}),
+            ]),
+            html.Div(className="section cube", children=[
+                html.Div(id="cube-kpis", className="card card-summary"),
+                html.Div(id="cube-bonus", className="card card-bonus"),
+                html.Div(className="grid-2", children=[graph_card("quartiles"), graph_card("sankey")]),
+                html.Div(className="grid-2", children=[graph_card("treemap"), graph_card("heatmap")]),
+                graph_card("histogram"),
+                graph_card("scenarios"),
+            ]),
+        ])
+
+    app.layout = serve_layout
+
+    @app.callback(
+        Output("cube-kpis", "children"),
+        Output("cube-bonus", "children"),
+        *[Output(f"chart-{name}", "figure") for name, _, _ in FIGURES],
+        Input("yearToggle", "value"),
+        Input("companyToggle", "value"),
+    )
+    def update_selection(year, company):
+        start = time.perf_counter()
+        data, version = store.current()
+        outputs = cached_selection(data, year, company, version)
+        latency.record(time.perf_counter() - start)
+        return outputs
+
+    @app.server.route("/latency")
+    def latency_report():
+        info = cached_selection.cache_info()
+        return {**latency.summary(), "cache_hits": info.hits, "cache_misses": info.misses,
+                "cache_size": info.currsize, "cache_max": info.maxsize}
+
+    @app.server.route("/api/comparison")
+    def comparison_page():
+        # e.g. /api/comparison?sort=Mean Hourly Gap (%)&limit=50 for the 50 widest mean hourly gaps
+        data, version = store.current()
+        index = comparison_index(data, version)
+        sort = request.args.get("sort")
+        if sort is not None and sort not in index.columns:
+            return {"error": f"Unknown sort column: {sort}"}, 400
+        return index.query(
+            sort=sort,
+            descending=request.args.get("order", "desc") != "asc",
+            offset=max(request.args.get("offset", 0, type=int), 0),
+            limit=min(max(request.args.get("limit", PAGE_SIZE, type=int), 1), 1000),
+            search=request.args.get("q", ""),
+        )
+
+    app.cached_selection = cached_selection
+    app.latency = latency
+    app.store = store
+    return app
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+    parser = argparse.ArgumentParser(description="Serve the gender pay gap dashboard with Dash")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Serve with N forked worker processes instead of the development server")
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE, help="Rendered selections kept in memory")
+    parser.add_argument("--refresh", type=float, default=REFRESH_INTERVAL,
+                        help="Seconds between checks of the data folder for new CSVs (0 to disable)")
+    parser.add_argument("--debug", action="store_true")
+    args = parser.parse_args()
+
+    app = create_app(args.data_dir, args.cache_size, args.refresh)
+    if args.workers > 0:
+        # The parent polls for new data and re-forks the workers onto it
+        serve(app, args.host, args.port, args.workers, refresh=app.store.refresh, refresh_interval=args.refresh)
+    else:
+        app.store.start()
+        app.run(debug=args.debug, host=args.host, port=args.port)
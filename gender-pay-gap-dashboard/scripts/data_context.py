@@ -0,0 +1,178 @@
+# scripts/data_context.py
+#
+# Loads the dashboard CSVs once and partitions every frame by (Year, Company)
+# with a single groupby, so each chart builder receives its slice by dict
+# lookup instead of running a full-table boolean mask per combination.
+# The monthly retention file is streamed in chunks into per-group means (see
+# retention_aggregator.py) rather than loaded whole.
+
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import NamedTuple
+import pandas as pd
+
+from retention_aggregator import RetentionAggregator, read_retention, RETENTION_KEYS
+
+DATA_FILES = {
+    "gap": "pay_gap_summary.csv",
+    "quart": "pay_quartiles.csv",
+    "bonus": "bonus_participation.csv",
+    "sankey": "sankey_flow.csv",
+    "comp": "pay_gap_comparison.csv",
+    "retention": "retention_heatmap.csv",
+    "scenario": "scenario_gaps.csv",
+    "histogram": "pay_histogram.csv",
+}
+# Written by optional engines (scenario_engine.py, payroll_engine.py); skipped quietly when absent
+OPTIONAL_FILES = {"scenario", "histogram"}
+PARTITION_KEYS = ["Year", "Company"]
+
+
+# Helper function for loading CSV files safely
+def load_data(path):
+    try:
+        df = pd.read_csv(path)
+        logging.info(f"Successfully loaded {path}")
+        return df
+    except Exception as e:
+        logging.error(f"Failed to load {path}: {e}")
+        return pd.DataFrame()
+
+
+def data_version(data_dir="data"):
+    # Changes whenever any dashboard CSV is rewritten; keys caches of rendered selections
+    stamps = []
+    for fname in DATA_FILES.values():
+        try:
+            stat = os.stat(os.path.join(data_dir, fname))
+            stamps.append(f"{stat.st_size}-{stat.st_mtime_ns}")
+        except OSError:
+            stamps.append("missing")
+    return "/".join(stamps)
+
+
+def load_retention(path, monthly=False):
+    # Per-group (and optionally per-group-month) retention means in one chunked pass
+    aggregators = [RetentionAggregator()] + ([RetentionAggregator(RETENTION_KEYS + ["Month"])] if monthly else [])
+    try:
+        read_retention(path, aggregators)
+        logging.info(f"Successfully aggregated {path}")
+    except Exception as e:
+        logging.error(f"Failed to load {path}: {e}")
+        return pd.DataFrame(), pd.DataFrame() if monthly else None
+    means = [agg.means() for agg in aggregators]
+    return means[0], means[1] if monthly else None
+
+
+class Partition(NamedTuple):
+    year: int
+    company: str
+    gap: pd.DataFrame
+    quart: pd.DataFrame
+    bonus: pd.DataFrame
+    sankey: pd.DataFrame
+    retention_avg: pd.DataFrame
+    scenario: pd.DataFrame
+    histogram: pd.DataFrame
+
+
+def split_by_keys(df):
+    if df.empty or not set(PARTITION_KEYS) <= set(df.columns):
+        return {}
+    return {key: part for key, part in df.groupby(PARTITION_KEYS, sort=False)}
+
+
+class GenderDataContext:
+    def __init__(self, frames, retention_avg=None, retention_monthly=None):
+        self.frames = frames
+        df_gap = frames["gap"]
+        self.companies = df_gap["Company"].unique().tolist() if not df_gap.empty else []
+        self.years = df_gap["Year"].unique().tolist() if not df_gap.empty else []
+
+        # Monthly retention collapsed to one mean per (Company, Year, Quartile, Gender)
+        if retention_avg is None:
+            df_retention = frames["retention"]
+            retention_avg = df_retention if df_retention.empty else RetentionAggregator().update(df_retention).means()
+        self.retention_avg = retention_avg
+        # Means per group and month, only loaded for the month-range heatmap (viz.py --mode cube)
+        self.retention_monthly = retention_monthly
+
+        self.parts = {
+            "gap": split_by_keys(df_gap),
+            "quart": split_by_keys(frames["quart"]),
+            "bonus": split_by_keys(frames["bonus"]),
+            "sankey": split_by_keys(frames["sankey"]),
+            "retention_avg": split_by_keys(retention_avg),
+            "scenario": split_by_keys(frames.get("scenario", pd.DataFrame())),
+            "histogram": split_by_keys(frames.get("histogram", pd.DataFrame())),
+        }
+        self.empty = {name: frames.get(name, pd.DataFrame()).iloc[0:0] for name in self.parts}
+        self.empty["retention_avg"] = retention_avg.iloc[0:0]
+        df_comp = frames.get("comp", pd.DataFrame())
+        self.comp_by_company = dict(tuple(df_comp.groupby("Company", sort=False))) if not df_comp.empty else {}
+
+    @classmethod
+    def load(cls, data_dir="data", monthly_retention=False):
+        frames = {name: load_data(os.path.join(data_dir, fname))
+                  for name, fname in DATA_FILES.items()
+                  if name != "retention"
+                  and (name not in OPTIONAL_FILES or os.path.exists(os.path.join(data_dir, fname)))}
+        frames.update({name: pd.DataFrame() for name in OPTIONAL_FILES if name not in frames})
+        retention_avg, retention_monthly = load_retention(os.path.join(data_dir, DATA_FILES["retention"]),
+                                                          monthly_retention)
+        # Only the means are kept in memory; they stand in for the monthly file (e.g. in site_build hashes)
+        frames["retention"] = retention_avg
+        return cls(frames, retention_avg, retention_monthly)
+
+    def partition(self, year, company):
+        key = (year, company)
+        return Partition(year, company, *(parts.get(key, self.empty[name]) for name, parts in self.parts.items()))
+
+    def partitions(self):
+        # Every year x company combination, years outermost like the dashboard sections
+        for year in self.years:
+            for company in self.companies:
+                yield self.partition(year, company)
+
+
+# Context the pool workers render from; set in the parent before forking so the
+# frames are inherited instead of re-read, or loaded once per worker otherwise
+_worker_context = None
+
+
+def _init_worker(data_dir):
+    global _worker_context
+    if _worker_context is None:
+        _worker_context = GenderDataContext.load(data_dir)
+
+
+def _call_with_context(fn, item):
+    return fn(_worker_context, item)
+
+
+def iter_with_context(data, fn, items, jobs=1, data_dir="data", chunksize=1):
+    # fn(data, item) for each item, fanned out over `jobs` processes and yielded in input order
+    global _worker_context
+    items = list(items)
+    if jobs <= 1 or len(items) <= 1:
+        for item in items:
+            yield fn(data, item)
+        return
+    if "fork" in multiprocessing.get_all_start_methods():
+        _worker_context = data
+        mp_context = multiprocessing.get_context("fork")
+    else:
+        mp_context = multiprocessing.get_context()
+    try:
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=mp_context,
+                                 initializer=_init_worker, initargs=(data_dir,)) as pool:
+            yield from pool.map(partial(_call_with_context, fn), items, chunksize=chunksize)
+    finally:
+        _worker_context = None
+
+
+def map_with_context(data, fn, items, jobs=1, data_dir="data", chunksize=1):
+    return list(iter_with_context(data, fn, items, jobs, data_dir, chunksize))
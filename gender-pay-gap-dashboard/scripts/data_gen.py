@@ -1,13 +1,7 @@
 import os
+import argparse
 import pandas as pd
 import numpy as np
-import itertools
-
-# Set seed for reproducibility
-np.random.seed(42)
-
-# Create data directory
-os.makedirs("data", exist_ok=True)
 
 # Ireland companies and years
 companies = ["Ryanair", "New Look", "Odeon", "Northern Trust"]
@@ -16,6 +10,9 @@ companies = ["Ryanair", "New Look", "Odeon", "Northern Trust"]
 years = [2022, 2023]
 metrics = ["Mean Hourly Pay", "Median Hourly Pay", "Mean Bonus Pay", "Median Bonus Pay"]
 quartiles = ["Q4 - Lower", "Q3 - Lower Mid", "Q2 - Upper Mid", "Q1 - Upper"]
+genders = ["Male", "Female"]
+targets = ["Bonus", "No Bonus", "Exit"]
+months = list(range(1, 13))
 
 # Salary and bonus assumptions
 quartile_salaries = {
@@ -31,7 +28,7 @@ quartile_bonuses = {
     "Q1 - Upper": 2000
 }
 
-# Update the quartile percentages for Ryanair and Odeon according to the sample values for 2022 and 2023 
+# Update the quartile percentages for Ryanair and Odeon according to the sample values for 2022 and 2023
 # Displayed on page https://genderpaygap.pythonanywhere.com/  (Ireland Gender Pay Gap Analysis)
 ryanair_dist = {
     "Q4 - Lower": (89, 11),
@@ -45,110 +42,204 @@ odeon_dist = {
     "Q3 - Lower Mid": (59, 41),
     "Q4 - Lower": (56, 44)
 }
-
-# Output data containers
-quartile_data, summary_data, bonus_data, comparison_data = [], [], [], []
-# Generate systhetic data for the following files:
-for company, year in itertools.product(companies, years):
-    male_dist, female_dist = [], []
-
-    if company == "Ryanair":
-        dist_map = ryanair_dist
-    elif company == "Odeon":
-        dist_map = odeon_dist
-    else:
-        dist_map = {q: (np.random.uniform(40, 60), 0) for q in quartiles}
-        for q in quartiles:
-            dist_map[q] = (dist_map[q][0], 100 - dist_map[q][0])
-
-    for q in quartiles:
-        male_pct, female_pct = dist_map[q]
-        quartile_data.extend([
-            {"Company": company, "Year": year, "Quartile": q, "Gender": "Male", "Percentage": round(male_pct, 1)},
-            {"Company": company, "Year": year, "Quartile": q, "Gender": "Female", "Percentage": round(female_pct, 1)}
-        ])
-        male_dist.append((male_pct / 100) * quartile_salaries[q])
-        female_dist.append((female_pct / 100) * quartile_salaries[q])
-
-    mean_male_pay = sum(male_dist)
-    mean_female_pay = sum(female_dist)
-    mean_pay_gap = round((mean_male_pay - mean_female_pay) / mean_male_pay * 100, 1)
-
-    median_male = quartile_salaries["Q2 - Upper Mid"]
-    median_female = quartile_salaries["Q3 - Lower Mid"]
-    median_pay_gap = round((median_male - median_female) / median_male * 100, 1)
-
-    summary_data.extend([
-        {"Company": company, "Year": year, "Metric": "Mean Hourly Pay", "Male": round(mean_male_pay, 1), "Female": round(mean_female_pay, 1)},
-        {"Company": company, "Year": year, "Metric": "Median Hourly Pay", "Male": median_male, "Female": median_female}
-    ])
-
-    male_bonus_participation = np.random.uniform(60, 90)
-    female_bonus_participation = np.random.uniform(40, 80)
-    male_bonus_avg = sum((dist_map[q][0] / 100) * quartile_bonuses[q] for q in quartiles)
-    female_bonus_avg = sum((dist_map[q][1] / 100) * quartile_bonuses[q] for q in quartiles)
-    male_bonus = male_bonus_avg * (male_bonus_participation / 100)
-    female_bonus = female_bonus_avg * (female_bonus_participation / 100)
-    mean_bonus_gap = round((male_bonus - female_bonus) / male_bonus * 100, 1)
-
-    summary_data.extend([
-        {"Company": company, "Year": year, "Metric": "Mean Bonus Pay", "Male": round(male_bonus, 1), "Female": round(female_bonus, 1)},
-        {"Company": company, "Year": year, "Metric": "Median Bonus Pay", "Male": 2000, "Female": 1000}
-    ])
-
-    bonus_data.extend([
-        {"Company": company, "Year": year, "Gender": "Male", "Bonus Participation (%)": round(male_bonus_participation, 1)},
-        {"Company": company, "Year": year, "Gender": "Female", "Bonus Participation (%)": round(female_bonus_participation, 1)}
-    ])
-
-    comparison_data.append({
-        "Company": company,
+fixed_dists = {"Ryanair": ryanair_dist, "Odeon": odeon_dist}
+
+# Arrays in `quartiles` order, broadcast against (company, year, quartile)
+SALARY = np.array([quartile_salaries[q] for q in quartiles], dtype=float)
+BONUS = np.array([quartile_bonuses[q] for q in quartiles], dtype=float)
+MEDIAN_MALE_PAY = quartile_salaries["Q2 - Upper Mid"]
+MEDIAN_FEMALE_PAY = quartile_salaries["Q3 - Lower Mid"]
+MEDIAN_MALE_BONUS, MEDIAN_FEMALE_BONUS = 2000, 1000
+
+
+def company_names(n_companies):
+    # The four named employers first, then synthetic register entries
+    names = companies[:n_companies]
+    names += [f"Employer {i:05d}" for i in range(len(names) + 1, n_companies + 1)]
+    return names
+
+
+def grid_frame(axes, values):
+    # Cartesian product of the axes (outermost first) plus C-order raveled values
+    df = pd.MultiIndex.from_product(list(axes.values()), names=list(axes.keys())).to_frame(index=False)
+    for col, arr in values.items():
+        df[col] = np.asarray(arr).ravel()
+    return df
+
+
+def generate(n_companies=len(companies), year_range=years):
+    names = company_names(n_companies)
+    year_list = list(year_range)
+    C, Y, Q = len(names), len(year_list), len(quartiles)
+
+    # Male share per (company, year, quartile); Ryanair and Odeon keep their fixed distributions
+    male_pct = np.random.uniform(40, 60, size=(C, Y, Q))
+    for company, dist in fixed_dists.items():
+        if company in names:
+            male_pct[names.index(company)] = [dist[q][0] for q in quartiles]
+    female_pct = 100 - male_pct
+
+    # Gender split per quartile -> (company, year, quartile, gender)
+    gender_pct = np.stack([male_pct, female_pct], axis=-1)
+    df_quartiles = grid_frame(
+        {"Company": names, "Year": year_list, "Quartile": quartiles, "Gender": genders},
+        {"Percentage": gender_pct.round(1)}
+    )
+
+    # Mean pay weighted by quartile share
+    mean_pay = (gender_pct / 100 * SALARY[:, None]).sum(axis=2)  # (C, Y, G)
+    mean_pay_gap = ((mean_pay[..., 0] - mean_pay[..., 1]) / mean_pay[..., 0] * 100).round(1)
+    median_pay_gap = round((MEDIAN_MALE_PAY - MEDIAN_FEMALE_PAY) / MEDIAN_MALE_PAY * 100, 1)
+
+    # Bonus pay scaled by participation
+    participation = np.stack([
+        np.random.uniform(60, 90, size=(C, Y)),
+        np.random.uniform(40, 80, size=(C, Y)),
+    ], axis=-1)  # (C, Y, G)
+    bonus_avg = (gender_pct / 100 * BONUS[:, None]).sum(axis=2)
+    mean_bonus = bonus_avg * participation / 100
+    mean_bonus_gap = ((mean_bonus[..., 0] - mean_bonus[..., 1]) / mean_bonus[..., 0] * 100).round(1)
+
+    # Summary metrics -> (company, year, metric, gender)
+    summary = np.empty((C, Y, len(metrics), 2))
+    summary[:, :, 0] = mean_pay.round(1)
+    summary[:, :, 1] = [MEDIAN_MALE_PAY, MEDIAN_FEMALE_PAY]
+    summary[:, :, 2] = mean_bonus.round(1)
+    summary[:, :, 3] = [MEDIAN_MALE_BONUS, MEDIAN_FEMALE_BONUS]
+    df_summary = grid_frame(
+        {"Company": names, "Year": year_list, "Metric": metrics},
+        {"Male": summary[..., 0], "Female": summary[..., 1]}
+    )
+
+    df_bonus = grid_frame(
+        {"Company": names, "Year": year_list, "Gender": genders},
+        {"Bonus Participation (%)": participation.round(1)}
+    )
+
+    df_comparison = grid_frame(
+        {"Company": names, "Year": year_list},
+        {
+            "Mean Hourly Gap (%)": mean_pay_gap,
+            "Median Hourly Gap (%)": np.full((C, Y), median_pay_gap),
+            "Mean Bonus Gap (%)": mean_bonus_gap,
+            "Median Bonus Gap (%)": np.full((C, Y), 50.0),
+        }
+    )
+
+    # Sankey: quartile -> {Bonus, No Bonus, Exit} shares
+    flows = np.random.dirichlet(np.ones(len(targets)), size=(C, Y, Q)) * 100
+    df_sankey = grid_frame(
+        {"Company": names, "Year": year_list, "Source": quartiles, "Target": targets},
+        {"Value": flows.round(1)}
+    )
+
+    # Retention tensor (company, year, gender, quartile, month)
+    base = np.random.uniform(60, 90, size=(C, Y, 2, Q, 1))
+    retention = np.clip(base + np.random.normal(0, 5, size=(C, Y, 2, Q, len(months))), 0, 100)
+    df_heatmap = grid_frame(
+        {"Company": names, "Year": year_list, "Gender": genders, "Quartile": quartiles, "Month": months},
+        {"Retention (%)": retention.round(1)}
+    )
+    df_heatmap["Month"] = df_heatmap["Year"].astype(str) + "-" + df_heatmap["Month"].astype(str).str.zfill(2)
+
+    return {
+        "pay_quartiles.csv": df_quartiles,
+        "pay_gap_summary.csv": df_summary,
+        "bonus_participation.csv": df_bonus,
+        "pay_gap_comparison.csv": df_comparison,
+        "sankey_flow.csv": df_sankey,
+        "retention_heatmap.csv": df_heatmap,
+    }
+
+
+def generate_payroll(n_employees, n_companies=len(companies), year_range=years):
+    # Employee-level payroll for payroll_engine.py: one row per employee and year
+    names = np.array(company_names(n_companies))
+    year_list = np.array(list(year_range))
+    company = np.random.randint(0, len(names), size=n_employees)
+    year = year_list[np.random.randint(0, len(year_list), size=n_employees)]
+
+    # Each employer has its own female share, male pay premium and bonus participation
+    female_share = np.random.uniform(0.3, 0.6, size=len(names))
+    male_premium = np.random.uniform(0.0, 0.25, size=len(names))
+    male_participation = np.random.uniform(0.6, 0.9, size=len(names))
+    female_participation = np.random.uniform(0.4, 0.8, size=len(names))
+    is_female = np.random.random(n_employees) < female_share[company]
+
+    hourly = np.random.lognormal(mean=np.log(20), sigma=0.45, size=n_employees)
+    hourly *= np.where(is_female, 1.0, 1.0 + male_premium[company])
+    participation = np.where(is_female, female_participation[company], male_participation[company])
+    has_bonus = np.random.random(n_employees) < participation
+    bonus = np.where(has_bonus, hourly * np.random.lognormal(mean=np.log(60), sigma=0.6, size=n_employees), 0.0)
+
+    return pd.DataFrame({
+        "Company": names[company],
         "Year": year,
-        "Mean Hourly Gap (%)": mean_pay_gap,
-        "Median Hourly Gap (%)": median_pay_gap,
-        "Mean Bonus Gap (%)": mean_bonus_gap,
-        "Median Bonus Gap (%)": 50.0
+        "Gender": np.where(is_female, "Female", "Male"),
+        "Hourly Pay": hourly.round(2),
+        "Bonus": bonus.round(2),
+    })
+
+
+def generate_panel(n_employees, n_companies=len(companies), year_range=years):
+    # Multi-year employee panel for mobility_engine.py: one row per employee and year employed
+    names = np.array(company_names(n_companies))
+    year_list = np.array(list(year_range))
+    Y, Q = len(year_list), len(quartiles)
+    company = np.random.randint(0, len(names), size=n_employees)
+    start = np.random.randint(0, Y, size=n_employees)
+
+    # Quartile walk from a random starting band: down, stay or up one band per year
+    steps = np.random.choice([-1, 0, 1], p=[0.1, 0.75, 0.15], size=(n_employees, Y))
+    steps[:, 0] = 0
+    band = np.clip(np.random.randint(0, Q, size=(n_employees, 1)) + np.cumsum(steps, axis=1), 0, Q - 1)
+
+    # Yearly exit risk per employer, higher in the lower bands; employed from start to the exit year
+    exit_rate = np.random.uniform(0.05, 0.2, size=len(names))[company, None] * (1.3 - 0.2 * band)
+    year_idx = np.arange(Y)
+    exits = (np.random.random((n_employees, Y)) < exit_rate) & (year_idx >= start[:, None])
+    exit_year = np.where(exits.any(axis=1), exits.argmax(axis=1), Y)
+    employed = (year_idx >= start[:, None]) & (year_idx <= exit_year[:, None])
+
+    # Bonus odds rise with the band
+    bonus = np.random.random((n_employees, Y)) < np.array([0.3, 0.45, 0.6, 0.8])[band]
+
+    employee, year = np.nonzero(employed)
+    return pd.DataFrame({
+        "Company": names[company[employee]],
+        "Employee ID": employee + 1,
+        "Year": year_list[year],
+        "Quartile": np.array(quartiles)[band[employee, year]],
+        "Bonus": bonus[employee, year].astype(np.int8),
+        "Exit": (year == exit_year[employee]).astype(np.int8),
     })
 
-# Sankey + Heatmap data
-sankey_rows, heatmap_rows = [], []
-targets = ["Bonus", "No Bonus", "Exit"]
-for company, year in itertools.product(companies, years):
-    for source in quartiles:
-        weights = np.random.dirichlet(np.ones(len(targets))) * 100
-        for tgt, w in zip(targets, weights):
-            sankey_rows.append({
-                "Company": company,
-                "Year": year,
-                "Source": source,
-                "Target": tgt,
-                "Value": round(w, 1)
-            })
-
-    for gender in ["Male", "Female"]:
-        for quart in quartiles:
-            base = np.random.uniform(60, 90)
-            for month in range(1, 13):
-                heatmap_rows.append({
-                    "Company": company,
-                    "Year": year,
-                    "Gender": gender,
-                    "Quartile": quart,
-                    "Month": f"{year}-{str(month).zfill(2)}",
-                    "Retention (%)": round(max(0, min(100, base + np.random.normal(0, 5))), 1)
-                })
-
-# Save to CSV
-outputs = {
-    "pay_quartiles.csv": quartile_data,
-    "pay_gap_summary.csv": summary_data,
-    "bonus_participation.csv": bonus_data,
-    "pay_gap_comparison.csv": comparison_data,
-    "sankey_flow.csv": sankey_rows,
-    "retention_heatmap.csv": heatmap_rows,
-}
-for fname, rows in outputs.items():
-    pd.DataFrame(rows).to_csv(f"data/{fname}", index=False)
 
-print("List of Data files generated in `data/` directory!")
-print(os.listdir("data"))
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic gender pay gap data")
+    parser.add_argument("--companies", type=int, default=len(companies), help="Number of employers to generate")
+    parser.add_argument("--start-year", type=int, default=years[0])
+    parser.add_argument("--end-year", type=int, default=years[-1])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--payroll", type=int, default=0, metavar="N",
+                        help="Also write data/payroll.csv with N employee rows for payroll_engine.py")
+    parser.add_argument("--panel", type=int, default=0, metavar="N",
+                        help="Also write data/employee_panel.csv with N employees for mobility_engine.py")
+    args = parser.parse_args()
+
+    # Set seed for reproducibility
+    np.random.seed(args.seed)
+
+    # Create data directory
+    os.makedirs("data", exist_ok=True)
+
+    outputs = generate(args.companies, range(args.start_year, args.end_year + 1))
+    for fname, df in outputs.items():
+        df.to_csv(f"data/{fname}", index=False)
+    if args.payroll:
+        generate_payroll(args.payroll, args.companies, range(args.start_year, args.end_year + 1)).to_csv("data/payroll.csv", index=False)
+    if args.panel:
+        generate_panel(args.panel, args.companies, range(args.start_year, args.end_year + 1)).to_csv("data/employee_panel.csv", index=False)
+
+    print("List of Data files generated in `data/` directory!")
+    print(os.listdir("data"))
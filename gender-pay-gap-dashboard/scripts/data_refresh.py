@@ -0,0 +1 @@
+../../dash_serving/data_refresh.py
\ No newline at end of file
@@ -0,0 +1,156 @@
+# scripts/mobility_engine.py
+#
+# Compute the sankey flows viz.py draws, and year-over-year quartile mobility,
+# from a multi-year employee panel (Company, Employee ID, Year, Quartile,
+# Bonus, Exit) instead of synthetic Dirichlet shares.
+#
+# Flows: every employee-year counts once in its quartile, towards Exit if the
+# exit flag is set, otherwise Bonus or No Bonus. Mobility: employee-years are
+# sorted once by (company, employee, year), so an employee's next year at the
+# same employer is the adjacent row; the target is the quartile held that year,
+# or Exit when there is none (while the company still reports that year).
+# Both are accumulated for every company-year at once with np.add.at into
+# (company-year, source, target) count tensors, with no per-company loop.
+#
+# Usage (from the dashboard folder):
+#   python scripts/data_gen.py --panel 1000000      # optional synthetic panel
+#   python scripts/mobility_engine.py data/employee_panel.csv
+
+import os
+import argparse
+import logging
+import numpy as np
+import pandas as pd
+
+from data_gen import quartiles, targets
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+
+PANEL_COLUMNS = ["Company", "Employee ID", "Year", "Quartile", "Bonus", "Exit"]
+PANEL_DTYPES = {"Company": "category", "Quartile": "category", "Year": np.int32,
+                "Bonus": np.int8, "Exit": np.int8}
+N_QUARTILES = len(quartiles)
+BONUS, NO_BONUS, EXIT = (targets.index(t) for t in ("Bonus", "No Bonus", "Exit"))
+MOBILITY_TARGETS = quartiles + ["Exit"]
+
+
+def load_panel(path):
+    return pd.read_csv(path, usecols=PANEL_COLUMNS, dtype=PANEL_DTYPES)
+
+
+def label_codes(values, labels):
+    # Position of each value in `labels` (-1 if unknown), mapped once per category
+    values = values.astype("category")
+    lookup = np.append(pd.Index(labels).get_indexer(values.cat.categories), -1)
+    return lookup[values.cat.codes.to_numpy()].astype(np.int64)
+
+
+def shares(counts):
+    # Percentage of each source row going to each target
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.nan_to_num(counts / counts.sum(axis=-1, keepdims=True) * 100)
+
+
+class PanelGroups:
+    # Integer encoding of the panel: (company, year) groups, quartile and employee
+    def __init__(self, df):
+        quartile = label_codes(df["Quartile"], quartiles)
+        company = df["Company"].astype("category")
+        company_codes = company.cat.codes.to_numpy().astype(np.int64)
+        valid = (quartile >= 0) & (company_codes >= 0)
+        if not valid.all():
+            logging.warning(f"Skipped {(~valid).sum():,} panel rows with an unknown company or quartile")
+
+        self.company_names = company.cat.categories.to_numpy(dtype=object)
+        self.company = company_codes[valid]
+        self.quartile = quartile[valid]
+        year = df["Year"].to_numpy()[valid]
+        self.year_values, year_codes = np.unique(year, return_inverse=True)
+        self.n_years = len(self.year_values)
+        self.n_groups = len(self.company_names) * self.n_years
+        self.group = self.company * self.n_years + year_codes
+        self.employee, _ = pd.factorize(df["Employee ID"].to_numpy()[valid])
+        self.bonus = df["Bonus"].to_numpy()[valid] > 0
+        self.exit = df["Exit"].to_numpy()[valid] > 0
+
+    def labels(self, group_ids):
+        return self.company_names[group_ids // self.n_years], self.year_values[group_ids % self.n_years]
+
+
+def flow_counts(g):
+    # (group, quartile, Bonus/No Bonus/Exit) employee counts
+    target = np.where(g.exit, EXIT, np.where(g.bonus, BONUS, NO_BONUS))
+    counts = np.zeros((g.n_groups, N_QUARTILES, len(targets)), dtype=np.int64)
+    np.add.at(counts, (g.group, g.quartile, target), 1)
+    return counts
+
+
+def mobility_counts(g):
+    # (group, quartile in year t, quartile in year t+1 or Exit) employee counts
+    n_employees = int(g.employee.max()) + 1 if len(g.employee) else 0
+    key = (g.company * n_employees + g.employee) * g.n_years + g.group % g.n_years
+    order = np.argsort(key)
+    key = key[order]
+
+    # Adjacent rows are the same employee at the same company one year apart
+    next_year = (np.diff(key) == 1) & (np.diff(key // g.n_years) == 0)
+    year_slot = key % g.n_years
+    next_year &= g.year_values[year_slot[1:]] == g.year_values[year_slot[:-1]] + 1
+    target = np.full(len(order), N_QUARTILES, dtype=np.int64)
+    target[:-1][next_year] = g.quartile[order[1:]][next_year]
+
+    # Only years whose following year the company also reports
+    present = np.bincount(g.group, minlength=g.n_groups) > 0
+    consecutive = np.append(np.diff(g.year_values) == 1, False)
+    reported = np.append(present[1:], False) & consecutive[np.arange(g.n_groups) % g.n_years]
+    group = g.group[order]
+    keep = reported[group]
+
+    counts = np.zeros((g.n_groups, N_QUARTILES, len(MOBILITY_TARGETS)), dtype=np.int64)
+    np.add.at(counts, (group[keep], g.quartile[order][keep], target[keep]), 1)
+    return counts, reported
+
+
+def flow_frame(company, year, pct, target_labels):
+    # (n, source, target) percentages -> long Company, Year, Source, Target, Value rows
+    n, n_sources, n_targets = pct.shape
+    return pd.DataFrame({
+        "Company": np.repeat(company, n_sources * n_targets),
+        "Year": np.repeat(year, n_sources * n_targets),
+        "Source": np.tile(np.repeat(quartiles, n_targets), n),
+        "Target": np.tile(target_labels, n * n_sources),
+        "Value": pct.ravel().round(1),
+    })
+
+
+def compute_mobility_tables(df):
+    g = PanelGroups(df)
+    flows = flow_counts(g)
+    mobility, reported = mobility_counts(g)
+
+    # Company-years present in the panel, company-major order
+    present = np.flatnonzero(flows.sum(axis=(1, 2)))
+    company, year = g.labels(present)
+    moved = np.flatnonzero(reported & (mobility.sum(axis=(1, 2)) > 0))
+    moved_company, moved_year = g.labels(moved)
+    return {
+        "sankey_flow.csv": flow_frame(company, year, shares(flows[present]), targets),
+        "quartile_mobility.csv": flow_frame(moved_company, moved_year, shares(mobility[moved]), MOBILITY_TARGETS),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build sankey flows and quartile mobility from an employee panel")
+    parser.add_argument("panel", nargs="+", help="CSV file(s) with Company, Employee ID, Year, Quartile, Bonus, Exit columns")
+    parser.add_argument("--out-dir", default="data")
+    args = parser.parse_args()
+
+    df_panel = pd.concat([load_panel(path) for path in args.panel], ignore_index=True)
+    logging.info(f"Loaded {len(df_panel):,} employee-years")
+    tables = compute_mobility_tables(df_panel)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for fname, df in tables.items():
+        df.to_csv(os.path.join(args.out_dir, fname), index=False)
+        logging.info(f"Wrote {len(df):,} rows to {args.out_dir}/{fname}")
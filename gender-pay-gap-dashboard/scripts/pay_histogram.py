@@ -0,0 +1,78 @@
+# scripts/pay_histogram.py
+#
+# Pre-binned hourly pay distributions per company x year x gender, so the
+# dashboard can draw male and female pay histograms without shipping salaries.
+#
+# payroll_engine.py bins every payroll row into fixed fine bins (FINE_WIDTH
+# per hour up to FINE_MAX, plus one open-ended top bin) in one pass: bins come
+# from np.searchsorted against the shared edges, and counts for all groups from
+# a single bincount over (segment, bin) keys. Only non-empty bins are written to
+# pay_histogram.csv. The charts re-bin those stored counts into wider bars
+# (a whole number of fine bins each), which never needs the payroll again.
+# Missing or infinite pay is left out of the histograms.
+
+import numpy as np
+import pandas as pd
+
+FINE_WIDTH = 0.5
+FINE_MAX = 200.0
+# Fine bin i covers [FINE_EDGES[i], FINE_EDGES[i + 1]); the last one is open-ended
+FINE_EDGES = np.append(np.arange(0, FINE_MAX + FINE_WIDTH / 2, FINE_WIDTH), np.inf)
+N_FINE_BINS = len(FINE_EDGES) - 1
+DISPLAY_BINS = 40
+
+
+def fine_bins(values):
+    # Fine bin of each value; values below zero go to the first bin
+    return np.clip(np.searchsorted(FINE_EDGES, values, side="right") - 1, 0, N_FINE_BINS - 1)
+
+
+def finite_keys(segments, values):
+    # (segment * N_FINE_BINS + bin) key of every finite value; NaN would sort into the open-ended bin
+    values = np.asarray(values, dtype=np.float64)
+    finite = np.isfinite(values)
+    return np.asarray(segments, dtype=np.int64)[finite] * N_FINE_BINS + fine_bins(values[finite])
+
+
+def histogram_counts(segments, values, n_segments):
+    # (segment, fine bin) counts for all segments in one bincount
+    keys = finite_keys(segments, values)
+    return np.bincount(keys, minlength=n_segments * N_FINE_BINS).reshape(n_segments, N_FINE_BINS)
+
+
+def sparse_histogram(segments, values):
+    # Sorted non-empty (segment * N_FINE_BINS + bin) keys and their counts, for streaming
+    keys = finite_keys(segments, values)
+    return np.unique(keys, return_counts=True)
+
+
+def histogram_frame(company, year, gender, bins, counts):
+    # Long rows of non-empty fine bins
+    return pd.DataFrame({
+        "Company": company,
+        "Year": year,
+        "Gender": gender,
+        "Bin Start": FINE_EDGES[bins],
+        "Bin End": FINE_EDGES[bins + 1],
+        "Employees": counts,
+    })
+
+
+def rebin(df, max_bins=DISPLAY_BINS):
+    # Wider bins (a whole number of fine bins) over the occupied range of one company-year,
+    # -> bar lower edges, bar width, a (gender, bar) count table and whether the
+    # last bar holds the open-ended top bin
+    fine = np.round(df["Bin Start"].to_numpy() / FINE_WIDTH).astype(np.int64)
+    last = min(fine.max(), N_FINE_BINS - 2)
+    # Everyone in the open-ended top bin: a single bar starting at the last finite edge
+    first = min(fine.min(), last)
+    factor = max(1, int(np.ceil((last - first + 1) / max_bins)))
+    # The open-ended top bin joins the last bar
+    bar = (np.minimum(fine, last) - first) // factor
+    n_bars = int(bar.max()) + 1
+    genders = pd.Index(df["Gender"].unique())
+    counts = np.bincount(genders.get_indexer(df["Gender"]) * n_bars + bar,
+                         weights=df["Employees"].to_numpy(), minlength=len(genders) * n_bars)
+    starts = FINE_EDGES[first] + np.arange(n_bars) * factor * FINE_WIDTH
+    open_ended = bool((fine == N_FINE_BINS - 1).any())
+    return starts, factor * FINE_WIDTH, pd.DataFrame(counts.reshape(len(genders), n_bars), index=genders), open_ended
@@ -0,0 +1,367 @@
+# scripts/payroll_engine.py
+#
+# Compute the pay gap tables that viz.py reads from employee-level payroll
+# (Company, Year, Gender, Hourly Pay, Bonus) instead of synthesizing them from
+# fixed quartile salaries.
+#
+# Every statistic is computed for all company x year groups at once: rows are
+# encoded to integer segment keys, sorted once with np.lexsort, and means,
+# medians and quartile bands are read off the sorted segments with bincount and
+# offset arithmetic, with no per-company Python loop. Hourly pay is also binned
+# into fixed fine bins per company x year x gender for the pay distribution
+# charts (pay_histogram.csv, see pay_histogram.py).
+#
+# With --approx the payroll is streamed in chunks instead: counts and sums stay
+# exact, while medians and quartile bands come from mergeable quantile sketches
+# (see quantile_sketch.py for the error bound). Several payroll files can then
+# be aggregated in parallel worker processes and merged. The exact mode remains
+# the default and can be used to verify the sketched figures.
+#
+# Usage (from the dashboard folder):
+#   python scripts/data_gen.py --payroll 1000000    # optional synthetic payroll
+#   python scripts/payroll_engine.py data/payroll.csv
+#   python scripts/payroll_engine.py part-*.csv --approx --relative-error 0.005 --jobs 4
+
+import os
+import argparse
+import logging
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from data_gen import quartiles, genders, metrics
+from quantile_sketch import GroupedQuantileSketch, sparse_add, DEFAULT_RELATIVE_ERROR
+from pay_histogram import N_FINE_BINS, histogram_counts, sparse_histogram, histogram_frame
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+
+PAYROLL_COLUMNS = ["Company", "Year", "Gender", "Hourly Pay", "Bonus"]
+PAYROLL_DTYPES = {"Company": "category", "Gender": "category", "Year": np.int32,
+                  "Hourly Pay": np.float64, "Bonus": np.float64}
+N_QUARTILES, N_GENDERS = len(quartiles), len(genders)
+CHUNK_SIZE = 1_000_000
+# Streaming segment ids: (company * YEAR_SLOTS + year - YEAR_BASE) * N_GENDERS + gender,
+# so --approx accepts years 1900-2155; other years are rejected, not aliased
+YEAR_BASE, YEAR_SLOTS = 1900, 256
+SEGMENTS_PER_COMPANY = YEAR_SLOTS * N_GENDERS
+
+
+def load_payroll(path):
+    return pd.read_csv(path, usecols=PAYROLL_COLUMNS, dtype=PAYROLL_DTYPES)
+
+
+def encode_gender(df):
+    gender = pd.Index(genders).get_indexer(df["Gender"].astype(str))
+    valid = gender >= 0
+    if not valid.all():
+        logging.warning(f"Skipped {(~valid).sum():,} payroll rows with an unknown gender")
+    return df[valid], gender[valid].astype(np.int64)
+
+
+def segment_offsets(counts):
+    return np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+
+def segment_quantile(sorted_values, starts, counts, q):
+    # Linear-interpolated quantile (numpy's default) of every sorted segment
+    pos = q * np.maximum(counts - 1, 0)
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.ceil(pos).astype(np.int64)
+    empty = counts == 0
+    last = max(len(sorted_values) - 1, 0)
+    v_lo = sorted_values[np.minimum(starts + lo, last)] if len(sorted_values) else np.zeros(len(counts))
+    v_hi = sorted_values[np.minimum(starts + hi, last)] if len(sorted_values) else np.zeros(len(counts))
+    return np.where(empty, np.nan, v_lo + (pos - lo) * (v_hi - v_lo))
+
+
+def segment_stats(keys, values, n_keys, q=0.5):
+    # Count, mean and quantile of `values` per integer key in one sort
+    order = np.lexsort((values, keys))
+    sorted_values = values[order]
+    counts = np.bincount(keys, minlength=n_keys)
+    sums = np.bincount(keys, weights=values, minlength=n_keys)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+    return counts, means, segment_quantile(sorted_values, segment_offsets(counts), counts, q)
+
+
+def pct_gap(male, female):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.round((male - female) / male * 100, 1)
+
+
+class PayrollGroups:
+    # Integer encoding of (company, year) groups and gender for a payroll frame
+    def __init__(self, df):
+        df, gender = encode_gender(df)
+        company_codes, self.company_names = pd.factorize(df["Company"].astype(str))
+        year_codes, self.year_values = pd.factorize(df["Year"], sort=True)
+        self.n_years = len(self.year_values)
+        self.n_groups = len(self.company_names) * self.n_years
+        self.group = company_codes.astype(np.int64) * self.n_years + year_codes
+        self.gender = gender
+        self.hourly = df["Hourly Pay"].to_numpy(dtype=np.float64)
+        self.bonus = df["Bonus"].fillna(0).to_numpy(dtype=np.float64)
+
+    def labels(self, group_ids):
+        return self.company_names[group_ids // self.n_years], self.year_values[group_ids % self.n_years]
+
+
+def compute_pay_gap_tables(df):
+    g = PayrollGroups(df)
+    n_segments = g.n_groups * N_GENDERS
+    segment = g.group * N_GENDERS + g.gender
+
+    # Quartile bands: rank within the company-year by hourly pay, split in four equal bands
+    order = np.lexsort((g.hourly, g.group))
+    group_sorted = g.group[order]
+    group_counts = np.bincount(g.group, minlength=g.n_groups)
+    rank = np.arange(len(order)) - segment_offsets(group_counts)[group_sorted]
+    band = (N_QUARTILES * rank) // group_counts[group_sorted]
+    mix_keys = (group_sorted * N_QUARTILES + band) * N_GENDERS + g.gender[order]
+    mix = np.bincount(mix_keys, minlength=g.n_groups * N_QUARTILES * N_GENDERS)
+    mix = mix.reshape(g.n_groups, N_QUARTILES, N_GENDERS).astype(np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mix_pct = mix / mix.sum(axis=2, keepdims=True) * 100
+
+    # Hourly pay per (group, gender)
+    employees, mean_pay, median_pay = segment_stats(segment, g.hourly, n_segments)
+
+    # Bonus pay among recipients, and participation
+    paid = g.bonus > 0
+    recipients, mean_bonus, median_bonus = segment_stats(segment[paid], g.bonus[paid], n_segments)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        participation = recipients / employees * 100
+
+    shape = (g.n_groups, N_GENDERS)
+    stats = {
+        "Mean Hourly Pay": mean_pay.reshape(shape),
+        "Median Hourly Pay": median_pay.reshape(shape),
+        "Mean Bonus Pay": mean_bonus.reshape(shape),
+        "Median Bonus Pay": median_bonus.reshape(shape),
+    }
+
+    # Keep only company-years present in the payroll, company-major order
+    present = np.flatnonzero(group_counts)
+    company, year = g.labels(present)
+    tables = pay_gap_frames(
+        company, year, mix_pct[present],
+        {metric: values[present] for metric, values in stats.items()},
+        participation.reshape(shape)[present]
+    )
+
+    # Hourly pay histograms, non-empty fine bins only
+    hist = histogram_counts(segment, g.hourly, n_segments)
+    hist_segment, hist_bin = np.nonzero(hist)
+    hist_company, hist_year = g.labels(hist_segment // N_GENDERS)
+    tables["pay_histogram.csv"] = histogram_frame(hist_company, hist_year, np.array(genders)[hist_segment % N_GENDERS],
+                                                  hist_bin, hist[hist_segment, hist_bin])
+    return tables
+
+
+def pay_gap_frames(company, year, mix_pct, stats, participation, median_error=None):
+    # Arrays are per company-year (n,), per (n, quartile, gender) or per (n, gender)
+    n = len(company)
+    df_quartiles = pd.DataFrame({
+        "Company": np.repeat(company, N_QUARTILES * N_GENDERS),
+        "Year": np.repeat(year, N_QUARTILES * N_GENDERS),
+        "Quartile": np.tile(np.repeat(quartiles, N_GENDERS), n),
+        "Gender": np.tile(genders, n * N_QUARTILES),
+        "Percentage": mix_pct.ravel().round(1),
+    })
+
+    summary = np.stack([stats[m] for m in metrics], axis=1)  # (n, metric, gender)
+    df_summary = pd.DataFrame({
+        "Company": np.repeat(company, len(metrics)),
+        "Year": np.repeat(year, len(metrics)),
+        "Metric": np.tile(metrics, n),
+        "Male": summary[..., 0].ravel().round(2),
+        "Female": summary[..., 1].ravel().round(2),
+    })
+    if median_error is not None:
+        # Relative error bound of sketched figures, read by build_kpi_block in viz.py
+        is_median = np.array([m.startswith("Median") for m in metrics])
+        df_summary["Relative Error (%)"] = np.tile(np.where(is_median, median_error * 100, 0.0), n)
+
+    df_bonus = pd.DataFrame({
+        "Company": np.repeat(company, N_GENDERS),
+        "Year": np.repeat(year, N_GENDERS),
+        "Gender": np.tile(genders, n),
+        "Bonus Participation (%)": participation.ravel().round(1),
+    })
+
+    gaps = {metric: pct_gap(stats[metric][:, 0], stats[metric][:, 1]) for metric in metrics}
+    df_comparison = pd.DataFrame({
+        "Company": company,
+        "Year": year,
+        "Mean Hourly Gap (%)": gaps["Mean Hourly Pay"],
+        "Median Hourly Gap (%)": gaps["Median Hourly Pay"],
+        "Mean Bonus Gap (%)": gaps["Mean Bonus Pay"],
+        "Median Bonus Gap (%)": gaps["Median Bonus Pay"],
+    })
+
+    return {
+        "pay_quartiles.csv": df_quartiles,
+        "pay_gap_summary.csv": df_summary,
+        "bonus_participation.csv": df_bonus,
+        "pay_gap_comparison.csv": df_comparison,
+    }
+
+
+class StreamingPayrollAggregator:
+    # Chunk-by-chunk payroll aggregation: exact counts and sums per segment,
+    # sketched hourly and bonus distributions. Aggregators built on separate
+    # files or processes are combined with merge().
+    def __init__(self, relative_error=DEFAULT_RELATIVE_ERROR):
+        self.relative_error = relative_error
+        self.companies = pd.Index([], dtype=object)
+        # Per segment: employees, hourly pay sum, bonus recipients, bonus sum
+        self.segment_keys = np.zeros(0, dtype=np.int64)
+        self.segment_sums = np.zeros((0, 4), dtype=np.float64)
+        self.hourly = GroupedQuantileSketch(relative_error)
+        self.bonus = GroupedQuantileSketch(relative_error)
+        # Exact hourly pay histograms as sorted (segment * N_FINE_BINS + bin) keys and counts
+        self.hist_keys = np.zeros(0, dtype=np.int64)
+        self.hist_counts = np.zeros(0, dtype=np.int64)
+
+    def encode_companies(self, names):
+        codes = self.companies.get_indexer(names)
+        missing = codes < 0
+        if missing.any():
+            self.companies = self.companies.append(pd.Index(pd.unique(names[missing]), dtype=object))
+            codes[missing] = self.companies.get_indexer(names[missing])
+        return codes.astype(np.int64)
+
+    def update(self, chunk):
+        chunk, gender = encode_gender(chunk)
+        year_slot = chunk["Year"].to_numpy(dtype=np.int64) - YEAR_BASE
+        outside = (year_slot < 0) | (year_slot >= YEAR_SLOTS)
+        if outside.any():
+            raise ValueError(f"Year {chunk['Year'].to_numpy()[outside][0]} is outside the "
+                             f"{YEAR_BASE}-{YEAR_BASE + YEAR_SLOTS - 1} range of the streaming segment keys")
+        company = self.encode_companies(chunk["Company"].astype(str).to_numpy(dtype=object))
+        segment = (company * YEAR_SLOTS + year_slot) * N_GENDERS + gender
+        hourly = chunk["Hourly Pay"].to_numpy(dtype=np.float64)
+        bonus = chunk["Bonus"].fillna(0).to_numpy(dtype=np.float64)
+        paid = bonus > 0
+
+        keys, inverse = np.unique(segment, return_inverse=True)
+        sums = np.column_stack([
+            np.bincount(inverse, minlength=len(keys)),
+            np.bincount(inverse, weights=hourly, minlength=len(keys)),
+            np.bincount(inverse, weights=paid, minlength=len(keys)),
+            np.bincount(inverse, weights=bonus, minlength=len(keys)),
+        ])
+        self.segment_keys, self.segment_sums = sparse_add(self.segment_keys, self.segment_sums, keys, sums)
+        self.hourly.update(segment, hourly)
+        self.bonus.update(segment[paid], bonus[paid])
+        self.hist_keys, self.hist_counts = sparse_add(self.hist_keys, self.hist_counts, *sparse_histogram(segment, hourly))
+        return self
+
+    def merge(self, other):
+        codes = self.encode_companies(other.companies.to_numpy(dtype=object))
+        remap = lambda s: codes[s // SEGMENTS_PER_COMPANY] * SEGMENTS_PER_COMPANY + s % SEGMENTS_PER_COMPANY
+        self.segment_keys, self.segment_sums = sparse_add(self.segment_keys, self.segment_sums,
+                                                          remap(other.segment_keys), other.segment_sums)
+        self.hourly.merge(other.hourly, remap)
+        self.bonus.merge(other.bonus, remap)
+        hist_keys = remap(other.hist_keys // N_FINE_BINS) * N_FINE_BINS + other.hist_keys % N_FINE_BINS
+        self.hist_keys, self.hist_counts = sparse_add(self.hist_keys, self.hist_counts, hist_keys, other.hist_counts)
+        return self
+
+    def tables(self):
+        # Compact ids: company-year groups present in the payroll, company-major order
+        present_groups = np.unique(self.segment_keys // N_GENDERS)
+        n = len(present_groups)
+        compact = lambda s: np.searchsorted(present_groups, s // N_GENDERS) * N_GENDERS + s % N_GENDERS
+        dense = np.zeros((n * N_GENDERS, 4))
+        dense[compact(self.segment_keys)] = self.segment_sums
+        employees, hourly_sum, recipients, bonus_sum = dense.T
+
+        hourly = self.hourly.regroup(compact)
+        bonus = self.bonus.regroup(compact)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            stats = {
+                "Mean Hourly Pay": hourly_sum / employees,
+                "Median Hourly Pay": hourly.quantile(0.5, n * N_GENDERS),
+                "Mean Bonus Pay": bonus_sum / recipients,
+                "Median Bonus Pay": bonus.quantile(0.5, n * N_GENDERS),
+            }
+            participation = recipients / employees * 100
+
+        # Quartile bands from the company-year distribution: values up to the
+        # bucket holding each cut point fall in the lower bands
+        by_group = hourly.regroup(lambda s: s // N_GENDERS)
+        cuts = np.column_stack([by_group.quantile_buckets(q, n) for q in (0.25, 0.5, 0.75)])
+        segments = np.arange(n * N_GENDERS)
+        below = np.column_stack([
+            hourly.count_at_or_below(segments, cuts[segments // N_GENDERS, k]) for k in range(cuts.shape[1])
+        ])
+        cumulative = np.column_stack([np.zeros(len(segments)), below, employees])
+        band_counts = np.diff(cumulative, axis=1).reshape(n, N_GENDERS, N_QUARTILES).transpose(0, 2, 1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mix_pct = band_counts / band_counts.sum(axis=2, keepdims=True) * 100
+
+        company = self.companies.to_numpy()[present_groups // YEAR_SLOTS]
+        year = present_groups % YEAR_SLOTS + YEAR_BASE
+        shape = (n, N_GENDERS)
+        tables = pay_gap_frames(
+            company, year, mix_pct,
+            {metric: values.reshape(shape) for metric, values in stats.items()},
+            participation.reshape(shape), median_error=self.relative_error
+        )
+
+        # Keys are sorted by segment, so the histogram rows follow the same company-year order
+        hist_segment, hist_bin = self.hist_keys // N_FINE_BINS, self.hist_keys % N_FINE_BINS
+        tables["pay_histogram.csv"] = histogram_frame(
+            self.companies.to_numpy()[hist_segment // SEGMENTS_PER_COMPANY],
+            (hist_segment // N_GENDERS) % YEAR_SLOTS + YEAR_BASE,
+            np.array(genders)[hist_segment % N_GENDERS], hist_bin, self.hist_counts)
+        return tables
+
+
+def aggregate_payroll_file(path, relative_error=DEFAULT_RELATIVE_ERROR, chunksize=CHUNK_SIZE):
+    aggregator = StreamingPayrollAggregator(relative_error)
+    for chunk in pd.read_csv(path, usecols=PAYROLL_COLUMNS, dtype=PAYROLL_DTYPES, chunksize=chunksize):
+        aggregator.update(chunk)
+    logging.info(f"Aggregated {int(aggregator.segment_sums[:, 0].sum()):,} payroll rows from {path}")
+    return aggregator
+
+
+def stream_pay_gap_tables(paths, relative_error=DEFAULT_RELATIVE_ERROR, chunksize=CHUNK_SIZE, jobs=1):
+    args = [(path, relative_error, chunksize) for path in paths]
+    if jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            parts = list(pool.map(aggregate_payroll_file, *zip(*args)))
+    else:
+        parts = [aggregate_payroll_file(*a) for a in args]
+    aggregator = parts[0]
+    for part in parts[1:]:
+        aggregator.merge(part)
+    return aggregator.tables()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build pay gap tables from employee-level payroll")
+    parser.add_argument("payroll", nargs="+", help="CSV file(s) with Company, Year, Gender, Hourly Pay, Bonus columns")
+    parser.add_argument("--out-dir", default="data")
+    parser.add_argument("--approx", action="store_true",
+                        help="Stream the payroll in chunks and sketch medians instead of sorting everything in memory")
+    parser.add_argument("--relative-error", type=float, default=DEFAULT_RELATIVE_ERROR,
+                        help="Relative error bound of sketched medians (default: 0.5%%)")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes, one payroll file each")
+    args = parser.parse_args()
+
+    if args.approx:
+        tables = stream_pay_gap_tables(args.payroll, args.relative_error, args.chunksize, args.jobs)
+    else:
+        df_payroll = pd.concat([load_payroll(path) for path in args.payroll], ignore_index=True)
+        logging.info(f"Loaded {len(df_payroll):,} payroll rows")
+        tables = compute_pay_gap_tables(df_payroll)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for fname, df in tables.items():
+        df.to_csv(os.path.join(args.out_dir, fname), index=False)
+        logging.info(f"Wrote {len(df):,} rows to {args.out_dir}/{fname}")
@@ -0,0 +1,120 @@
+# scripts/quantile_sketch.py
+#
+# Mergeable streaming quantile sketch for many groups at once, used by
+# payroll_engine.py --approx for the median pay and bonus figures.
+#
+# Values are mapped to logarithmic buckets (DDSketch style): bucket i covers
+# (min_value * gamma^(i-1), min_value * gamma^i] with gamma = (1 + a) / (1 - a),
+# and a rank lookup returns the bucket midpoint 2 * min_value * gamma^i / (gamma + 1).
+# Quantiles interpolate between ranks floor(q * (n - 1)) and ceil(q * (n - 1))
+# like numpy's default, so the error bound is: every returned quantile is within
+# a relative error `a` of the exact np.quantile(values, q) of its group, whatever
+# the data or the order of updates and merges (for values in [min_value, max_value]).
+# Rounding the result (payroll_engine.py writes cents) can add up to half a cent
+# on top of the bound.
+#
+# Counts are stored sparsely as sorted (group * span + bucket) keys, so memory
+# grows with the number of occupied buckets, not with the number of rows, and
+# merging two sketches (e.g. from worker processes) is a keyed sum.
+
+import math
+import numpy as np
+
+DEFAULT_RELATIVE_ERROR = 0.005
+MIN_VALUE, MAX_VALUE = 0.01, 1e9
+
+
+def sparse_add(keys_a, values_a, keys_b, values_b):
+    # Merge two sorted-unique key arrays, summing the value rows of equal keys
+    keys = np.concatenate([keys_a, keys_b])
+    values = np.concatenate([values_a, values_b])
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    if values.ndim == 1:
+        summed = np.bincount(inverse, weights=values, minlength=len(unique_keys))
+    else:
+        summed = np.column_stack([
+            np.bincount(inverse, weights=values[:, j], minlength=len(unique_keys)) for j in range(values.shape[1])
+        ])
+    return unique_keys, summed.astype(values.dtype)
+
+
+class GroupedQuantileSketch:
+    def __init__(self, relative_error=DEFAULT_RELATIVE_ERROR, min_value=MIN_VALUE, max_value=MAX_VALUE):
+        self.relative_error = relative_error
+        self.min_value = min_value
+        self.max_value = max_value
+        self.gamma = (1 + relative_error) / (1 - relative_error)
+        self.log_gamma = math.log(self.gamma)
+        self.span = int(math.ceil(math.log(max_value / min_value) / self.log_gamma)) + 1
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    def bucket(self, values):
+        clipped = np.clip(values, self.min_value, self.max_value)
+        return np.ceil(np.log(clipped / self.min_value) / self.log_gamma).astype(np.int64)
+
+    def bucket_value(self, buckets):
+        return np.where(buckets == 0, self.min_value,
+                        self.min_value * 2 * np.power(self.gamma, buckets) / (self.gamma + 1))
+
+    def update(self, groups, values):
+        # Missing values are skipped rather than cast into a bucket
+        values = np.asarray(values, dtype=np.float64)
+        finite = np.isfinite(values)
+        if not finite.all():
+            groups, values = np.asarray(groups)[finite], values[finite]
+        if len(values) == 0:
+            return self
+        keys, counts = np.unique(np.asarray(groups, dtype=np.int64) * self.span + self.bucket(values), return_counts=True)
+        self.keys, self.counts = sparse_add(self.keys, self.counts, keys, counts.astype(np.int64))
+        return self
+
+    def merge(self, other, remap=None):
+        # remap(group_ids) re-encodes the other sketch's groups into this sketch's ids
+        if (other.relative_error, other.min_value, other.max_value) != (self.relative_error, self.min_value, self.max_value):
+            raise ValueError("Cannot merge sketches built with different parameters")
+        keys = other.keys
+        if remap is not None:
+            keys = np.asarray(remap(keys // other.span), dtype=np.int64) * self.span + keys % other.span
+        self.keys, self.counts = sparse_add(self.keys, self.counts, keys, other.counts)
+        return self
+
+    def regroup(self, remap):
+        # New sketch with groups re-encoded or combined (e.g. dropping gender)
+        combined = GroupedQuantileSketch(self.relative_error, self.min_value, self.max_value)
+        return combined.merge(self, remap)
+
+    def totals(self, n_groups):
+        return np.bincount(self.keys // self.span, weights=self.counts, minlength=n_groups).astype(np.int64)
+
+    def _rank_positions(self, rank, totals):
+        # Index into self.keys of the bucket holding the given 0-based rank of each group
+        before = np.concatenate([[0], np.cumsum(totals)[:-1]])
+        positions = np.searchsorted(np.cumsum(self.counts), before + rank + 1, side="left")
+        return np.minimum(positions, max(len(self.keys) - 1, 0))
+
+    def quantile_buckets(self, q, n_groups):
+        # Bucket holding rank floor(q * (n - 1)) of each group, -1 for empty groups
+        totals = self.totals(n_groups)
+        if len(self.keys) == 0:
+            return np.full(n_groups, -1, dtype=np.int64)
+        rank = np.floor(q * np.maximum(totals - 1, 0)).astype(np.int64)
+        return np.where(totals > 0, self.keys[self._rank_positions(rank, totals)] % self.span, -1)
+
+    def quantile(self, q, n_groups):
+        totals = self.totals(n_groups)
+        if len(self.keys) == 0:
+            return np.full(n_groups, np.nan)
+        pos = q * np.maximum(totals - 1, 0)
+        lo, hi = np.floor(pos).astype(np.int64), np.ceil(pos).astype(np.int64)
+        v_lo = self.bucket_value(self.keys[self._rank_positions(lo, totals)] % self.span)
+        v_hi = self.bucket_value(self.keys[self._rank_positions(hi, totals)] % self.span)
+        return np.where(totals > 0, v_lo + (pos - lo) * (v_hi - v_lo), np.nan)
+
+    def count_at_or_below(self, groups, buckets):
+        # Number of values of each group that fall in buckets <= the given bucket
+        groups = np.asarray(groups, dtype=np.int64)
+        cum = np.concatenate([[0], np.cumsum(self.counts)])
+        upper = np.searchsorted(self.keys, groups * self.span + buckets, side="right")
+        lower = np.searchsorted(self.keys, groups * self.span, side="left")
+        return np.where(buckets >= 0, cum[upper] - cum[lower], 0)
@@ -0,0 +1,111 @@
+# scripts/retention_aggregator.py
+#
+# Streaming mean of retention_heatmap.csv per (Company, Year, Quartile, Gender)
+# without loading the monthly file into one DataFrame.
+#
+# The file is read in chunks; each chunk's key columns are dictionary-encoded,
+# packed into one integer key per row and mapped to dense group ids, and running
+# sums and counts are accumulated with np.add.at. Memory is bounded by the
+# number of groups, not rows. Groups are numbered in order of first appearance
+# and missing values are skipped, so means() matches
+# df.groupby(keys, sort=False)["Retention (%)"].mean().reset_index().
+
+import numpy as np
+import pandas as pd
+
+RETENTION_KEYS = ["Company", "Year", "Quartile", "Gender"]
+RETENTION_VALUE = "Retention (%)"
+# Text keys are read as categories; Year stays numeric like in load_data
+TEXT_KEYS = ["Company", "Quartile", "Gender", "Month"]
+CHUNK_SIZE = 500_000
+
+
+class RetentionAggregator:
+    def __init__(self, keys=RETENTION_KEYS, value=RETENTION_VALUE):
+        self.keys = list(keys)
+        self.value = value
+        self.labels = [pd.Index([]) for _ in self.keys]
+        # Per group: key codes, running sum and count of non-missing values
+        self.codes = np.zeros((0, len(self.keys)), dtype=np.int64)
+        # Extended precision keeps the running sums as close as pandas' compensated groupby mean
+        self.sums = np.zeros(0, dtype=np.longdouble)
+        self.counts = np.zeros(0, dtype=np.int64)
+        # Packed key -> group id lookup, packed with a power-of-two radix per key
+        self.bits = [4] * len(self.keys)
+        self.sorted_keys = np.zeros(0, dtype=np.int64)
+        self.sorted_ids = np.zeros(0, dtype=np.int64)
+
+    def encode(self, j, values):
+        # Codes of one key column in the growing label dictionary (-1 for missing)
+        values = values.astype("category")
+        categories = values.cat.categories
+        lookup = self.labels[j].get_indexer(categories)
+        new = lookup < 0
+        if new.any():
+            self.labels[j] = categories[new] if len(self.labels[j]) == 0 else self.labels[j].append(categories[new])
+            lookup[new] = self.labels[j].get_indexer(categories[new])
+        return np.append(lookup, -1)[values.cat.codes.to_numpy()].astype(np.int64)
+
+    def pack(self, codes):
+        shifts = np.concatenate([[0], np.cumsum(self.bits[:-1])]).astype(np.int64)
+        return (codes << shifts).sum(axis=1)
+
+    def reindex(self):
+        # Widen a radix that its dictionary has outgrown and rebuild the lookup
+        for j, labels in enumerate(self.labels):
+            while len(labels) > 1 << self.bits[j]:
+                self.bits[j] += 4
+        if sum(self.bits) > 63:
+            raise ValueError(f"Too many distinct {', '.join(self.keys)} values to pack into one key")
+        packed = self.pack(self.codes)
+        self.sorted_ids = np.argsort(packed, kind="stable")
+        self.sorted_keys = packed[self.sorted_ids]
+
+    def group_ids(self, codes):
+        if any(len(labels) > 1 << bits for labels, bits in zip(self.labels, self.bits)):
+            self.reindex()
+        packed = self.pack(codes)
+        keys, first, inverse = np.unique(packed, return_index=True, return_inverse=True)
+        pos = np.minimum(np.searchsorted(self.sorted_keys, keys), max(len(self.sorted_keys) - 1, 0))
+        found = (self.sorted_keys[pos] == keys) if len(self.sorted_keys) else np.zeros(len(keys), dtype=bool)
+        ids = np.where(found, self.sorted_ids[pos] if len(self.sorted_ids) else 0, -1)
+
+        # New groups get the next ids in order of first appearance in the chunk
+        new = np.flatnonzero(~found)
+        if len(new):
+            new = new[np.argsort(first[new], kind="stable")]
+            ids[new] = len(self.sums) + np.arange(len(new))
+            self.codes = np.concatenate([self.codes, codes[first[new]]])
+            self.sums = np.concatenate([self.sums, np.zeros(len(new), dtype=np.longdouble)])
+            self.counts = np.concatenate([self.counts, np.zeros(len(new), dtype=np.int64)])
+            self.reindex()
+        return ids[inverse]
+
+    def update(self, chunk):
+        if chunk.empty:
+            return self
+        codes = np.column_stack([self.encode(j, chunk[key]) for j, key in enumerate(self.keys)])
+        # Rows with a missing key are dropped, as groupby does
+        keep = (codes >= 0).all(axis=1)
+        values = chunk[self.value].to_numpy(dtype=np.float64)[keep]
+        ids = self.group_ids(codes[keep])
+        present = ~np.isnan(values)
+        np.add.at(self.sums, ids[present], values[present])
+        np.add.at(self.counts, ids[present], 1)
+        return self
+
+    def means(self):
+        df = pd.DataFrame({key: self.labels[j][self.codes[:, j]] for j, key in enumerate(self.keys)})
+        with np.errstate(invalid="ignore", divide="ignore"):
+            df[self.value] = self.sums.astype(np.float64) / self.counts
+        return df
+
+
+def read_retention(path, aggregators, chunksize=CHUNK_SIZE):
+    # One pass over the file feeding every aggregator, e.g. per group and per group-month
+    usecols = sorted({key for agg in aggregators for key in agg.keys} | {RETENTION_VALUE})
+    dtypes = {key: "category" for key in usecols if key in TEXT_KEYS}
+    for chunk in pd.read_csv(path, usecols=usecols, dtype=dtypes, chunksize=chunksize):
+        for agg in aggregators:
+            agg.update(chunk)
+    return aggregators
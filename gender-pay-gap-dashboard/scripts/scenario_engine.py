@@ -0,0 +1,199 @@
+# scripts/scenario_engine.py
+#
+# Monte Carlo "what-if" scenarios for pay gap policies, on the quartile and
+# bonus model of data_gen.py: a gender's mean pay is its quartile shares times
+# the quartile salaries, and its mean bonus the quartile shares times the
+# quartile bonuses times bonus participation.
+#
+# A policy moves female bonus participation and/or the female share of some
+# quartiles by a number of points, e.g. "+10 points female participation in
+# Q3/Q4". Each of the --scenarios draws those moves with uncertainty
+# (normal, --sd points), and every draw is applied to every company-year from
+# pay_quartiles.csv and bonus_participation.csv in one broadcast
+# (scenario, company-year, quartile) computation, in blocks of company-years to
+# bound memory. The resulting mean hourly and bonus gaps are summarized per
+# company-year as a histogram plus the baseline and median gap, written to
+# scenario_gaps.csv, which viz.py and dash_viz.py show as a scenario card.
+# A gap against a zero male figure (e.g. no male bonus recipients) is
+# undefined: such scenarios are left out, and a metric without any defined
+# scenario is not written for that company-year.
+#
+# Usage (from the dashboard folder):
+#   python scripts/scenario_engine.py --participation Q3=10 Q4=10 --sd 3
+#   python scripts/scenario_engine.py --share Q1=5 --scenarios 10000 --year 2023
+
+import os
+import time
+import argparse
+import logging
+import numpy as np
+import pandas as pd
+
+from data_gen import quartiles, genders, SALARY, BONUS
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+
+N_SCENARIOS = 10_000
+N_BINS = 30
+SCENARIO_METRICS = ["Mean Hourly Gap (%)", "Mean Bonus Gap (%)"]
+# Floats per (scenario, company-year, quartile) working array in one block
+BLOCK_ELEMENTS = 1_000_000
+
+
+def parse_moves(moves):
+    # ["Q3=10", "Q4=10"] -> points per quartile in `quartiles` order
+    points = np.zeros(len(quartiles))
+    for move in moves or []:
+        name, _, value = move.partition("=")
+        matches = [i for i, q in enumerate(quartiles) if q.split(" ")[0] == name.strip()]
+        if not matches or not value:
+            raise ValueError(f"Expected a quartile move like Q3=10, got {move!r}")
+        points[matches[0]] = float(value)
+    return points
+
+
+def scenario_inputs(df_quart, df_bonus, year=None):
+    # Female share per quartile (n, quartile) and participation (n, gender) per company-year
+    female = df_quart[df_quart["Gender"] == "Female"].pivot_table(
+        index=["Company", "Year"], columns="Quartile", values="Percentage")
+    participation = df_bonus.pivot_table(
+        index=["Company", "Year"], columns="Gender", values="Bonus Participation (%)")
+    keys = female.index.intersection(participation.index)
+    if year is not None:
+        keys = keys[keys.get_level_values("Year") == year]
+    share = female.reindex(index=keys, columns=quartiles).fillna(0).to_numpy() / 100
+    return keys, share, participation.reindex(index=keys, columns=genders).to_numpy()
+
+
+def sample_scenarios(n_scenarios, participation_points, share_points, sd, rng):
+    # (scenario, quartile) moves; only quartiles with a move get uncertainty
+    def draw(points):
+        noise = rng.normal(0, sd, size=(n_scenarios, len(points))) if sd > 0 else 0
+        return np.where(points != 0, points + noise, 0.0)
+    return draw(participation_points), draw(share_points)
+
+
+def scenario_gaps(share, participation, participation_moves, share_moves):
+    # Gaps for every scenario x company-year: (scenario, n) arrays per metric
+    # (s, n, q) working arrays, updated in place to keep memory traffic down
+    female = share[None] + share_moves[:, None] / 100
+    np.clip(female, 0, 1, out=female)
+    female_bonus = participation[None, :, 1, None] + participation_moves[:, None]
+    np.clip(female_bonus, 0, 100, out=female_bonus)
+    female_bonus *= female
+
+    # Quartile sums as one 2-D matrix-vector product each; male shares are 1 - female
+    def quartile_sum(values, weights):
+        return (values.reshape(-1, values.shape[-1]) @ weights).reshape(values.shape[:2])
+    pay_f = quartile_sum(female, SALARY)
+    pay_m = SALARY.sum() - pay_f
+    bonus_m = (BONUS.sum() - quartile_sum(female, BONUS)) * participation[None, :, 0] / 100
+    bonus_f = quartile_sum(female_bonus, BONUS) / 100
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return {
+            "Mean Hourly Gap (%)": (pay_m - pay_f) / pay_m * 100,
+            "Mean Bonus Gap (%)": (bonus_m - bonus_f) / bonus_m * 100,
+        }
+
+
+def histograms(values, n_bins=N_BINS):
+    # Per-column histograms of a (scenario, n) array over each column's own range, in one bincount.
+    # NaN entries are skipped; a column without any value gets NaN edges and zero counts
+    ok = ~np.isnan(values)
+    empty = ~ok.any(axis=0)
+    lo = np.where(empty, 0.0, np.where(ok, values, np.inf).min(axis=0))
+    hi = np.where(empty, 0.0, np.where(ok, values, -np.inf).max(axis=0))
+    width = np.where(hi > lo, (hi - lo) / n_bins, 1.0)
+    bins = np.clip(((np.where(ok, values, lo) - lo) / width).astype(np.int64), 0, n_bins - 1)
+    keys = np.broadcast_to(np.arange(values.shape[1]) * n_bins, values.shape)[ok] + bins[ok]
+    counts = np.bincount(keys, minlength=values.shape[1] * n_bins).reshape(values.shape[1], n_bins)
+    edges = lo[:, None] + width[:, None] * np.arange(n_bins + 1)
+    edges[empty] = np.nan
+    return counts, edges
+
+
+def column_medians(values):
+    # Median of the non-NaN entries of each column, NaN for a column without any
+    ok = ~np.isnan(values)
+    medians = np.full(values.shape[1], np.nan)
+    filled = ok.any(axis=0)
+    medians[filled] = np.nanmedian(values[:, filled], axis=0)
+    return medians
+
+
+def defined(values):
+    # Gaps against a zero male figure come out as +-inf (or NaN for 0 / 0); mask them all as NaN
+    return np.where(np.isfinite(values), values, np.nan)
+
+
+def run_scenarios(share, participation, participation_moves, share_moves, n_bins=N_BINS):
+    # Histogram, baseline and median of each metric per company-year, block by block
+    n_scenarios, n = len(participation_moves), len(share)
+    block = max(1, BLOCK_ELEMENTS // (n_scenarios * len(quartiles)))
+    no_move = np.zeros((1, len(quartiles)))
+    out = {metric: {"counts": [], "edges": [], "baseline": [], "median": []} for metric in SCENARIO_METRICS}
+    for start in range(0, n, block):
+        rows = slice(start, start + block)
+        gaps = scenario_gaps(share[rows], participation[rows], participation_moves, share_moves)
+        baseline = scenario_gaps(share[rows], participation[rows], no_move, no_move)
+        for metric, values in gaps.items():
+            values = defined(values)
+            counts, edges = histograms(values, n_bins)
+            out[metric]["counts"].append(counts)
+            out[metric]["edges"].append(edges)
+            out[metric]["baseline"].append(defined(baseline[metric][0]))
+            out[metric]["median"].append(column_medians(values))
+    return {metric: {k: np.concatenate(v) for k, v in parts.items()} for metric, parts in out.items()}
+
+
+def scenario_frame(keys, results, n_bins=N_BINS):
+    frames = []
+    n = len(keys)
+    for metric, r in results.items():
+        # Company-years where this gap is undefined in every scenario are left out
+        present = np.repeat(~np.isnan(r["edges"][:, 0]), n_bins)
+        frames.append(pd.DataFrame({
+            "Company": np.repeat(keys.get_level_values("Company"), n_bins),
+            "Year": np.repeat(keys.get_level_values("Year"), n_bins),
+            "Metric": metric,
+            "Bin Start": r["edges"][:, :-1].ravel().round(3),
+            "Bin End": r["edges"][:, 1:].ravel().round(3),
+            "Scenarios": r["counts"].ravel(),
+            "Baseline": np.repeat(r["baseline"], n_bins).round(2),
+            "Median": np.repeat(r["median"], n_bins).round(2),
+        })[present])
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo pay gap policy scenarios per company-year")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--participation", nargs="*", metavar="Q=POINTS",
+                        help="Female bonus participation change per quartile, e.g. Q3=10 Q4=10")
+    parser.add_argument("--share", nargs="*", metavar="Q=POINTS",
+                        help="Female share change per quartile, e.g. Q1=5")
+    parser.add_argument("--sd", type=float, default=3.0, help="Uncertainty of each move, in points")
+    parser.add_argument("--scenarios", type=int, default=N_SCENARIOS)
+    parser.add_argument("--year", type=int, default=None, help="Only company-years of this year")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.participation is None and args.share is None:
+        args.participation = ["Q3=10", "Q4=10"]
+    participation_points = parse_moves(args.participation)
+    share_points = parse_moves(args.share)
+    df_quart = pd.read_csv(os.path.join(args.data_dir, "pay_quartiles.csv"))
+    df_bonus = pd.read_csv(os.path.join(args.data_dir, "bonus_participation.csv"))
+    keys, share, participation = scenario_inputs(df_quart, df_bonus, args.year)
+
+    start = time.perf_counter()
+    participation_moves, share_moves = sample_scenarios(
+        args.scenarios, participation_points, share_points, args.sd, np.random.default_rng(args.seed))
+    results = run_scenarios(share, participation, participation_moves, share_moves)
+    logging.info(f"Evaluated {args.scenarios:,} scenarios x {len(keys):,} company-years "
+                 f"in {time.perf_counter() - start:.2f}s")
+
+    df = scenario_frame(keys, results)
+    df.to_csv(os.path.join(args.data_dir, "scenario_gaps.csv"), index=False)
+    logging.info(f"Wrote {len(df):,} rows to {args.data_dir}/scenario_gaps.csv")
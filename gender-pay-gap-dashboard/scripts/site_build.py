@@ -0,0 +1,358 @@
+# scripts/site_build.py
+#
+# Static site with one small page per employer, for registers too large for a
+# single dashboard file. CSS, the dashboard script and plotly.js are written
+# once to assets/ and referenced by every page; charts hydrate lazily as in
+# viz.py. The index page embeds a sorted company list that is searched by
+# prefix with a binary search instead of a <select> with thousands of options.
+#
+# Pages are rendered in parallel worker processes, and a manifest of per-company
+# content hashes means a rebuild only rewrites the companies whose rows (or the
+# page templates) changed.
+#
+# Usage (from the dashboard folder):
+#   python scripts/site_build.py --jobs 4
+#   python scripts/site_build.py --out-dir outputs/site --force
+
+import os
+import re
+import ast
+import json
+import html
+import hashlib
+import argparse
+import logging
+import numpy as np
+import pandas as pd
+from plotly.offline import get_plotlyjs, get_plotlyjs_version
+
+from data_context import DATA_FILES, GenderDataContext, map_with_context
+from viz import (base_css, card_css, tti_js, lazy_hydration_js, build_section,
+                 year_default)
+
+MANIFEST = "manifest.json"
+SEARCH_LIMIT = 50
+
+site_css = """
+        .filter-bar a {
+            color: #4e73df;
+            font-weight: 600;
+            text-decoration: none;
+        }
+
+        .company-search {
+            width: 100%;
+            max-width: 480px;
+            padding: 8px 12px;
+            border: 1px solid #ccc;
+            border-radius: 6px;
+            font-size: 18px;
+        }
+
+        .company-list {
+            list-style: none;
+            padding: 0;
+            columns: 2;
+        }
+
+        .company-list li {
+            padding: 4px 0;
+        }
+
+        .match-count {
+            font-size: 13px;
+            color: #999;
+            margin-top: 8px;
+        }
+"""
+
+search_js = """
+(function() {
+    // Entries are [lowercase name, name, href], sorted by lowercase name
+    const entries = JSON.parse(document.getElementById("company-index").textContent);
+    const input = document.getElementById("companySearch");
+    const list = document.getElementById("companyResults");
+    const count = document.getElementById("matchCount");
+    const limit = Number(list.dataset.limit);
+
+    function lowerBound(key) {
+        let lo = 0, hi = entries.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (entries[mid][0] < key) lo = mid + 1; else hi = mid;
+        }
+        return lo;
+    }
+
+    function escapeHtml(text) {
+        const div = document.createElement("div");
+        div.textContent = text;
+        return div.innerHTML;
+    }
+
+    function render() {
+        const prefix = input.value.trim().toLowerCase();
+        const start = lowerBound(prefix);
+        const end = lowerBound(prefix + "\\uffff");
+        list.innerHTML = entries.slice(start, Math.min(end, start + limit)).map(function(entry) {
+            return `<li><a href="${entry[2]}">${escapeHtml(entry[1])}</a></li>`;
+        }).join("");
+        count.textContent = `${end - start} employers` + (end - start > limit ? `, showing the first ${limit}` : "");
+    }
+
+    input.addEventListener("input", render);
+    render();
+})();
+"""
+
+COMPANY_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title} – Ireland Gender Pay Gap Dashboard</title>
+    <link rel="stylesheet" href="../assets/dashboard.css">
+    <script src="../assets/{plotly_js}"></script>
+    <script src="../assets/dashboard.js"></script>
+</head>
+<body class="bg-light p-4" data-company="{title}">
+    <div class="dashboard-title">{title}</div>
+    <div class="filter-bar">
+        <a href="../index.html">&larr; All employers</a>
+        <label for='yearToggle'>Select Year:</label>
+        <select id='yearToggle' onchange='updateCards()'>{options}</select>
+    </div>
+    {sections}
+    {table}
+    <footer>
+        <div style="text-align:center; margin-top:20px; font-size:12px; color:gray;">
+        © 2025 Ireland Gender Pay Gap Analysis. Powered by Plotly.
+        </div>
+    </footer>
+</body>
+</html>
+"""
+
+INDEX_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Ireland Gender Pay Gap Dashboard</title>
+    <link rel="stylesheet" href="assets/dashboard.css">
+</head>
+<body class="bg-light p-4">
+    <div class="dashboard-title">Ireland Gender Pay Gap Dashboard</div>
+    <div class="card static-card">
+        <label for="companySearch" class="summary-title">Search employers ({count})</label><br>
+        <input id="companySearch" class="company-search" type="search" placeholder="Type the start of a company name" autocomplete="off">
+        <div id="matchCount" class="match-count"></div>
+        <ul id="companyResults" class="company-list" data-limit="{limit}"></ul>
+    </div>
+    <script type="application/json" id="company-index">{index_json}</script>
+    <script src="assets/search.js"></script>
+</body>
+</html>
+"""
+
+
+def slugify(name):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "company"
+
+
+def company_slugs(companies):
+    # File name per company, made unique in sorted order so it is stable across builds
+    slugs, used = {}, set()
+    for company in sorted(companies):
+        base = slug = slugify(company)
+        n = 2
+        while slug in used:
+            slug, n = f"{base}-{n}", n + 1
+        used.add(slug)
+        slugs[company] = slug
+    return slugs
+
+
+def local_imports(here, name):
+    # scripts/ modules imported by one script, so new rendering helpers are picked up
+    with open(os.path.join(here, name), "rb") as f:
+        tree = ast.parse(f.read())
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.add(node.module)
+    return {f"{module}.py" for module in modules if os.path.isfile(os.path.join(here, f"{module}.py"))}
+
+
+def template_key():
+    # Page output also depends on the rendering code (this script and every
+    # scripts/ module it pulls in, transitively) and the plotly version
+    digest = hashlib.sha1(get_plotlyjs_version().encode())
+    here = os.path.dirname(os.path.abspath(__file__))
+    seen, pending = set(), ["site_build.py"]
+    while pending:
+        name = pending.pop()
+        if name not in seen:
+            seen.add(name)
+            pending.extend(local_imports(here, name))
+    for name in sorted(seen):
+        with open(os.path.join(here, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def company_digests(data):
+    # (company, frame) matrix of 64-bit content hashes over each company's rows
+    companies = pd.Index(data.companies)
+    digests = np.zeros((len(companies), len(DATA_FILES)), dtype=np.uint64)
+    for j, name in enumerate(DATA_FILES):
+        df = data.frames[name]
+        if df.empty or "Company" not in df.columns:
+            continue
+        codes = companies.get_indexer(df["Company"])
+        rows = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        keep = codes >= 0
+        order = np.argsort(codes[keep], kind="stable")
+        codes, rows = codes[keep][order], rows[keep][order]
+        if len(codes) == 0:
+            continue
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        pos = np.arange(len(codes)) - np.repeat(starts, np.diff(np.r_[starts, len(codes)]))
+        # Odd position weights keep the sum sensitive to row order and duplicates
+        mixed = rows * (2 * pos.astype(np.uint64) + np.uint64(1))
+        digests[codes[starts], j] = np.add.reduceat(mixed, starts)
+    return digests
+
+
+def page_hashes(data):
+    key = template_key().encode()
+    digests = company_digests(data)
+    return {company: hashlib.sha1(key + digests[i].tobytes()).hexdigest()
+            for i, company in enumerate(data.companies)}
+
+
+def company_table(df_comp):
+    if df_comp is None or df_comp.empty:
+        return ""
+    columns = [col for col in df_comp.columns if col != "Company"]
+    headers = "".join(f"<th>{html.escape(col)}</th>" for col in columns)
+    rows = "".join(
+        "<tr>" + "".join(f"<td>{value}%</td>" if "%" in col else f"<td>{html.escape(str(value))}</td>"
+                         for col, value in zip(columns, values)) + "</tr>"
+        for values in df_comp[columns].itertuples(index=False)
+    )
+    return f"""
+    <div class="card static-card">
+        <h3 style='margin:10px; text-align: center;'>Pay Gap by Year</h3>
+        <table class="bonus-table">
+            <thead><tr>{headers}</tr></thead>
+            <tbody>{rows}</tbody>
+        </table>
+    </div>
+    """
+
+
+def render_company_page(data, job):
+    company, path, plotly_js = job
+    parts = [data.partition(year, company) for year in data.years]
+    parts = [part for part in parts if not part.gap.empty] or parts
+    years = [part.year for part in parts]
+    selected = year_default if year_default in years else years[-1]
+    options = "".join(f"<option value='{year}' {'selected' if year == selected else ''}>{year}</option>" for year in years)
+    page = COMPANY_PAGE.format(
+        title=html.escape(company),
+        plotly_js=plotly_js,
+        options=options,
+        sections="".join(build_section(part, lazy=True) for part in parts),
+        table=company_table(data.comp_by_company.get(company)),
+    )
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(page)
+    return path
+
+
+def write_if_changed(path, text):
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            if f.read() == text:
+                return False
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return True
+
+
+def write_assets(out_dir):
+    assets = os.path.join(out_dir, "assets")
+    os.makedirs(assets, exist_ok=True)
+    plotly_js = f"plotly-{get_plotlyjs_version()}.min.js"
+    if not os.path.exists(os.path.join(assets, plotly_js)):
+        write_if_changed(os.path.join(assets, plotly_js), get_plotlyjs())
+    write_if_changed(os.path.join(assets, "dashboard.css"), base_css + card_css + site_css)
+    write_if_changed(os.path.join(assets, "dashboard.js"), tti_js + lazy_hydration_js)
+    write_if_changed(os.path.join(assets, "search.js"), search_js)
+    return plotly_js
+
+
+def write_index(out_dir, slugs):
+    entries = sorted([company.lower(), company, f"companies/{slug}.html"] for company, slug in slugs.items())
+    index_json = json.dumps(entries, separators=(",", ":"), ensure_ascii=False).replace("</", "<\\/")
+    page = INDEX_PAGE.format(count=len(entries), limit=SEARCH_LIMIT, index_json=index_json)
+    write_if_changed(os.path.join(out_dir, "index.html"), page)
+
+
+def load_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_site(data, out_dir="outputs/site", jobs=1, data_dir="data", force=False):
+    pages_dir = os.path.join(out_dir, "companies")
+    os.makedirs(pages_dir, exist_ok=True)
+    plotly_js = write_assets(out_dir)
+
+    slugs = company_slugs(data.companies)
+    hashes = page_hashes(data)
+    previous = {} if force else load_manifest(out_dir)
+
+    jobs_list = []
+    for company in data.companies:
+        path = os.path.join(pages_dir, f"{slugs[company]}.html")
+        entry = previous.get(company)
+        if entry != {"slug": slugs[company], "hash": hashes[company]} or not os.path.exists(path):
+            jobs_list.append((company, path, plotly_js))
+
+    # Pages of companies no longer in the data
+    current_slugs = set(slugs.values())
+    for entry in previous.values():
+        if entry["slug"] not in current_slugs:
+            stale = os.path.join(pages_dir, f"{entry['slug']}.html")
+            if os.path.exists(stale):
+                os.remove(stale)
+
+    chunksize = max(1, len(jobs_list) // (max(jobs, 1) * 8))
+    map_with_context(data, render_company_page, jobs_list, jobs, data_dir, chunksize)
+    write_index(out_dir, slugs)
+
+    # Written last, so an interrupted build re-renders whatever it did not record
+    manifest = {company: {"slug": slugs[company], "hash": hashes[company]} for company in data.companies}
+    with open(os.path.join(out_dir, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, ensure_ascii=False)
+    return len(jobs_list)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a per-company static gender pay gap site")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--out-dir", default="outputs/site")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes rendering pages")
+    parser.add_argument("--force", action="store_true", help="Re-render every page, ignoring the manifest")
+    args = parser.parse_args()
+
+    data = GenderDataContext.load(args.data_dir)
+    rendered = build_site(data, args.out_dir, args.jobs, args.data_dir, args.force)
+    logging.info(f"Rendered {rendered} of {len(data.companies)} company pages into {args.out_dir}")
@@ -1,39 +1,25 @@
 import os
+import json
+import html
+import base64
+import calendar
+import argparse
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 import plotly.colors as pc
 from plotly.io import to_html
+from plotly.offline import get_plotlyjs_version
 import logging
 
+from data_context import GenderDataContext, iter_with_context
+from comparison_table import comparison_table_html
+from pay_histogram import rebin
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 
-
-# Helper function for loading CSV files safely
-def load_data(path):
-    try:
-        df = pd.read_csv(path)
-        logging.info(f"Successfully loaded {path}")
-        return df
-    except Exception as e:
-        logging.error(f"Failed to load {path}: {e}")
-        return pd.DataFrame()
-    
-os.makedirs("outputs", exist_ok=True)
-
-# Load CSV data
-df_gap = load_data("data/pay_gap_summary.csv")
-df_quart = load_data("data/pay_quartiles.csv")
-df_bonus = load_data("data/bonus_participation.csv")
-df_sankey = load_data("data/sankey_flow.csv")
-df_comp = load_data("data/pay_gap_comparison.csv")
-df_retention_heatmap = load_data("data/retention_heatmap.csv")
-
-
-companies = df_gap["Company"].unique().tolist()
-years = df_gap["Year"].unique().tolist()
-
 # --- Commmon Style ---
 FONT_FAMILY = "Segoe UI, Helvetica Neue, Arial, sans-serif"
 # --- Legend Style ---
@@ -58,35 +44,93 @@ def wrap_plotly(fig, include_plotlyjs=False):
     html_content = f'<div class="plotly-inner" >{html_chart}</div>'
     
     return html_content
+
+def embed_figure(fig):
+    # Inert figure spec; the page script creates the chart once its card is visible
+    spec = fig.to_json().replace("</", "<\\/")
+    return (f'<div class="plotly-inner"><div class="lazy-chart" style="height:100%; width:100%;">'
+            f'<script type="application/json" class="figure-spec">{spec}</script></div></div>')
  
-def build_kpi_block(year, company):
-    # Filter by selected year and company
-    summary = df_gap[(df_gap["Year"] == year) & (df_gap["Company"] == company)]
-    
-    card_html = '<div class="card-grid">'
+KPI_METRICS = ["Mean Hourly Pay", "Median Hourly Pay", "Mean Bonus Pay", "Median Bonus Pay"]
+KPI_TITLES = ["Mean Pay Gap", "Median Pay Gap", "Mean Bonus Gap", "Median Bonus Gap"]
+# Order matters: Q4 is lowest, Q1 is highest
+QUARTILE_ORDER = ["Q4 - Lower", "Q3 - Lower Mid", "Q2 - Upper Mid", "Q1 - Upper"]
+
+# Chart titles, filled in with the selected year and company
+QUARTILE_TITLE = "<b>Proportion of men and women in each pay quartile ({year}) – {company}</b>"
+SANKEY_TITLE = "<b>Pay Flow Sankey (Breakdown) ({year}) – {company}</b>"
+TREEMAP_TITLE = "<b>Pay Flow Treemap ({year}) – {company}</b>"
+HEATMAP_TITLE = "<b>Quartile Heatmap ({year}) – {company}</b>"
+SCENARIO_TITLE = "<b>Policy Scenarios: Distribution of Gaps ({year}) – {company}</b>"
+HISTOGRAM_TITLE = "<b>Hourly Pay Distribution ({year}) – {company}</b>"
+
+# Define professional color maps
+SOURCE_COLOR_MAP = {
+    "Q1 - Upper": "#6BAED6",
+    "Q2 - Upper Mid": "#9ECAE1",
+    "Q3 - Lower Mid": "#C6DBEF",
+    "Q4 - Lower": "#DEEBF7"
+}
+TARGET_COLOR_MAP = {
+    "Bonus": "#4CAF50",
+    "No Bonus": "#FFC107",
+    "Exit": "#F44336"
+}
+
+
+def node_color(label):
+    return SOURCE_COLOR_MAP.get(label, TARGET_COLOR_MAP.get(label, "#B0BEC5"))
+
+
+def rgba(hex_color, opacity=0.4):
+    hex_color = hex_color.lstrip("#")
+    r, g, b = tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+    return f"rgba({r},{g},{b},{opacity})"
+
+
+def kpi_values(part):
+    # (title, gap %, error bound in points or None) for each metric present
+    summary = part.gap
+    values = []
     # Match metric name to readable title
-    for metric, title in zip(
-        ["Mean Hourly Pay", "Median Hourly Pay", "Mean Bonus Pay", "Median Bonus Pay"],
-        ["Mean Pay Gap", "Median Pay Gap", "Mean Bonus Gap", "Median Bonus Gap"]
-    ):
+    for metric, title in zip(KPI_METRICS, KPI_TITLES):
         row = summary[summary["Metric"] == metric]
         if row.empty:
             continue  # Skip if metric is missing
         male = row["Male"].values[0]
         female = row["Female"].values[0]
         gap = round(((male - female) / male) * 100, 1)
+        # Sketched medians (payroll_engine.py --approx) carry a relative error bound a;
+        # the gap 100 * (1 - female / male) is then off by at most 100 * female / male * 2a / (1 - a) points
+        error = row["Relative Error (%)"].values[0] / 100 if "Relative Error (%)" in row.columns else 0
+        bound = 100 * (female / male) * 2 * error / (1 - error) if error > 0 else None
+        values.append((title, gap, bound))
+    return values
+
+
+def kpi_subtext(bound):
+    subtext = "Higher for men"
+    if bound is not None:
+        subtext += f" (±{bound:.1f} pts)"
+    return subtext
+
+
+def build_kpi_block(part):
+    card_html = '<div class="card-grid">'
+    for title, gap, bound in kpi_values(part):
+        subtext = kpi_subtext(bound)
         card_html += f'''
             <div class="summary-card">
                 <div class="summary-title">{title}</div>
                 <div class="summary-value">{gap}%</div>
-                <div class="summary-subtext">Higher for men</div>
+                <div class="summary-subtext">{subtext}</div>
             </div>
         '''
     card_html += '</div>'
     return card_html
 
-def generate_bonus_card(year, company):
-    bonus = df_bonus[(df_bonus["Year"] == year) & (df_bonus["Company"] == company)]
+def generate_bonus_card(part):
+    year, company, bonus = part.year, part.company, part.bonus
     if bonus.empty:
         return "<p>No bonus data available</p>"
 
@@ -113,23 +157,20 @@ def generate_bonus_card(year, company):
     </div>
     """
 
-def render_quartiles(year, company):
-    quart = df_quart[(df_quart["Year"] == year) & (df_quart["Company"] == company)]
-    
+def quartile_figure(part):
+    year, company, quart = part.year, part.company, part.quart
     if quart.empty:
-        return "<p>No quartile data available</p>"
-    
+        return None
+
     df_pivot = quart.pivot(index="Quartile", columns="Gender", values="Percentage").fillna(0)
     # Chose stacked horizontal bar to emphasize distribution order
-    # Order matters: Q4 is lowest, Q1 is highest
-    quartile_order = ["Q4 - Lower", "Q3 - Lower Mid", "Q2 - Upper Mid", "Q1 - Upper"]
-    df_pivot = df_pivot.loc[quartile_order]
+    df_pivot = df_pivot.loc[QUARTILE_ORDER]
     fig = go.Figure()
     fig.add_trace(go.Bar(y=df_pivot.index, x=df_pivot["Male"], name="Male", orientation="h",
                          marker_color="teal", text=df_pivot["Male"], textposition="inside"))
     fig.add_trace(go.Bar(y=df_pivot.index, x=df_pivot["Female"], name="Female", orientation="h",
                          marker_color="tomato", text=df_pivot["Female"], textposition="inside"))
-    chart_title = f"<b>Proportion of men and women in each pay quartile ({year}) – {company}</b>"
+    chart_title = QUARTILE_TITLE.format(year=year, company=company)
     fig.update_layout(
         barmode="stack",
         title=dict(text=chart_title, x=0.5, xanchor="center", font=COMMON_TITLE_FONT),
@@ -142,25 +183,19 @@ def render_quartiles(year, company):
         plot_bgcolor='white',
         paper_bgcolor='white'
     )
-    return wrap_plotly(fig, include_plotlyjs='cdn')
+    return fig
 
-def plot_sankey_flow(year, company):
-    sankey_filtered = df_sankey[(df_sankey["Year"] == year) & (df_sankey["Company"] == company)].copy()
-    if sankey_filtered.empty:
-        return "<p>No sankey data available</p>"
+def render_quartiles(part, lazy=False):
+    fig = quartile_figure(part)
+    if fig is None:
+        return "<p>No quartile data available</p>"
+    return embed_figure(fig) if lazy else wrap_plotly(fig, include_plotlyjs='cdn')
 
-    # Define professional color maps
-    SOURCE_COLOR_MAP = {
-        "Q1 - Upper": "#6BAED6",
-        "Q2 - Upper Mid": "#9ECAE1",
-        "Q3 - Lower Mid": "#C6DBEF",
-        "Q4 - Lower": "#DEEBF7"
-    }
-    TARGET_COLOR_MAP = {
-        "Bonus": "#4CAF50",
-        "No Bonus": "#FFC107",
-        "Exit": "#F44336"
-    }
+def sankey_figure(part):
+    year, company = part.year, part.company
+    sankey_filtered = part.sankey.copy()
+    if sankey_filtered.empty:
+        return None
 
     # Build node list and index map
     unique_sources = sorted(sankey_filtered["Source"].unique().tolist())
@@ -179,16 +214,9 @@ def plot_sankey_flow(year, company):
     )
 
     # Node colors
-    node_colors = [
-        SOURCE_COLOR_MAP.get(n, TARGET_COLOR_MAP.get(n, "#B0BEC5")) for n in nodes
-    ]
+    node_colors = [node_color(n) for n in nodes]
 
     # Link colors based on source
-    def rgba(hex_color, opacity=0.4):
-        hex_color = hex_color.lstrip("#")
-        r, g, b = tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-        return f"rgba({r},{g},{b},{opacity})"
-
     link_colors = [rgba(node_colors[src], 0.5) for src in source]
 
     # Build Sankey diagram
@@ -210,20 +238,26 @@ def plot_sankey_flow(year, company):
         )
     )])
 
-    chart_title = f"<b>Pay Flow Sankey (Breakdown) ({year}) – {company}</b>"
+    chart_title = SANKEY_TITLE.format(year=year, company=company)
     fig.update_layout(
         title=dict(text=chart_title, x=0.5, xanchor="center", font=COMMON_TITLE_FONT),
         font=COMMON_FONT,
         margin=dict(t=80, l=40, r=40, b=40),
         autosize=True
     )
+    return fig
 
-    return wrap_plotly(fig)
+def plot_sankey_flow(part, lazy=False):
+    fig = sankey_figure(part)
+    if fig is None:
+        return "<p>No sankey data available</p>"
+    return embed_figure(fig) if lazy else wrap_plotly(fig)
 
-def plot_treemap_chart(year, company):
-    df = df_sankey[(df_sankey["Year"] == year) & (df_sankey["Company"] == company)].copy()
+def treemap_figure(part):
+    year, company = part.year, part.company
+    df = part.sankey.copy()
     if df.empty:
-        return "<p>No data for treemap</p>"
+        return None
 
     fig = px.treemap(
         df,
@@ -239,7 +273,7 @@ def plot_treemap_chart(year, company):
         hovertemplate='<b>%{label}</b><br>Flow: %{value:.1f}%<extra></extra>'
     )
 
-    chart_title = f"<b>Pay Flow Treemap ({year}) – {company}</b>"
+    chart_title = TREEMAP_TITLE.format(year=year, company=company)
     fig.update_layout(
         title=dict(text=chart_title, x=0.5, xanchor="center", font=COMMON_TITLE_FONT),
         margin=dict(t=60, l=10, r=10, b=10),
@@ -248,18 +282,21 @@ def plot_treemap_chart(year, company):
         paper_bgcolor='white',
         font=COMMON_FONT
     )
+    return fig
 
-    return wrap_plotly(fig)
+def plot_treemap_chart(part, lazy=False):
+    fig = treemap_figure(part)
+    if fig is None:
+        return "<p>No data for treemap</p>"
+    return embed_figure(fig) if lazy else wrap_plotly(fig)
 
-def build_heatmap_chart(year, company):
-    df = df_retention_heatmap[
-        (df_retention_heatmap["Year"] == year) &
-        (df_retention_heatmap["Company"] == company)
-    ]
-    if df.empty:
-        return "<p>No heatmap data available</p>"
+def heatmap_figure(part):
+    year, company = part.year, part.company
+    # Means per Quartile x Gender are precomputed once for all partitions
+    df_avg = part.retention_avg
+    if df_avg.empty:
+        return None
 
-    df_avg = df.groupby(["Quartile", "Gender"])["Retention (%)"].mean().reset_index()
     df_pivot = df_avg.pivot(index="Quartile", columns="Gender", values="Retention (%)").fillna(0)
 
     fig = go.Figure(data=go.Heatmap(
@@ -272,7 +309,7 @@ def build_heatmap_chart(year, company):
         hovertemplate="Quartile: %{y}<br>Gender: %{x}<br>Retention: %{z:.1f}%<extra></extra>"
     ))
 
-    chart_title = f"<b>Quartile Heatmap ({year}) – {company}</b>"
+    chart_title = HEATMAP_TITLE.format(year=year, company=company)
     fig.update_layout(
         title=dict(text=chart_title, x=0.5, xanchor='center', font=COMMON_TITLE_FONT),
         xaxis=dict(title='Gender', type='category', tickfont=COMMON_AXIS_TICK_FONT),
@@ -283,88 +320,319 @@ def build_heatmap_chart(year, company):
         paper_bgcolor='white',
         font=COMMON_FONT
     )
-    return wrap_plotly(fig)
-
-def compare_gender_pay_gap():
-    import html
-    df_comp = pd.read_csv("data/pay_gap_comparison.csv")
-    percent_cols = [col for col in df_comp.columns if "%" in col]
-
-    headers = ''.join([f"<th>{html.escape(col)}</th>" for col in df_comp.columns])
-    rows = ''
-    for _, row in df_comp.iterrows():
-        row_html = ''.join([
-            f"<td>{row[col]}%</td>" if col in percent_cols else f"<td>{html.escape(str(row[col]))}</td>"
-            for col in df_comp.columns
-        ])
-        rows += f"<tr>{row_html}</tr>"
+    return fig
 
-    return f"""
-    <h3 style='margin:10px; text-align: center;'>Comparison Table (Multi-company/year)</h3>
-    <p style='text-align: left; font-size: 14px; color: gray;'>⬇️ Use buttons below to download, copy, or print this table</p>
-    <table id="comparison-table" class="display" style="width:100%">
-        <thead><tr>{headers}</tr></thead>
-        <tbody>{rows}</tbody>
-    </table>
-    """
+def build_heatmap_chart(part, lazy=False):
+    fig = heatmap_figure(part)
+    if fig is None:
+        return "<p>No heatmap data available</p>"
+    return embed_figure(fig) if lazy else wrap_plotly(fig)
+
+SCENARIO_COLOR_MAP = {
+    "Mean Hourly Gap (%)": "#4B85C1",
+    "Mean Bonus Gap (%)": "#FFC107"
+}
+
+def scenario_figure(part):
+    # Histogram of each gap over the Monte Carlo scenarios (scenario_engine.py), baseline dashed
+    year, company, df = part.year, part.company, part.scenario
+    if df.empty:
+        return None
+
+    fig = go.Figure()
+    for metric, rows in df.groupby("Metric", sort=False):
+        color = SCENARIO_COLOR_MAP.get(metric, "#999999")
+        fig.add_trace(go.Bar(
+            x=(rows["Bin Start"] + rows["Bin End"]) / 2, y=rows["Scenarios"],
+            width=rows["Bin End"] - rows["Bin Start"], name=metric, marker_color=color, opacity=0.7,
+            customdata=rows[["Bin Start", "Bin End"]],
+            hovertemplate=f"{metric}<br>%{{customdata[0]:.1f}} to %{{customdata[1]:.1f}}%: %{{y}} scenarios<extra></extra>"
+        ))
+        baseline, median = rows["Baseline"].iloc[0], rows["Median"].iloc[0]
+        # Undefined gaps (no male bonus recipients today) are written as NaN: no line
+        if np.isfinite(baseline):
+            fig.add_vline(x=baseline, line=dict(color=color, dash="dash"),
+                          annotation_text=f"Today {baseline:.1f}%", annotation_font=COMMON_AXIS_TICK_FONT)
+        if np.isfinite(median):
+            fig.add_vline(x=median, line=dict(color=color),
+                          annotation_text=f"Median {median:.1f}%", annotation_position="bottom right",
+                          annotation_font=COMMON_AXIS_TICK_FONT)
+
+    chart_title = SCENARIO_TITLE.format(year=year, company=company)
+    fig.update_layout(
+        barmode="overlay",
+        title=dict(text=chart_title, x=0.5, xanchor="center", font=COMMON_TITLE_FONT),
+        xaxis=dict(title='Gap', ticksuffix='%', tickfont=COMMON_AXIS_TICK_FONT),
+        yaxis=dict(title='Scenarios', tickfont=COMMON_AXIS_TICK_FONT),
+        font=COMMON_FONT,
+        legend=LEGEND,
+        plot_bgcolor='white',
+        paper_bgcolor='white'
+    )
+    return fig
+
+def plot_scenario_chart(part, lazy=False):
+    fig = scenario_figure(part)
+    if fig is None:
+        return "<p>No scenario data available</p>"
+    return embed_figure(fig) if lazy else wrap_plotly(fig)
+
+def histogram_figure(part):
+    # Male and female hourly pay, re-binned from the stored fine bins (payroll_engine.py)
+    year, company, df = part.year, part.company, part.histogram
+    if df.empty:
+        return None
+
+    starts, width, counts, open_ended = rebin(df)
+    ranges = [f"€{start:.2f}–{start + width:.2f}/h" for start in starts]
+    if open_ended:
+        # The last bar also counts everyone paid above the top fine bin edge
+        ranges[-1] = f"€{starts[-1]:.2f}/h and above"
+    fig = go.Figure()
+    for gender, color in (("Male", "teal"), ("Female", "tomato")):
+        if gender not in counts.index:
+            continue
+        employees = counts.loc[gender].to_numpy()
+        share = (employees / employees.sum() * 100).round(2)
+        fig.add_trace(go.Bar(
+            x=starts + width / 2, y=share, width=width, name=gender, marker_color=color, opacity=0.6,
+            customdata=np.column_stack([ranges, [f"{n:,.0f}" for n in employees]]),
+            hovertemplate=f"{gender}<br>%{{customdata[0]}}: "
+                          "%{y:.1f}% (%{customdata[1]} employees)<extra></extra>"
+        ))
+
+    chart_title = HISTOGRAM_TITLE.format(year=year, company=company)
+    fig.update_layout(
+        barmode="overlay",
+        title=dict(text=chart_title, x=0.5, xanchor="center", font=COMMON_TITLE_FONT),
+        xaxis=dict(title='Hourly Pay', tickprefix='€', tickfont=COMMON_AXIS_TICK_FONT),
+        yaxis=dict(title='Share of Employees', ticksuffix='%', tickfont=COMMON_AXIS_TICK_FONT),
+        font=COMMON_FONT,
+        legend=LEGEND,
+        plot_bgcolor='white',
+        paper_bgcolor='white'
+    )
+    return fig
+
+def plot_histogram_chart(part, lazy=False):
+    fig = histogram_figure(part)
+    if fig is None:
+        return "<p>No pay distribution data available</p>"
+    return embed_figure(fig) if lazy else wrap_plotly(fig)
+
+def compare_gender_pay_gap(df_comp):
+    # Paged and sortable client-side from a columnar payload (see comparison_table.py)
+    return comparison_table_html(df_comp)
 
 year_default = 2023
 company_default = "Ryanair"
-# Build dashboard HTML with corrected class names and data attributes
-cards_html = ""
-for year in years:
-    for company in companies:
-       cards_html += f"""
+def build_section(part, lazy=False):
+    # Company names are free text: escaped for the attribute, matched with CSS.escape in the JS
+    year, company = part.year, html.escape(part.company)
+    return f"""
             <div class="section">
                 <div class="card card-summary" data-year="{year}" data-company="{company}">
-                    {build_kpi_block(year, company)}
+                    {build_kpi_block(part)}
                 </div>
                 <div class="card card-bonus" data-year="{year}" data-company="{company}">
-                    {generate_bonus_card(year, company)}
+                    {generate_bonus_card(part)}
                 </div>
                 <div class="grid-2">
                     <div class="card" data-year="{year}" data-company="{company}">
-                        {render_quartiles(year, company)}
+                        {render_quartiles(part, lazy)}
                     </div>
                     <div class="card" data-year="{year}" data-company="{company}">
-                        {plot_sankey_flow(year, company)}
+                        {plot_sankey_flow(part, lazy)}
                     </div>
                 </div>
 
                 <div class="grid-2">
                     <div class="card" data-year="{year}" data-company="{company}">
-                        {plot_treemap_chart(year, company)}
+                        {plot_treemap_chart(part, lazy)}
                     </div>
                     <div class="card" data-year="{year}" data-company="{company}">
-                        {build_heatmap_chart(year, company)}
+                        {build_heatmap_chart(part, lazy)}
                     </div>
                 </div>
+                {build_histogram_card(part, lazy)}
+                {build_scenario_card(part, lazy)}
             </div>
         """
 
+def build_histogram_card(part, lazy=False):
+    # Only when payroll_engine.py has written pay_histogram.csv
+    if part.histogram.empty:
+        return ""
+    return f"""
+                <div class="card" data-year="{part.year}" data-company="{html.escape(part.company)}">
+                    {plot_histogram_chart(part, lazy)}
+                </div>
+"""
 
-cards_html += f"""
+def build_scenario_card(part, lazy=False):
+    # Only once scenario_engine.py has written scenario_gaps.csv
+    if part.scenario.empty:
+        return ""
+    return f"""
+                <div class="card" data-year="{part.year}" data-company="{html.escape(part.company)}">
+                    {plot_scenario_chart(part, lazy)}
+                </div>
+"""
+
+def build_section_job(data, job):
+    # Pool task: sections are addressed by key so only (year, company) is sent to workers
+    year, company, lazy = job
+    return build_section(data.partition(year, company), lazy)
+
+def iter_sections(data, lazy=False, jobs=1):
+    # Sections in year/company order, produced one at a time so they can be streamed to the page
+    if jobs > 1:
+        keys = [(part.year, part.company, lazy) for part in data.partitions()]
+        yield from iter_with_context(data, build_section_job, keys, jobs,
+                                     chunksize=max(1, len(keys) // (jobs * 4)))
+    else:
+        for part in data.partitions():
+            yield build_section(part, lazy)
+
+def build_comparison_card(data):
+    return f"""
     <div class="card static-card">
-        {compare_gender_pay_gap()}
+        {compare_gender_pay_gap(data.frames["comp"])}
     </div>
 
 """
 
-dropdown_html = f"""
+def build_sections(data, lazy=False, jobs=1):
+    # Build dashboard HTML with corrected class names and data attributes
+    return "".join(iter_sections(data, lazy, jobs)) + build_comparison_card(data)
+
+
+def build_filter_bar(data, onchange):
+    years, companies = data.years, data.companies
+    return f"""
     <div class="filter-bar">
         <label for='yearToggle'>Select Year:</label>
-        <select id='yearToggle' onchange='updateCards()'>
+        <select id='yearToggle' onchange='{onchange}()'>
             {''.join([f"<option value='{year}' {'selected' if year == year_default else ''}>{year}</option>" for year in years])}
         </select>
 
         <label for='companyToggle'>Select Company:</label>
-        <select id='companyToggle' onchange='updateCards()'>
-            {''.join([f"<option value='{company}' {'selected' if company == company_default else ''}>{company}</option>" for company in companies])}
+        <select id='companyToggle' onchange='{onchange}()'>
+            {''.join([f"<option value='{html.escape(company)}' {'selected' if company == company_default else ''}>{html.escape(company)}</option>" for company in companies])}
         </select>
     </div>
 
 """
-dropdown_script = f"""
+
+
+tti_js = """
+    // Time to interactive from navigation start, logged for comparing --hydration eager and lazy
+    let interactiveMarked = false;
+    function markInteractive() {
+        if (interactiveMarked) return;
+        interactiveMarked = true;
+        requestAnimationFrame(function() {
+            performance.mark("dashboard-interactive");
+            performance.measure("dashboard-tti", undefined, "dashboard-interactive");
+            const tti = performance.getEntriesByName("dashboard-tti")[0];
+            console.info(`dashboard-tti: ${tti.duration.toFixed(0)} ms`);
+        });
+    }
+"""
+tti_script = f"\n<script>{tti_js}</script>\n"
+
+lazy_hydration_js = """
+    const CARD_SELECTORS = ['.card:not(.static-card)', '.card-summary', '.card-bonus'];
+    let shownCards = null;
+    let chartObserver = null;
+    let resizeObserver = null;
+    let resizeTimer = null;
+
+    function isVisible(el) {
+        return el.offsetParent !== null;
+    }
+
+    // Create the Plotly chart from its inert JSON spec, once
+    function hydrateChart(el) {
+        if (el.dataset.hydrated) return;
+        const spec = el.querySelector("script.figure-spec");
+        const fig = JSON.parse(spec.textContent);
+        spec.remove();
+        el.dataset.hydrated = "1";
+        if (chartObserver) chartObserver.unobserve(el);
+        Plotly.newPlot(el, fig.data, fig.layout, {responsive: true});
+        if (resizeObserver) resizeObserver.observe(el);
+    }
+
+    function onChartsVisible(entries) {
+        entries.forEach(function(entry) {
+            if (entry.isIntersecting && isVisible(entry.target)) {
+                hydrateChart(entry.target);
+            }
+        });
+        markInteractive();
+    }
+
+    function updateCards() {
+        const year = document.getElementById("yearToggle").value;
+        // Per-company pages (site_build.py) have no company dropdown
+        const companyToggle = document.getElementById("companyToggle");
+        const company = companyToggle ? companyToggle.value : document.body.dataset.company;
+
+        // Hide only the previously shown section rather than every card on the page
+        (shownCards || document.querySelectorAll(CARD_SELECTORS.join(", "))).forEach(function(el) {
+            el.style.display = 'none';
+        });
+        shownCards = document.querySelectorAll(CARD_SELECTORS.map(function(selector) {
+            return `${selector}[data-year="${year}"][data-company="${CSS.escape(company)}"]`;
+        }).join(", "));
+        shownCards.forEach(function(el) {
+            el.style.display = 'block';
+        });
+
+        shownCards.forEach(function(card) {
+            card.querySelectorAll(".lazy-chart:not([data-hydrated])").forEach(function(el) {
+                if (chartObserver) {
+                    chartObserver.observe(el);
+                } else {
+                    hydrateChart(el);
+                }
+            });
+        });
+        if (!chartObserver) markInteractive();
+        scheduleResize();
+    }
+
+    // Debounced, and only charts that exist and are on screen
+    function resizeVisibleCharts() {
+        document.querySelectorAll(".lazy-chart[data-hydrated]").forEach(function(el) {
+            if (isVisible(el)) Plotly.Plots.resize(el);
+        });
+    }
+
+    function scheduleResize() {
+        clearTimeout(resizeTimer);
+        resizeTimer = setTimeout(resizeVisibleCharts, 150);
+    }
+
+    window.addEventListener('resize', scheduleResize);
+
+    document.addEventListener("DOMContentLoaded", function() {
+        if (window.ResizeObserver) resizeObserver = new ResizeObserver(scheduleResize);
+        if (window.IntersectionObserver) {
+            chartObserver = new IntersectionObserver(onChartsVisible, {rootMargin: "200px"});
+        }
+        updateCards();
+    });
+"""
+lazy_hydration_script = f"\n<script>{lazy_hydration_js}</script>\n"
+
+
+def build_dropdown(data, lazy=False):
+    dropdown_html = build_filter_bar(data, "updateCards") + tti_script
+    if lazy:
+        return dropdown_html + lazy_hydration_script
+    dropdown_script = f"""
 <script>
     function updateCards() {{
         const year = document.getElementById("yearToggle").value;
@@ -381,7 +649,7 @@ dropdown_script = f"""
 
         // Show only matching year and company
         selectors.forEach(function(selector) {{
-            const toShow = document.querySelectorAll(`${{selector}}[data-year="${{year}}"][data-company="${{company}}"]`);
+            const toShow = document.querySelectorAll(`${{selector}}[data-year="${{year}}"][data-company="${{CSS.escape(company)}}"]`);
             toShow.forEach(function(el) {{
                 el.style.display = 'block';
             }});
@@ -401,6 +669,7 @@ dropdown_script = f"""
     window.addEventListener('load', function() {{
         updateCards();
         setTimeout(resizeAllPlotlyCharts, 300);
+        markInteractive();
     }});
 
     window.addEventListener('resize', resizeAllPlotlyCharts);
@@ -414,8 +683,8 @@ dropdown_script = f"""
 </script>
 """
 
-dropdown_html += dropdown_script
-dropdown_html += """
+    dropdown_html += dropdown_script
+    dropdown_html += """
 <script>
     document.addEventListener("DOMContentLoaded", function () {
         const year = document.getElementById("yearToggle").value;
@@ -433,9 +702,444 @@ dropdown_html += """
     });
 </script>
 """
+    return dropdown_html
+
+
+# --- Single-figure mode (--mode cube) ---
+# Each chart type is rendered once; the per-combination numbers travel as a
+# compact JSON cube indexed by year_index * n_companies + company_index, and
+# the dropdown patches the chart templates with Plotly.react.
+
+def cube_tensor(df, years, companies, axes, value):
+    # Dense (year * company, *axes) array of one column, NaN where the frame has no row
+    labels = [years, companies] + list(axes.values())
+    shape = tuple(len(l) for l in labels)
+    out = np.full(shape, np.nan)
+    if df.empty:
+        return out.reshape((-1,) + shape[2:])
+    codes = [pd.Index(l).get_indexer(df[col]) for l, col in zip(labels, ["Year", "Company"] + list(axes))]
+    keep = np.logical_and.reduce([c >= 0 for c in codes])
+    out[tuple(c[keep] for c in codes)] = df[value].to_numpy(dtype=float)[keep]
+    return out.reshape((-1,) + shape[2:])
+
+
+def cube_cells(tensor, fill=None, digits=2):
+    # Per-combination nested lists for JSON: None for combinations without any row,
+    # otherwise missing entries become `fill` (0 where the charts use fillna(0)).
+    # Infinite entries (a gap against a zero male figure) count as missing: JSON has no Infinity
+    missing = ~np.isfinite(tensor)
+    present = ~missing.reshape(len(tensor), -1).all(axis=1)
+    cells = np.where(missing, fill, np.round(tensor, digits)).tolist()
+    return [cell if ok else None for cell, ok in zip(cells, present)]
+
+
+def build_cube(data):
+    years, companies = data.years, data.companies
+    frames = data.frames
+
+    # KPI gaps per metric, with the sketch error bound when the summary carries one
+    df_gap = frames["gap"]
+    metric_axis = {"Metric": KPI_METRICS}
+    male = cube_tensor(df_gap, years, companies, metric_axis, "Male")
+    female = cube_tensor(df_gap, years, companies, metric_axis, "Female")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kpi = (male - female) / male * 100
+        error = (cube_tensor(df_gap, years, companies, metric_axis, "Relative Error (%)") / 100
+                 if "Relative Error (%)" in df_gap.columns else None)
+        if error is not None:
+            error = np.where(error > 0, 100 * (female / male) * 2 * error / (1 - error), np.nan)
+
+    df_bonus = frames["bonus"]
+    bonus_genders = df_bonus["Gender"].unique().tolist() if not df_bonus.empty else []
+    flow_sources = sorted(frames["sankey"]["Source"].unique().tolist()) if not frames["sankey"].empty else []
+    flow_targets = sorted(frames["sankey"]["Target"].unique().tolist()) if not frames["sankey"].empty else []
+    retention_avg = data.retention_avg
+    heat_quartiles = sorted(retention_avg["Quartile"].unique().tolist()) if not retention_avg.empty else []
+    heat_genders = sorted(retention_avg["Gender"].unique().tolist()) if not retention_avg.empty else []
+
+    quart = cube_tensor(frames["quart"], years, companies, {"Gender": ["Male", "Female"], "Quartile": QUARTILE_ORDER}, "Percentage")
+    cube = {
+        "years": years,
+        "companies": companies,
+        "titles": {"quartiles": QUARTILE_TITLE, "sankey": SANKEY_TITLE,
+                   "treemap": TREEMAP_TITLE, "heatmap": HEATMAP_TITLE},
+        "kpiTitles": KPI_TITLES,
+        "kpi": cube_cells(kpi, digits=1),
+        "bonusGenders": bonus_genders,
+        "bonus": cube_cells(cube_tensor(df_bonus, years, companies, {"Gender": bonus_genders}, "Bonus Participation (%)")),
+        "flowSources": flow_sources,
+        "flowTargets": flow_targets,
+        "flowNodeColors": [node_color(n) for n in flow_sources + flow_targets],
+        "flowLinkColors": [rgba(node_color(n), 0.5) for n in flow_sources],
+        "quartiles": cube_cells(quart, fill=0),
+        "sankey": cube_cells(cube_tensor(frames["sankey"], years, companies,
+                                         {"Source": flow_sources, "Target": flow_targets}, "Value")),
+        "heatQuartiles": heat_quartiles,
+        "heatGenders": heat_genders,
+        "heatmap": cube_cells(cube_tensor(retention_avg, years, companies,
+                                          {"Quartile": heat_quartiles, "Gender": heat_genders}, "Retention (%)"), fill=0),
+    }
+    cube["treemap"] = cube["sankey"]
+    if error is not None:
+        cube["kpiError"] = cube_cells(error, digits=1)
+    return cube
+
+
+def retention_months(data, heat_quartiles, heat_genders):
+    # Monthly retention means as a base64 float32 (combination, quartile, gender, month) array
+    # for the month-range worker; months are month-of-year numbers, NaN where there is no row
+    df = data.retention_monthly
+    if df is None or df.empty:
+        return [], ""
+    labels, inverse = np.unique(df["Month"].astype(str), return_inverse=True)
+    month = pd.to_datetime(pd.Series(labels), format="%Y-%m").dt.month.to_numpy()[inverse]
+    df = df.assign(MonthOfYear=month)
+    months = sorted(set(month.tolist()))
+    tensor = cube_tensor(df, data.years, data.companies,
+                         {"Quartile": heat_quartiles, "Gender": heat_genders, "MonthOfYear": months},
+                         "Retention (%)")
+    return months, base64.b64encode(tensor.astype("<f4").tobytes()).decode("ascii")
+
+
+def build_month_range(months):
+    if not months:
+        return ""
+    options = [(m, calendar.month_abbr[m]) for m in months]
+    select = lambda id, selected: (
+        f"<select id='{id}' onchange='updateHeatmapRange()' disabled>"
+        + "".join(f"<option value='{i}' {'selected' if i == selected else ''}>{label}</option>"
+                  for i, (_, label) in enumerate(options))
+        + "</select>"
+    )
+    return f"""
+                <div class="filter-bar">
+                    <label for='monthFrom'>Retention months:</label>
+                    {select("monthFrom", 0)}
+                    <label for='monthTo'>to</label>
+                    {select("monthTo", len(options) - 1)}
+                </div>
+"""
+
+
+def default_partition(data):
+    # The default selection, or the first combination with a summary if it has none
+    part = data.partition(year_default, company_default)
+    if part.gap.empty:
+        part = next((p for p in data.partitions() if not p.gap.empty), part)
+    return part
+
+
+def build_cube_sections(data):
+    part = default_partition(data)
+    figures = {
+        "quartiles": quartile_figure(part),
+        "sankey": sankey_figure(part),
+        "treemap": treemap_figure(part),
+        "heatmap": heatmap_figure(part),
+    }
+    cube = build_cube(data)
+    months, retention_b64 = retention_months(data, cube["heatQuartiles"], cube["heatGenders"])
+    cube["heatMonths"] = months
+    cube["figures"] = {name: None if fig is None else json.loads(fig.to_json()) for name, fig in figures.items()}
+    # "</" is escaped so company names or titles cannot close the script element
+    cube_json = json.dumps(cube, separators=(",", ":"), ensure_ascii=False, allow_nan=False).replace("</", "<\\/")
+
+    def chart_slot(name):
+        return (f'<div class="card"><div class="plotly-inner">'
+                f'<div id="chart-{name}" style="height:100%; width:100%;"></div></div></div>')
+
+    return f"""
+            <div class="section cube">
+                <div class="card card-summary" id="cube-kpis">
+                    {build_kpi_block(part)}
+                </div>
+                <div class="card card-bonus" id="cube-bonus">
+                    {generate_bonus_card(part)}
+                </div>
+                <div class="grid-2">
+                    {chart_slot("quartiles")}
+                    {chart_slot("sankey")}
+                </div>
+
+                {build_month_range(months)}
+                <div class="grid-2">
+                    {chart_slot("treemap")}
+                    {chart_slot("heatmap")}
+                </div>
+            </div>
+
+    <div class="card static-card">
+        {compare_gender_pay_gap(data.frames["comp"])}
+    </div>
+
+<script type="application/json" id="dashboard-cube">{cube_json}</script>
+<script type="application/octet-stream" id="retention-months">{retention_b64}</script>
+<script type="text/js-worker" id="retention-worker">{retention_worker_js}</script>
+"""
+
+
+# Month-range means of the retention heatmap, computed off the main thread.
+# Monthly values are turned into prefix sums over months once, so any range is
+# two lookups per heatmap cell whatever the number of companies.
+retention_worker_js = """
+    let sums = null, counts = null, nMonths = 0;
+
+    function load(encoded, months) {
+        const raw = atob(encoded);
+        const bytes = new Uint8Array(raw.length);
+        for (let i = 0; i < raw.length; i++) bytes[i] = raw.charCodeAt(i);
+        const values = new Float32Array(bytes.buffer);
+        nMonths = months;
+        const series = values.length / months, stride = months + 1;
+        sums = new Float64Array(series * stride);
+        counts = new Uint16Array(series * stride);
+        for (let s = 0; s < series; s++) {
+            for (let m = 0; m < months; m++) {
+                const v = values[s * months + m], at = s * stride + m;
+                const ok = !Number.isNaN(v);
+                sums[at + 1] = sums[at] + (ok ? v : 0);
+                counts[at + 1] = counts[at] + (ok ? 1 : 0);
+            }
+        }
+    }
+
+    onmessage = function(event) {
+        const msg = event.data;
+        if (msg.type === "load") {
+            load(msg.encoded, msg.months);
+            return;
+        }
+        // Mean of months from..to (inclusive) for the msg.size heatmap cells of one combination, 0 if none
+        const z = new Float64Array(msg.size), stride = nMonths + 1;
+        for (let k = 0; k < msg.size; k++) {
+            const base = (msg.index * msg.size + k) * stride;
+            const n = counts[base + msg.to + 1] - counts[base + msg.from];
+            z[k] = n ? (sums[base + msg.to + 1] - sums[base + msg.from]) / n : 0;
+        }
+        postMessage({id: msg.id, z: z}, [z.buffer]);
+    };
+"""
+
+
+cube_script = """
+<script>
+    const CUBE = JSON.parse(document.getElementById("dashboard-cube").textContent);
+    const PLOT_CONFIG = {responsive: true};
+
+    function cubeIndex(year, company) {
+        const y = CUBE.years.map(String).indexOf(year);
+        const c = CUBE.companies.indexOf(company);
+        return (y < 0 || c < 0) ? -1 : y * CUBE.companies.length + c;
+    }
+
+    function kpiHtml(i) {
+        let html = '<div class="card-grid">';
+        (CUBE.kpi[i] || []).forEach(function(gap, m) {
+            if (gap === null) return;
+            let subtext = "Higher for men";
+            const bound = CUBE.kpiError && CUBE.kpiError[i] ? CUBE.kpiError[i][m] : null;
+            if (bound !== null) subtext += ` (±${bound.toFixed(1)} pts)`;
+            html += `<div class="summary-card"><div class="summary-title">${CUBE.kpiTitles[m]}</div>` +
+                    `<div class="summary-value">${gap.toFixed(1)}%</div>` +
+                    `<div class="summary-subtext">${subtext}</div></div>`;
+        });
+        return html + '</div>';
+    }
+
+    function bonusHtml(i, year, company) {
+        const values = CUBE.bonus[i];
+        if (!values) return "<p>No bonus data available</p>";
+        let rows = "";
+        values.forEach(function(value, g) {
+            if (value !== null) rows += `<tr><td>${CUBE.bonusGenders[g]}</td><td>${value.toFixed(1)}%</td></tr>`;
+        });
+        return `<div class="bonus-table-wrapper">
+            <h3 style="text-align: center;">Bonus Participation (${year}) – ${company}</h3>
+            <table class="bonus-table">
+                <thead><tr><th>Gender</th><th>Bonus Participation (%)</th></tr></thead>
+                <tbody>${rows}</tbody>
+            </table>
+        </div>`;
+    }
+
+    // Replace the per-combination arrays of a chart template in place
+    const PATCH = {
+        quartiles: function(data, values) {
+            data[0].x = values[0]; data[0].text = values[0];
+            data[1].x = values[1]; data[1].text = values[1];
+        },
+        sankey: function(data, values) {
+            const n = CUBE.flowSources.length;
+            const link = data[0].link;
+            data[0].node.label = CUBE.flowSources.concat(CUBE.flowTargets);
+            data[0].node.color = CUBE.flowNodeColors;
+            link.source = []; link.target = []; link.value = []; link.color = []; link.customdata = [];
+            values.forEach(function(row, s) {
+                row.forEach(function(value, t) {
+                    if (value === null) return;
+                    link.source.push(s);
+                    link.target.push(n + t);
+                    link.value.push(value);
+                    link.color.push(CUBE.flowLinkColors[s]);
+                    link.customdata.push(`${CUBE.flowSources[s]} → ${CUBE.flowTargets[t]}: ${value.toFixed(1)}%`);
+                });
+            });
+        },
+        treemap: function(data, values) {
+            // Same hierarchy as px.treemap: Source/Target leaves under Source parents,
+            // parents colored by the value-weighted mean of their leaves
+            const trace = data[0];
+            const ids = [], labels = [], parents = [], sizes = [], colors = [];
+            values.forEach(function(row, s) {
+                const source = CUBE.flowSources[s];
+                let total = 0, weighted = 0;
+                row.forEach(function(value, t) {
+                    if (value === null) return;
+                    ids.push(source + "/" + CUBE.flowTargets[t]);
+                    labels.push(CUBE.flowTargets[t]);
+                    parents.push(source);
+                    sizes.push(value);
+                    colors.push(value);
+                    total += value;
+                    weighted += value * value;
+                });
+                if (total > 0) {
+                    ids.push(source); labels.push(source); parents.push("");
+                    sizes.push(total); colors.push(weighted / total);
+                }
+            });
+            trace.ids = ids; trace.labels = labels; trace.parents = parents; trace.values = sizes;
+            trace.marker.colors = colors;
+            delete trace.customdata;
+        },
+        heatmap: function(data, values) {
+            data[0].z = values;
+            data[0].x = CUBE.heatGenders;
+            data[0].y = CUBE.heatQuartiles;
+        }
+    };
+
+    function drawChart(name, i, year, company) {
+        const el = document.getElementById("chart-" + name);
+        const template = CUBE.figures[name];
+        const values = i < 0 ? null : CUBE[name][i];
+        if (!template || !values) {
+            Plotly.purge(el);
+            el.innerHTML = `<p>No ${name} data available</p>`;
+            el.dataset.empty = "1";
+            return;
+        }
+        if (el.dataset.empty) {
+            el.innerHTML = "";
+            delete el.dataset.empty;
+        }
+        const fig = JSON.parse(JSON.stringify(template));
+        PATCH[name](fig.data, values);
+        fig.layout.title.text = CUBE.titles[name].replace("{year}", year).replace("{company}", company);
+        Plotly.react(el, fig.data, fig.layout, PLOT_CONFIG);
+    }
+
+    // Month-range heatmap: the worker answers range queries, the chart is patched with Plotly.restyle
+    let retentionWorker = null;
+    let heatRequest = 0;
+
+    function monthRange() {
+        const from = Number(document.getElementById("monthFrom").value);
+        const to = Number(document.getElementById("monthTo").value);
+        return from <= to ? [from, to] : [to, from];
+    }
+
+    function updateHeatmapRange() {
+        // Responses to earlier requests are dropped when they arrive
+        heatRequest += 1;
+        const el = document.getElementById("chart-heatmap");
+        const i = cubeIndex(document.getElementById("yearToggle").value, document.getElementById("companyToggle").value);
+        if (!retentionWorker || i < 0 || el.dataset.empty) return;
+        const range = monthRange();
+        if (range[0] === 0 && range[1] === CUBE.heatMonths.length - 1) {
+            // The cube holds the full-year means: no worker round trip, but undo any narrower range
+            Plotly.restyle(el, {z: [CUBE.heatmap[i]]}, [0]);
+            return;
+        }
+        retentionWorker.postMessage({id: heatRequest, index: i, from: range[0], to: range[1],
+                                     size: CUBE.heatQuartiles.length * CUBE.heatGenders.length});
+    }
+
+    function onHeatmapRange(event) {
+        if (event.data.id !== heatRequest) return;
+        const z = event.data.z, width = CUBE.heatGenders.length, rows = [];
+        for (let q = 0; q < CUBE.heatQuartiles.length; q++) {
+            rows.push(Array.from(z.subarray(q * width, (q + 1) * width)));
+        }
+        Plotly.restyle(document.getElementById("chart-heatmap"), {z: [rows]}, [0]);
+    }
+
+    function startRetentionWorker() {
+        const encoded = document.getElementById("retention-months").textContent;
+        if (!window.Worker || !encoded || !document.getElementById("monthFrom")) return;
+        const source = document.getElementById("retention-worker").textContent;
+        retentionWorker = new Worker(URL.createObjectURL(new Blob([source], {type: "text/javascript"})));
+        retentionWorker.onmessage = onHeatmapRange;
+        retentionWorker.postMessage({type: "load", encoded: encoded, months: CUBE.heatMonths.length});
+        document.getElementById("monthFrom").disabled = false;
+        document.getElementById("monthTo").disabled = false;
+    }
+
+    function updateDashboard() {
+        const year = document.getElementById("yearToggle").value;
+        const company = document.getElementById("companyToggle").value;
+        const i = cubeIndex(year, company);
+        document.getElementById("cube-kpis").innerHTML = kpiHtml(i);
+        document.getElementById("cube-bonus").innerHTML = bonusHtml(i, year, company);
+        Object.keys(PATCH).forEach(function(name) {
+            drawChart(name, i, year, company);
+        });
+        updateHeatmapRange();
+    }
+
+    window.addEventListener('load', function() {
+        startRetentionWorker();
+        updateDashboard();
+    });
+</script>
+"""
+
+plotly_script = f"""
+    <script src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"></script>
+"""
+
+# Cards of a single always-visible section (cube mode, dash_viz.py)
+cube_css = """
+        .cube .card,
+        .cube .card-summary,
+        .cube .card-bonus {
+            display: block;
+        }
+"""
+cube_styles = plotly_script + f"""
+    <style>{cube_css}    </style>
+"""
 
-card_styles = """
-    <style>
+
+base_css = f"""
+        body {{
+            font-family: {FONT_FAMILY};
+            background-color: #f5f7fa;
+            padding: 40px;
+        }}
+        .dashboard-title {{
+            text-align: center;
+            font-size: 28px;
+            font-weight: bold;
+            margin-bottom: 20px;
+            background-color: #5A5A5A;
+            color: white;
+            padding: 10px; 
+            border-radius: 4px; 
+        }}
+"""
+
+card_css = """
         /* Sticky Filter Dropdown */
         .filter-bar {
             display: flex;
@@ -681,53 +1385,59 @@ card_styles = """
             background-color: #f8f9fc;
         }
 
-    </style>
+"""
+card_styles = f"""
+    <style>{card_css}    </style>
 """
 
-# Final HTML export
-html_content = f"""
+class PageWriter:
+    # Writes the page incrementally: the head on entry, chunks as they are produced, the footer on exit.
+    # Output goes to a temporary file that replaces `path` only once the page is complete.
+    def __init__(self, path, head, footer):
+        self.path = path
+        self.head = head
+        self.footer = footer
+
+    def __enter__(self):
+        self.tmp_path = self.path + ".tmp"
+        self.file = open(self.tmp_path, "w")
+        self.file.write(self.head)
+        return self
+
+    def write(self, chunk):
+        self.file.write(chunk)
+
+    def write_all(self, chunks):
+        for chunk in chunks:
+            self.file.write(chunk)
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.file.write(self.footer)
+        self.file.close()
+        if exc_type is None:
+            os.replace(self.tmp_path, self.path)
+        else:
+            os.remove(self.tmp_path)
+        return False
+
+
+def page_head(dropdown_html, head_extra=""):
+    return f"""
 <html>
 <head>
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title> Ireland Gender Pay Gap Dashboard</title>
-    <!-- DataTables core CSS -->
-    <link rel="stylesheet" href="https://cdn.datatables.net/1.13.4/css/jquery.dataTables.min.css">
-    <!-- Buttons extension CSS -->
-    <link rel="stylesheet" href="https://cdn.datatables.net/buttons/2.4.1/css/buttons.dataTables.min.css">
-
-    <!-- jQuery (required) -->
-    <script src="https://code.jquery.com/jquery-3.5.1.min.js"></script>
-    <!-- DataTables core JS -->
-    <script src="https://cdn.datatables.net/1.13.4/js/jquery.dataTables.min.js"></script>
-    <!-- Buttons extension JS -->
-    <script src="https://cdn.datatables.net/buttons/2.4.1/js/dataTables.buttons.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/jszip/3.10.1/jszip.min.js"></script>
-    <script src="https://cdn.datatables.net/buttons/2.4.1/js/buttons.html5.min.js"></script>
-    <script src="https://cdn.datatables.net/buttons/2.4.1/js/buttons.print.min.js"></script>
-
-    <style>
-        body {{
-            font-family: {FONT_FAMILY};
-            background-color: #f5f7fa;
-            padding: 40px;
-        }}
-        .dashboard-title {{
-            text-align: center;
-            font-size: 28px;
-            font-weight: bold;
-            margin-bottom: 20px;
-            background-color: #5A5A5A;
-            color: white;
-            padding: 10px; 
-            border-radius: 4px; 
-        }}
-    </style>
-    {card_styles}
+    <style>{base_css}    </style>
+    {card_styles}{head_extra}
 </head>
 <body class="bg-light p-4">
     <div class="dashboard-title">Ireland Gender Pay Gap Dashboard </div>
     {dropdown_html}
-    {cards_html}
+    """
+
+
+page_footer = """
 </body>
     
     <footer>
@@ -735,25 +1445,43 @@ html_content = f"""
         © 2025 Ireland Gender Pay Gap Analysis. Powered by Plotly.
         </div>
     </footer>
-
-    <script>
-        $(document).ready(function() {{
-            $('#comparison-table').DataTable({{
-                paging: true,
-                searching: true,
-                info: false,
-                pageLength: 10,
-                dom: 'Bfrtip',
-                buttons: ['csv', 'excel', 'copy', 'print']
-            }});
-        }});
-
-    </script>
 </html>
 """
 
-# Save output
-with open("outputs/dashboard.html", "w") as f:
-    f.write(html_content)
 
-print(" Dashboard saved to outputs/dashboard.html")
\ No newline at end of file
+def main():
+    parser = argparse.ArgumentParser(description="Render the gender pay gap dashboard")
+    parser.add_argument("--mode", choices=["cards", "cube"], default="cards",
+                        help="cards: pre-render every year x company section; "
+                             "cube: render each chart once and switch data client-side")
+    parser.add_argument("--hydration", choices=["lazy", "eager"], default="lazy",
+                        help="cards mode: create charts when their card becomes visible (lazy) "
+                             "or all of them on load (eager)")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="cards mode: worker processes building the year x company sections")
+    args = parser.parse_args()
+
+    data = GenderDataContext.load("data", monthly_retention=args.mode == "cube")
+    os.makedirs("outputs", exist_ok=True)
+
+    if args.mode == "cube":
+        dropdown_html = build_filter_bar(data, "updateDashboard")
+        head_extra = cube_styles
+    else:
+        lazy = args.hydration == "lazy"
+        dropdown_html = build_dropdown(data, lazy)
+        head_extra = plotly_script if lazy else ""
+
+    # Sections go to disk as they are built, so memory does not grow with the number of companies
+    with PageWriter("outputs/dashboard.html", page_head(dropdown_html, head_extra), page_footer) as page:
+        if args.mode == "cube":
+            page.write(build_cube_sections(data) + cube_script)
+        else:
+            page.write_all(iter_sections(data, lazy, args.jobs))
+            page.write(build_comparison_card(data))
+
+    print(" Dashboard saved to outputs/dashboard.html")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+# tests/conftest.py
+#
+# The scripts are run as `python scripts/x.py` from the dashboard folder, so
+# they import each other as top-level modules; do the same for the tests.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
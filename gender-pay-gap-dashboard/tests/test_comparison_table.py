@@ -0,0 +1,34 @@
+# tests/test_comparison_table.py
+
+import numpy as np
+import pandas as pd
+
+from comparison_table import ComparisonIndex
+
+
+def comparison():
+    return pd.DataFrame({
+        "Company": pd.Series(["Beta", None, "Alpha", "Gamma"], dtype="str"),
+        "Year": [2022, 2023, 2023, 2021],
+        "Mean Hourly Gap (%)": [12.5, np.nan, 3.0, 20.0],
+    })
+
+
+def test_numeric_columns_sort_by_value_with_missing_last():
+    index = ComparisonIndex(comparison())
+    assert index.sorted_rows("Mean Hourly Gap (%)").tolist() == [3, 0, 2, 1]
+    assert index.sorted_rows("Mean Hourly Gap (%)", descending=False).tolist() == [2, 0, 3, 1]
+    assert index.sorted_rows("Company", descending=False).tolist() == [2, 0, 3, 1]
+
+
+def test_missing_company_is_not_written_as_nan():
+    payload = ComparisonIndex(comparison()).payload()
+    names = [payload["companies"][code] for code in payload["values"]["Company"]]
+    assert names == ["Beta", "", "Alpha", "Gamma"]
+    assert payload["values"]["Mean Hourly Gap (%)"][1] is None
+
+
+def test_query_pages_search_results():
+    result = ComparisonIndex(comparison()).query("Mean Hourly Gap (%)", search="a", limit=2)
+    assert result["total"] == 3
+    assert [row["Company"] for row in result["rows"]] == ["Gamma", "Beta"]
@@ -0,0 +1,35 @@
+# tests/test_data_context.py
+
+import os
+
+import pandas as pd
+import pytest
+
+from data_context import GenderDataContext
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+
+
+@pytest.fixture(scope="module")
+def data():
+    return GenderDataContext.load(DATA_DIR)
+
+
+def test_partitions_equal_boolean_masks(data):
+    frames = {"gap": data.frames["gap"], "quart": data.frames["quart"], "bonus": data.frames["bonus"],
+              "sankey": data.frames["sankey"], "retention_avg": data.retention_avg}
+    for part in data.partitions():
+        for name, df in frames.items():
+            expected = df[(df["Year"] == part.year) & (df["Company"] == part.company)]
+            pd.testing.assert_frame_equal(getattr(part, name), expected)
+
+
+def test_unknown_combination_gets_empty_frames_with_columns(data):
+    part = data.partition(1999, "Nobody")
+    assert part.gap.empty and list(part.gap.columns) == list(data.frames["gap"].columns)
+    assert part.histogram.empty
+
+
+def test_partitions_cover_every_year_and_company_once(data):
+    keys = [(part.year, part.company) for part in data.partitions()]
+    assert len(keys) == len(set(keys)) == len(data.years) * len(data.companies)
@@ -0,0 +1,57 @@
+# tests/test_mobility_engine.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_gen import generate_panel, quartiles
+from mobility_engine import compute_mobility_tables
+
+
+@pytest.fixture(scope="module")
+def panel():
+    np.random.seed(0)
+    return generate_panel(3000, n_companies=3, year_range=range(2020, 2024))
+
+
+def shares(df, keys, target):
+    counts = df.groupby(keys + [target]).size().unstack(fill_value=0)
+    return (counts.div(counts.sum(axis=1), axis=0) * 100).round(1).stack().rename("Value")
+
+
+def values(table):
+    return table.set_index(["Company", "Year", "Source", "Target"])["Value"]
+
+
+def test_flows_match_a_pandas_count(panel):
+    target = np.where(panel["Exit"] > 0, "Exit", np.where(panel["Bonus"] > 0, "Bonus", "No Bonus"))
+    expected = shares(panel.assign(Source=panel["Quartile"], Target=target), ["Company", "Year", "Source"], "Target")
+    got = values(compute_mobility_tables(panel)["sankey_flow.csv"])
+    pd.testing.assert_series_equal(got.loc[expected.index], expected, check_names=False)
+    # Combinations absent from the panel are written as 0
+    assert got.drop(expected.index).eq(0).all()
+
+
+def test_mobility_matches_a_next_year_merge(panel):
+    reported = set(zip(panel["Company"], panel["Year"]))
+    current = panel[[(c, y + 1) in reported for c, y in zip(panel["Company"], panel["Year"])]]
+    following = panel[["Company", "Employee ID", "Year", "Quartile"]].assign(Year=panel["Year"] - 1)
+    moves = current.merge(following, on=["Company", "Employee ID", "Year"], how="left", suffixes=("", " Next"))
+    moves["Target"] = moves["Quartile Next"].fillna("Exit")
+    expected = shares(moves.rename(columns={"Quartile": "Source"}), ["Company", "Year", "Source"], "Target")
+    got = values(compute_mobility_tables(panel)["quartile_mobility.csv"])
+    pd.testing.assert_series_equal(got.loc[expected.index], expected, check_names=False)
+    assert got.drop(expected.index).eq(0).all()
+    # The last year has no following year to move to
+    assert got.index.get_level_values("Year").max() == 2022
+
+
+def test_gap_years_do_not_count_as_exits():
+    panel = pd.DataFrame({
+        "Company": ["A"] * 3, "Employee ID": [1, 1, 1], "Year": [2020, 2021, 2023],
+        "Quartile": [quartiles[0], quartiles[1], quartiles[1]], "Bonus": [0, 1, 1], "Exit": [0, 0, 0],
+    })
+    mobility = values(compute_mobility_tables(panel)["quartile_mobility.csv"])
+    # 2021 -> 2023 is not a year-over-year move, and 2022 is not reported
+    assert set(mobility.index.get_level_values("Year")) == {2020}
+    assert mobility.loc[("A", 2020, quartiles[0], quartiles[1])] == 100.0
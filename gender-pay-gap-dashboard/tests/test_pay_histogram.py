@@ -0,0 +1,34 @@
+# tests/test_pay_histogram.py
+
+import numpy as np
+import pandas as pd
+
+from pay_histogram import FINE_MAX, N_FINE_BINS, histogram_counts, histogram_frame, rebin, sparse_histogram
+
+
+def test_non_finite_pay_is_not_binned():
+    values = np.array([10.0, np.nan, np.inf, -np.inf, 250.0])
+    counts = histogram_counts(np.zeros(len(values)), values, 1)[0]
+    assert counts.sum() == 2
+    assert counts[N_FINE_BINS - 1] == 1
+    keys, key_counts = sparse_histogram(np.zeros(len(values)), values)
+    assert key_counts.sum() == 2
+
+
+def test_sparse_and_dense_histograms_agree():
+    rng = np.random.default_rng(0)
+    segments, values = rng.integers(0, 4, 5000), rng.lognormal(3, 0.8, 5000)
+    dense = histogram_counts(segments, values, 4).ravel()
+    keys, counts = sparse_histogram(segments, values)
+    assert np.array_equal(np.flatnonzero(dense), keys)
+    assert np.array_equal(dense[keys], counts)
+
+
+def test_rebin_flags_the_open_ended_top_bin():
+    bins = np.array([20, 21, N_FINE_BINS - 1])
+    df = histogram_frame("A", 2023, ["Male", "Female", "Male"], bins, np.array([3, 4, 5]))
+    starts, width, counts, open_ended = rebin(df)
+    assert open_ended
+    assert starts[-1] + width <= FINE_MAX
+    assert counts.to_numpy().sum() == 12
+    assert not rebin(df.iloc[:2])[3]
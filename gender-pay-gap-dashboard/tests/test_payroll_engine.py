@@ -0,0 +1,94 @@
+# tests/test_payroll_engine.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_gen import generate_payroll, genders, quartiles
+from payroll_engine import StreamingPayrollAggregator, compute_pay_gap_tables
+
+
+@pytest.fixture(scope="module")
+def payroll():
+    np.random.seed(0)
+    return generate_payroll(40_000, n_companies=6, year_range=range(2021, 2024))
+
+
+def test_exact_tables_match_a_pandas_groupby(payroll):
+    tables = compute_pay_gap_tables(payroll)
+    keys = ["Company", "Year", "Gender"]
+    by_gender = payroll.groupby(keys)
+    paid = payroll[payroll["Bonus"] > 0].groupby(keys)["Bonus"]
+    expected = pd.DataFrame({
+        "Mean Hourly Pay": by_gender["Hourly Pay"].mean(),
+        "Median Hourly Pay": by_gender["Hourly Pay"].median(),
+        "Mean Bonus Pay": paid.mean(),
+        "Median Bonus Pay": paid.median(),
+    }).round(2)
+    expected.columns.name = "Metric"
+    expected = expected.stack().unstack("Gender")[["Male", "Female"]]
+    expected.columns.name = None
+    pd.testing.assert_frame_equal(summary(tables), expected.sort_index(), check_names=False)
+
+    participation = (paid.size() / by_gender.size() * 100).round(1).rename("Bonus Participation (%)")
+    bonus = tables["bonus_participation.csv"].set_index(keys)["Bonus Participation (%)"]
+    pd.testing.assert_series_equal(bonus.sort_index(), participation.sort_index(), check_names=False)
+
+
+def test_quartile_bands_split_each_company_year_by_pay_rank(payroll):
+    tables = compute_pay_gap_tables(payroll)
+    ranked = payroll.sort_values(["Company", "Year", "Hourly Pay"], kind="stable")
+    rank = ranked.groupby(["Company", "Year"]).cumcount()
+    size = ranked.groupby(["Company", "Year"])["Hourly Pay"].transform("size")
+    band = (4 * rank // size).map(dict(enumerate(quartiles)))
+    mix = pd.crosstab([ranked["Company"], ranked["Year"], band.rename("Quartile")], ranked["Gender"], normalize="index") * 100
+    got = tables["pay_quartiles.csv"].pivot_table(index=["Company", "Year", "Quartile"], columns="Gender", values="Percentage")
+    np.testing.assert_allclose(got[genders].to_numpy(), mix.loc[got.index, genders].round(1).to_numpy())
+
+
+def streamed(payroll, parts=1):
+    aggregators = [StreamingPayrollAggregator() for _ in range(parts)]
+    for i, rows in enumerate(np.array_split(np.arange(len(payroll)), 9)):
+        aggregators[i % parts].update(payroll.iloc[rows])
+    for other in aggregators[1:]:
+        aggregators[0].merge(other)
+    return aggregators[0].tables()
+
+
+def summary(tables):
+    return tables["pay_gap_summary.csv"].set_index(["Company", "Year", "Metric"])[["Male", "Female"]].sort_index()
+
+
+def test_streamed_means_are_exact_and_medians_within_the_bound(payroll):
+    exact, approx = summary(compute_pay_gap_tables(payroll)), summary(streamed(payroll))
+    means = exact.index.get_level_values("Metric").str.startswith("Mean")
+    pd.testing.assert_frame_equal(approx[means], exact[means])
+    # 0.5% relative bound plus half a cent from rounding both figures to cents
+    medians = exact[~means].to_numpy()
+    assert np.all(np.abs(approx[~means].to_numpy() - medians) <= 0.005 * medians + 0.01)
+
+
+def test_merged_workers_equal_a_single_stream(payroll):
+    single, merged = streamed(payroll), streamed(payroll, parts=3)
+    for name in single:
+        sort = [col for col in ["Company", "Year", "Metric", "Quartile", "Gender", "Bin Start"] if col in single[name]]
+        pd.testing.assert_frame_equal(single[name].sort_values(sort, ignore_index=True),
+                                      merged[name].sort_values(sort, ignore_index=True))
+
+
+def test_years_outside_the_segment_key_range_are_rejected(payroll):
+    chunk = payroll.head(10).copy()
+    chunk["Year"] = 2300
+    with pytest.raises(ValueError):
+        StreamingPayrollAggregator().update(chunk)
+
+
+def test_streamed_histograms_are_exact_and_skip_missing_pay(payroll):
+    payroll = payroll.copy()
+    payroll.loc[payroll.index[::97], "Hourly Pay"] = np.nan
+    sort = ["Company", "Year", "Gender", "Bin Start"]
+    exact = compute_pay_gap_tables(payroll)["pay_histogram.csv"]
+    approx = streamed(payroll)["pay_histogram.csv"]
+    pd.testing.assert_frame_equal(approx.sort_values(sort, ignore_index=True), exact.sort_values(sort, ignore_index=True),
+                                  check_dtype=False)
+    assert exact["Employees"].sum() == payroll["Hourly Pay"].notna().sum()
@@ -0,0 +1,35 @@
+# tests/test_quantile_sketch.py
+
+import numpy as np
+
+from quantile_sketch import GroupedQuantileSketch
+
+
+def test_quantiles_are_within_the_relative_error_of_numpy():
+    rng = np.random.default_rng(0)
+    groups = rng.integers(0, 50, 200_000)
+    values = rng.lognormal(3, 0.6, len(groups))
+    sketch = GroupedQuantileSketch(0.005)
+    # Several updates, as the payroll is streamed in chunks
+    for part in np.array_split(np.arange(len(groups)), 7):
+        sketch.update(groups[part], values[part])
+
+    for q in (0.25, 0.5, 0.75):
+        exact = np.array([np.quantile(values[groups == g], q) for g in range(50)])
+        approx = sketch.quantile(q, 50)
+        assert np.all(np.abs(approx - exact) <= 0.005 * exact)
+
+
+def test_merge_equals_one_sketch_over_all_values():
+    rng = np.random.default_rng(1)
+    groups, values = rng.integers(0, 10, 10_000), rng.uniform(5, 100, 10_000)
+    single = GroupedQuantileSketch().update(groups, values)
+    merged = GroupedQuantileSketch().update(groups[:4000], values[:4000]).merge(
+        GroupedQuantileSketch().update(groups[4000:], values[4000:]))
+    assert np.array_equal(single.keys, merged.keys)
+    assert np.array_equal(single.counts, merged.counts)
+
+
+def test_empty_groups_have_no_quantile():
+    sketch = GroupedQuantileSketch().update([2], [10.0])
+    assert np.isnan(sketch.quantile(0.5, 3)[[0, 1]]).all()
@@ -0,0 +1,53 @@
+# tests/test_retention_aggregator.py
+
+import numpy as np
+import pandas as pd
+
+from retention_aggregator import RETENTION_KEYS, RETENTION_VALUE, RetentionAggregator, read_retention
+
+
+def retention(n_rows=20_000, n_companies=40, seed=0):
+    # More companies than one 4-bit radix holds, so the packed keys have to widen mid-stream
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Company": rng.choice([f"Employer {i:02d}" for i in range(n_companies)], n_rows),
+        "Year": rng.choice([2021, 2022, 2023], n_rows),
+        "Quartile": rng.choice(["Q1", "Q2", "Q3", "Q4"], n_rows),
+        "Gender": rng.choice(["Male", "Female"], n_rows),
+        "Month": rng.choice([f"2023-{m:02d}" for m in range(1, 13)], n_rows),
+        RETENTION_VALUE: rng.uniform(60, 100, n_rows).round(1),
+    })
+    df.loc[df.index[::50], RETENTION_VALUE] = np.nan
+    return df
+
+
+def expected_means(df, keys=RETENTION_KEYS):
+    return df.groupby(keys, sort=False)[RETENTION_VALUE].mean().reset_index()
+
+
+def test_chunked_updates_equal_one_groupby():
+    df = retention()
+    agg = RetentionAggregator()
+    for start in range(0, len(df), 1500):
+        agg.update(df.iloc[start:start + 1500])
+    pd.testing.assert_frame_equal(agg.means(), expected_means(df), check_dtype=False, check_categorical=False)
+
+
+def test_appended_rows_equal_a_full_rebuild():
+    df = retention()
+    incremental = RetentionAggregator().update(df.iloc[:12_000])
+    incremental.update(df.iloc[12_000:])
+    full = RetentionAggregator().update(df)
+    pd.testing.assert_frame_equal(incremental.means(), full.means())
+
+
+def test_read_retention_feeds_every_aggregator(tmp_path):
+    df = retention(n_rows=5000)
+    path = tmp_path / "retention_heatmap.csv"
+    df.to_csv(path, index=False)
+    by_group, by_month = read_retention(path, [RetentionAggregator(), RetentionAggregator(RETENTION_KEYS + ["Month"])],
+                                        chunksize=700)
+    for agg, keys in [(by_group, RETENTION_KEYS), (by_month, RETENTION_KEYS + ["Month"])]:
+        got = agg.means().astype({"Company": str, "Quartile": str, "Gender": str})
+        np.testing.assert_allclose(got[RETENTION_VALUE], expected_means(df, keys)[RETENTION_VALUE])
+        pd.testing.assert_frame_equal(got[keys], expected_means(df, keys)[keys], check_dtype=False)
@@ -0,0 +1,58 @@
+# tests/test_scenario_engine.py
+
+import warnings
+
+import numpy as np
+import pytest
+
+from scenario_engine import N_BINS, histograms, run_scenarios, sample_scenarios, scenario_gaps
+
+
+@pytest.fixture
+def inputs():
+    # Two company-years: an ordinary one, and one without male bonus recipients
+    share = np.array([[0.6, 0.5, 0.4, 0.3], [0.6, 0.5, 0.4, 0.3]])
+    participation = np.array([[40.0, 30.0], [0.0, 30.0]])
+    moves = sample_scenarios(500, np.array([0, 0, 10, 10.0]), np.zeros(4), 3.0, np.random.default_rng(0))
+    return share, participation, moves
+
+
+def test_blocks_match_one_pass(inputs, monkeypatch):
+    share, participation, moves = inputs
+    whole = run_scenarios(share, participation, *moves)
+    monkeypatch.setattr("scenario_engine.BLOCK_ELEMENTS", 1)
+    blocked = run_scenarios(share, participation, *moves)
+    for metric in whole:
+        for key in whole[metric]:
+            np.testing.assert_array_equal(whole[metric][key], blocked[metric][key])
+
+
+def test_undefined_gaps_are_masked_without_warnings(inputs):
+    share, participation, moves = inputs
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        results = run_scenarios(share, participation, *moves)
+    bonus = results["Mean Bonus Gap (%)"]
+    assert np.isnan(bonus["baseline"][1]) and np.isnan(bonus["median"][1])
+    assert bonus["counts"][1].sum() == 0 and np.isnan(bonus["edges"][1]).all()
+    # The ordinary company-year keeps every scenario
+    assert bonus["counts"][0].sum() == 500 and np.isfinite(bonus["median"][0])
+    hourly = results["Mean Hourly Gap (%)"]
+    assert (hourly["counts"].sum(axis=1) == 500).all()
+
+
+def test_histograms_cover_every_value():
+    values = np.random.default_rng(1).normal(size=(1000, 3))
+    values[:10, 1] = np.nan
+    counts, edges = histograms(values)
+    assert counts.shape == (3, N_BINS)
+    assert counts.sum(axis=1).tolist() == [1000, 990, 1000]
+    np.testing.assert_allclose(edges[:, 0], np.nanmin(values, axis=0))
+    np.testing.assert_allclose(edges[:, -1], np.nanmax(values, axis=0))
+
+
+def test_gaps_follow_the_quartile_model():
+    share = np.array([[0.5, 0.5, 0.5, 0.5]])
+    gaps = scenario_gaps(share, np.array([[50.0, 50.0]]), np.zeros((1, 4)), np.zeros((1, 4)))
+    assert gaps["Mean Hourly Gap (%)"][0, 0] == pytest.approx(0)
+    assert gaps["Mean Bonus Gap (%)"][0, 0] == pytest.approx(0)
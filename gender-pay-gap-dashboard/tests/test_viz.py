@@ -0,0 +1,26 @@
+# tests/test_viz.py
+
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+import viz
+from viz import cube_cells
+
+
+def test_cube_cells_write_non_finite_gaps_as_null():
+    male, female = np.array([[10.0, 0.0], [np.nan, np.nan]]), np.array([[8.0, 3.0], [np.nan, np.nan]])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cells = cube_cells((male - female) / male * 100, digits=1)
+    assert cells == [[20.0, None], None]
+    assert json.loads(json.dumps(cells, allow_nan=False)) == cells
+
+
+
+def test_cards_escape_the_company_attribute(monkeypatch):
+    monkeypatch.setattr(viz, "plot_histogram_chart", lambda part, lazy: "<div></div>")
+    part = SimpleNamespace(year=2023, company='O"Brien & <Co>', histogram=pd.DataFrame({"Employees": [1]}))
+    card = viz.build_histogram_card(part)
+    assert 'data-company="O&quot;Brien &amp; &lt;Co&gt;"' in card
@@ -0,0 +1,107 @@
+# scripts/distinct_count.py
+#
+# HyperLogLog distinct-count sketch in NumPy, for counting distinct products
+# and categories in logs too large to hold in memory, e.g. the raw repair-event
+# log before repair_events.py aggregates it. Only the sketch registers are kept
+# (16 KB at 1% error), however many rows are streamed. Sketches are updated
+# chunk by chunk and can be merged across partitions (register-wise max), so
+# each worker can sketch its own files.
+#
+# The dashboard itself shows exact counts from the summary store (kpi_store.py),
+# which already holds one row per product for the Product Items table.
+#
+# Usage (from the dashboard folder):
+#   python scripts/distinct_count.py data/repair_events.csv --columns Product --error 0.01
+
+import math
+import argparse
+import logging
+import numpy as np
+import pandas as pd
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+
+DEFAULT_ERROR = 0.01
+MIN_PRECISION, MAX_PRECISION = 4, 18
+
+
+def precision_for_error(error):
+    # Relative standard error of HLL is ~1.04 / sqrt(m), m = 2 ** p registers
+    p = math.ceil(math.log2((1.04 / error) ** 2))
+    return min(max(p, MIN_PRECISION), MAX_PRECISION)
+
+
+def hash_values(values):
+    # pandas' hash is seeded with a fixed key, so hashes agree across
+    # processes and sketches built on different partitions can be merged
+    return pd.util.hash_array(np.asarray(values, dtype=object))
+
+
+def _bit_length(x):
+    # Vectorized bit length of uint64 values, split into two exact float halves
+    hi = (x >> np.uint64(32)).astype(np.float64)
+    lo = (x & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(hi > 0, 32 + np.frexp(hi)[1], np.frexp(lo)[1])
+
+
+class HyperLogLog:
+    def __init__(self, error=DEFAULT_ERROR, precision=None):
+        self.precision = precision or precision_for_error(error)
+        self.m = 1 << self.precision
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    @property
+    def error(self):
+        return 1.04 / math.sqrt(self.m)
+
+    def update(self, values):
+        values = pd.Series(values).dropna()
+        if values.empty:
+            return self
+        h = hash_values(values)
+        p = self.precision
+        idx = (h >> np.uint64(64 - p)).astype(np.int64)
+        rest = h & np.uint64((1 << (64 - p)) - 1)
+        rank = ((64 - p) - _bit_length(rest) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+        return self
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError(f"Cannot merge sketches with precision {self.precision} and {other.precision}")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        m = self.m
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        # Linear counting is more accurate for small cardinalities
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+def sketch_distinct(path, columns, chunksize=500_000, error=DEFAULT_ERROR):
+    # Stream a CSV and return one sketch per requested column
+    sketches = {col: HyperLogLog(error) for col in columns}
+    for chunk in pd.read_csv(path, usecols=columns, chunksize=chunksize):
+        for col, sketch in sketches.items():
+            sketch.update(chunk[col])
+    return sketches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estimate distinct values per column of a large CSV")
+    parser.add_argument("path", help="CSV to stream, e.g. a repair-event log")
+    parser.add_argument("--columns", nargs="+", default=["Product"])
+    parser.add_argument("--error", type=float, default=DEFAULT_ERROR,
+                        help="Target relative error of the estimates (default: 1%%)")
+    parser.add_argument("--chunksize", type=int, default=500_000)
+    args = parser.parse_args()
+
+    sketches = sketch_distinct(args.path, args.columns, args.chunksize, args.error)
+    for col, sketch in sketches.items():
+        logging.info(f"{col}: ~{sketch.count():,} distinct values (±{sketch.error:.1%})")
@@ -0,0 +1,321 @@
+# scripts/kpi_store.py
+#
+# Materialized summary of the repair KPIs and the top-10 / top-20 selections
+# used by viz.py, persisted next to the data together with the version of the
+# CSVs it was built from.
+#
+# Both CSVs are treated as append-only logs: a batch of new or changed rows is
+# appended with `df.to_csv(path, mode="a", header=False)` and the last row for a
+# Product (or Category) wins. On the next run only the appended tails are parsed
+# and applied as deltas to the stored sums and top-K candidates. Any other change
+# to a CSV (rewrite, truncation, an in-place edit that keeps the size) triggers a
+# full rebuild. The check compares the size, mtime and the last 4 KB the store
+# has seen, so an edit to earlier bytes made together with an append is only
+# caught by `--rebuild`.
+#
+# The store is plain JSON (tables as per-column lists), so loading it never
+# executes anything found in data/.
+#
+# Usage (from the dashboard folder):
+#   python scripts/kpi_store.py            # refresh and print the KPIs
+#   python scripts/kpi_store.py --rebuild  # force a full scan
+
+import io
+import os
+import json
+import time
+import hashlib
+import argparse
+import logging
+import numpy as np
+import pandas as pd
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+
+# ----Standardize Constants ---
+STATUSES = ["Fixed", "Repairable", "End of Life"]
+COUNT_COLS = [f"{status} Cnt" for status in STATUSES]
+STORE_PATH = "data/repair_summary.json"
+# Bumped when the stored tables change shape; older stores are rebuilt
+STORE_FORMAT = 3
+ITEMS_PATH = "data/product_items.csv"
+CATEGORIES_PATH = "data/product_categories.csv"
+TAIL_BYTES = 4096
+TOP_PRODUCTS, TOP_CATEGORIES = 20, 10
+TOPK_SLACK = 20
+
+
+def file_version(path):
+    stat = os.stat(path)
+    with open(path, "rb") as f:
+        f.seek(max(0, stat.st_size - TAIL_BYTES))
+        tail = f.read()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "tail": hashlib.sha1(tail).hexdigest()}
+
+
+def read_appended(path, version, header):
+    # Returns the rows appended since `version`, or None if the file was rewritten.
+    # Only called for a changed file: one that did not grow was edited in place
+    size = os.path.getsize(path)
+    if size <= version["size"]:
+        return None
+    with open(path, "rb") as f:
+        f.seek(max(0, version["size"] - TAIL_BYTES))
+        old_tail = f.read(min(TAIL_BYTES, version["size"]))
+        if hashlib.sha1(old_tail).hexdigest() != version["tail"]:
+            return None
+        appended = f.read()
+    return pd.read_csv(io.BytesIO(header + appended))
+
+
+def clean_rows(df, key):
+    # Last row per key, every CSV column kept so viz.py can show the tables from the store
+    df = df.drop_duplicates(subset=key, keep="last").set_index(key)
+    for col in STATUSES:
+        df[col] = df[col].astype(str).str.replace('%', '').astype(float)
+    for col in COUNT_COLS + ["Total"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(np.int64)
+    return df
+
+
+class TopK:
+    # Keeps the best k + slack keys of a column. Every key outside the
+    # candidates scores at most `floor`, so the top k is exact as long as the
+    # k-th candidate still beats the floor; otherwise it is rebuilt from the
+    # stored column (in memory, never from the CSV).
+    def __init__(self, k, largest=True, slack=TOPK_SLACK):
+        self.k = k
+        self.size = k + slack
+        self.sign = 1 if largest else -1
+        self.candidates = pd.Index([])
+        self.floor = -np.inf
+        self.n_rebuilds = 0
+
+    @staticmethod
+    def rank(scores):
+        # Best score first, ties broken by key so results do not depend on row order
+        return np.lexsort((scores.index.to_numpy(), -scores.to_numpy()))
+
+    def rebuild(self, values):
+        scores = self.sign * values
+        order = self.rank(scores)
+        self.candidates = values.index[order[:self.size]]
+        self.floor = scores.iloc[order[self.size]] if len(order) > self.size else -np.inf
+        self.n_rebuilds += 1
+
+    def update(self, values, changed):
+        scores = self.sign * values
+        changed = changed.difference(self.candidates)
+        promoted = changed[scores.loc[changed].to_numpy() > self.floor]
+        candidates = self.candidates.append(promoted)
+
+        candidate_scores = scores.loc[candidates]
+        order = self.rank(candidate_scores)
+        if len(order) > self.size:
+            self.floor = max(self.floor, candidate_scores.iloc[order[self.size]])
+        self.candidates = candidates[order[:self.size]]
+
+        kth = min(self.k, len(values)) - 1
+        if len(self.candidates) <= kth or candidate_scores.iloc[order[kth]] <= self.floor:
+            self.rebuild(values)
+
+    def top(self, values):
+        scores = self.sign * values.loc[self.candidates]
+        return self.candidates[self.rank(scores)[:self.k]]
+
+
+def table_state(df):
+    return {"key": df.index.name, "index": df.index.tolist(),
+            "columns": {col: df[col].tolist() for col in df.columns}}
+
+
+def table_from_state(state):
+    return pd.DataFrame(state["columns"], index=pd.Index(state["index"], name=state["key"]))
+
+
+def topk_state(topk):
+    return dict(vars(topk), candidates=topk.candidates.tolist(), key=topk.candidates.name)
+
+
+def topk_from_state(state):
+    state = dict(state)
+    state["candidates"] = pd.Index(state["candidates"], name=state.pop("key"))
+    return state
+
+
+class RepairSummaryStore:
+    def __init__(self):
+        self.items = None
+        self.categories = None
+        self.category_products = None
+        self.sums = None
+        self.top_products_k = TopK(TOP_PRODUCTS, largest=True)
+        # viz.py charts the 10 categories with the smallest Total
+        self.top_categories_k = TopK(TOP_CATEGORIES, largest=False)
+        self.version = {}
+        self.header = {}
+
+    # --- Full build ---
+    def build(self, items_path=ITEMS_PATH, categories_path=CATEGORIES_PATH):
+        for name, path in [("items", items_path), ("categories", categories_path)]:
+            with open(path, "rb") as f:
+                self.header[name] = f.readline()
+        self.items = clean_rows(pd.read_csv(items_path), "Product")
+        self.categories = clean_rows(pd.read_csv(categories_path), "Category")
+
+        # Products per category, for the "Categories" card
+        self.category_products = self.items.groupby("Category").size()
+        self.sums = self.items[COUNT_COLS].sum().astype(np.int64)
+        self.top_products_k.rebuild(self.items["Total"])
+        self.top_categories_k.rebuild(self.categories["Total"])
+        self.version = {"items": file_version(items_path), "categories": file_version(categories_path)}
+        return self
+
+    # --- Incremental maintenance ---
+    def apply_items(self, batch):
+        batch = clean_rows(batch, "Product")
+        keys = batch.index
+        known = keys.isin(self.items.index)
+        old = self.items.loc[keys[known]]
+
+        self.sums += batch[COUNT_COLS].sum().astype(np.int64) - old[COUNT_COLS].sum().astype(np.int64)
+        moved = pd.concat([
+            old["Category"].value_counts().mul(-1),
+            batch["Category"].value_counts(),
+        ]).groupby(level=0).sum()
+        self.category_products = self.category_products.add(moved, fill_value=0).astype(np.int64)
+
+        if (~known).any():
+            self.items = pd.concat([self.items, batch.loc[~known]])
+        self.items.loc[keys[known]] = batch.loc[known]
+        self.top_products_k.update(self.items["Total"], keys)
+
+    def apply_categories(self, batch):
+        batch = clean_rows(batch, "Category")
+        keys = batch.index
+        known = keys.isin(self.categories.index)
+        if (~known).any():
+            self.categories = pd.concat([self.categories, batch.loc[~known]])
+        self.categories.loc[keys[known]] = batch.loc[known]
+        self.top_categories_k.update(self.categories["Total"], keys)
+
+    def refresh(self, items_path=ITEMS_PATH, categories_path=CATEGORIES_PATH):
+        # Bring the store up to date with the CSVs; returns what was done
+        if self.items is None:
+            self.build(items_path, categories_path)
+            return "rebuilt"
+
+        batches = {}
+        for name, path in [("items", items_path), ("categories", categories_path)]:
+            current = file_version(path)
+            if current == self.version[name]:
+                continue
+            appended = read_appended(path, self.version[name], self.header[name])
+            if appended is None:
+                self.build(items_path, categories_path)
+                return "rebuilt"
+            batches[name] = (appended, current)
+
+        if not batches:
+            return "current"
+        for name, (appended, current) in batches.items():
+            if not appended.empty:
+                (self.apply_items if name == "items" else self.apply_categories)(appended)
+            self.version[name] = current
+        return "applied " + ", ".join(f"{len(appended)} appended {name} rows" for name, (appended, _) in batches.items())
+
+    # --- Persistence ---
+    # JSON only, written to a temporary file and swapped in
+    def save(self, path=STORE_PATH):
+        state = {
+            "format": STORE_FORMAT,
+            "version": self.version,
+            "header": {name: header.decode() for name, header in self.header.items()},
+            "items": table_state(self.items),
+            "categories": table_state(self.categories),
+            "category_products": self.category_products.to_dict(),
+            "sums": self.sums.to_dict(),
+            "top_products_k": topk_state(self.top_products_k),
+            "top_categories_k": topk_state(self.top_categories_k),
+        }
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, default=int)
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path=STORE_PATH):
+        store = cls()
+        try:
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+        except Exception as e:
+            logging.info(f"No usable summary store at {path} ({e}); building one")
+            return store
+        if state.get("format") != STORE_FORMAT:
+            logging.info(f"Summary store at {path} has an older format; building a new one")
+            return store
+        try:
+            store.restore(state)
+        except (KeyError, TypeError, ValueError) as e:
+            logging.info(f"Summary store at {path} is incomplete ({e!r}); building a new one")
+            return cls()
+        return store
+
+    def restore(self, state):
+        self.version = state["version"]
+        self.header = {name: header.encode() for name, header in state["header"].items()}
+        self.items = table_from_state(state["items"])
+        self.categories = table_from_state(state["categories"])
+        self.category_products = pd.Series(state["category_products"], dtype=np.int64)
+        self.sums = pd.Series(state["sums"], dtype=np.int64)
+        vars(self.top_products_k).update(topk_from_state(state["top_products_k"]))
+        vars(self.top_categories_k).update(topk_from_state(state["top_categories_k"]))
+
+    @classmethod
+    def open(cls, items_path=ITEMS_PATH, categories_path=CATEGORIES_PATH, path=STORE_PATH):
+        start = time.perf_counter()
+        store = cls.load(path)
+        action = store.refresh(items_path, categories_path)
+        if action != "current":
+            store.save(path)
+        logging.info(f"Summary store {action} in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return store
+
+    # --- Read side used by viz.py ---
+    def kpis(self):
+        number_of_repairs = int(self.sums.sum())
+        total_fixed = int(self.sums["Fixed Cnt"])
+        return {
+            "number_of_repairs": number_of_repairs,
+            "status_fixed_pct": round((total_fixed / number_of_repairs) * 100) if number_of_repairs else 0,
+            "n_categories": int((self.category_products > 0).sum()),
+            "n_products": len(self.items),
+        }
+
+    def top_products(self):
+        keys = self.top_products_k.top(self.items["Total"])
+        return self.items.loc[keys].reset_index()
+
+    def top_categories(self):
+        keys = self.top_categories_k.top(self.categories["Total"])
+        return self.categories.loc[keys].reset_index()
+
+    def item_table(self):
+        # Current row of every product, as in product_items.csv
+        return self.items.reset_index()
+
+    def category_table(self):
+        return self.categories.reset_index()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh the materialized repair KPI store")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore the stored summary and rescan the CSVs")
+    args = parser.parse_args()
+
+    if args.rebuild and os.path.exists(STORE_PATH):
+        os.remove(STORE_PATH)
+    store = RepairSummaryStore.open()
+    for name, value in store.kpis().items():
+        print(f"{name}: {value:,}")
@@ -0,0 +1,186 @@
+# scripts/repair_events.py
+#
+# Ingest a repair-event log (one row per repair attempt) and build the
+# `product_items.csv` / `product_categories.csv` tables that viz.py reads.
+#
+# Expected columns: Product, Outcome and optionally Category. When Category is
+# missing it is taken from the "<Category> - Model N" product naming used by
+# data_gen.py. Outcome must be one of STATUSES; events with another outcome or
+# without a product are skipped.
+#
+# Usage (from the dashboard folder):
+#   python scripts/repair_events.py data/repair_events.csv --chunksize 500000
+
+import os
+import argparse
+import logging
+import numpy as np
+import pandas as pd
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+
+# ----Standardize Constants ---
+STATUSES = ["Fixed", "Repairable", "End of Life"]
+N_STATUSES = len(STATUSES)
+CHUNK_SIZE = 500_000
+
+
+class KeyEncoder:
+    # Assigns a stable integer code to every key seen across chunks
+    def __init__(self):
+        self.index = pd.Index([], dtype=object)
+
+    def __len__(self):
+        return len(self.index)
+
+    def encode(self, values):
+        codes = self.index.get_indexer(values)
+        missing = codes < 0
+        if missing.any():
+            new_keys = pd.unique(values[missing])
+            self.index = self.index.append(pd.Index(new_keys, dtype=object))
+            codes[missing] = self.index.get_indexer(values[missing])
+        return codes
+
+
+class RepairEventAggregator:
+    # Running outcome counts per product, updated one chunk at a time
+    def __init__(self):
+        self.products = KeyEncoder()
+        self.categories = KeyEncoder()
+        self.counts = np.zeros((0, N_STATUSES), dtype=np.int64)
+        self.product_category = np.zeros(0, dtype=np.int64)
+        self.n_events = 0
+        self.n_skipped = 0
+
+    def update(self, chunk):
+        outcome = pd.Index(STATUSES).get_indexer(chunk["Outcome"])
+        valid = (outcome >= 0) & chunk["Product"].notna().to_numpy()
+        self.n_skipped += int((~valid).sum())
+        if not valid.all():
+            chunk = chunk[valid]
+            outcome = outcome[valid]
+        if chunk.empty:
+            return
+
+        products = chunk["Product"].astype(str).to_numpy(dtype=object)
+        categories = chunk["Product"].astype(str).str.split(" - ").str[0]
+        if "Category" in chunk.columns:
+            categories = chunk["Category"].astype(object).where(chunk["Category"].notna(), categories).astype(str)
+        categories = categories.to_numpy(dtype=object)
+
+        n_known = len(self.products)
+        product_codes = self.products.encode(products)
+        n_products = len(self.products)
+
+        # Newly seen products take the category of their first event
+        if n_products > n_known:
+            codes, first_rows = np.unique(product_codes, return_index=True)
+            is_new = codes >= n_known
+            new_categories = self.categories.encode(categories[first_rows[is_new]])
+            self.product_category = np.concatenate([self.product_category, np.empty(n_products - n_known, dtype=np.int64)])
+            self.product_category[codes[is_new]] = new_categories
+            self.counts = np.vstack([self.counts, np.zeros((n_products - n_known, N_STATUSES), dtype=np.int64)])
+
+        # One bincount over the combined (product, outcome) key
+        keys = product_codes * N_STATUSES + outcome
+        self.counts += np.bincount(keys, minlength=n_products * N_STATUSES).reshape(n_products, N_STATUSES)
+        self.n_events += len(keys)
+
+    def category_counts(self):
+        n_categories = len(self.categories)
+        keys = (self.product_category[:, None] * N_STATUSES + np.arange(N_STATUSES)).ravel()
+        counts = np.bincount(keys, weights=self.counts.ravel(), minlength=n_categories * N_STATUSES)
+        return counts.reshape(n_categories, N_STATUSES).astype(np.int64)
+
+    def build_tables(self):
+        product_totals = self.counts.sum(axis=1)
+        category_counts = self.category_counts()
+        category_totals = category_counts.sum(axis=1)
+        n_per_category = np.bincount(self.product_category, minlength=len(self.categories))
+        grand_total = product_totals.sum()
+
+        # Keep products grouped by category, in first-seen order
+        order = np.argsort(self.product_category, kind="stable")
+        cat = self.product_category[order]
+        counts = self.counts[order]
+        totals = product_totals[order]
+
+        df_product = pd.DataFrame({
+            "Product": self.products.index.to_numpy()[order],
+            "Category": self.categories.index.to_numpy()[cat],
+            "N_products": n_per_category[cat],
+            "Total": totals,
+            "Percentage": format_pct(share(totals, grand_total)),
+        })
+        for i, status in enumerate(STATUSES):
+            df_product[status] = format_pct(share(counts[:, i], totals))
+        for i, status in enumerate(STATUSES):
+            df_product[f"{status} Cnt"] = counts[:, i]
+
+        df_categories = pd.DataFrame({
+            "Category": self.categories.index.to_numpy(),
+            "Total": category_totals,
+            "N_products": n_per_category,
+        })
+        for i, status in enumerate(STATUSES):
+            df_categories[status] = format_pct(share(category_counts[:, i], category_totals))
+        for i, status in enumerate(STATUSES):
+            df_categories[f"{status} Cnt"] = category_counts[:, i]
+
+        return df_product, df_categories
+
+    def kpis(self):
+        # Same figures as build_kpi_block_repairs in viz.py
+        number_of_repairs = int(self.counts.sum())
+        total_fixed = int(self.counts[:, STATUSES.index("Fixed")].sum())
+        return {
+            "Number of Repairs": number_of_repairs,
+            "Status Fixed": round(total_fixed / number_of_repairs * 100) if number_of_repairs else 0,
+            "Categories": len(self.categories),
+            "Products": len(self.products),
+        }
+
+
+def share(part, whole):
+    # Percentage of whole, 0 where whole is 0
+    whole = np.broadcast_to(whole, np.shape(part))
+    return np.divide(100 * part, whole, out=np.zeros(np.shape(part)), where=whole > 0)
+
+
+def format_pct(values):
+    return [f"{v:.1f}%" for v in values]
+
+
+def ingest_repair_events(path, chunksize=CHUNK_SIZE):
+    aggregator = RepairEventAggregator()
+    usecols = lambda col: col in ("Product", "Category", "Outcome")
+    for chunk in pd.read_csv(path, usecols=usecols, chunksize=chunksize):
+        aggregator.update(chunk)
+    if aggregator.n_skipped:
+        logging.warning(f"Skipped {aggregator.n_skipped:,} events without a product or with an unknown outcome")
+    if not aggregator.n_events:
+        # Writing empty tables would blank the dashboard
+        raise ValueError(f"No valid repair events in {path}")
+    logging.info(f"Aggregated {aggregator.n_events:,} repair events from {path}")
+    return aggregator
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build radial dashboard tables from a repair-event log")
+    parser.add_argument("events", help="CSV with one row per repair attempt (Product, Outcome[, Category])")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--out-dir", default="data")
+    args = parser.parse_args()
+
+    aggregator = ingest_repair_events(args.events, args.chunksize)
+    df_product, df_categories = aggregator.build_tables()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    df_product.to_csv(os.path.join(args.out_dir, "product_items.csv"), index=False)
+    df_categories.to_csv(os.path.join(args.out_dir, "product_categories.csv"), index=False)
+
+    for title, value in aggregator.kpis().items():
+        logging.info(f"{title}: {value:,}")
+    print(f"Repair tables written to `{args.out_dir}/`")
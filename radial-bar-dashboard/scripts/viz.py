@@ -2,41 +2,29 @@
 
 import os
 import html
-import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 from plotly.io import to_html
 
 import logging
+from kpi_store import RepairSummaryStore
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 
-# Helper function for loading CSV files safely
-def load_data(path):
-    try:
-        df = pd.read_csv(path)
-        logging.info(f"Successfully loaded {path}")
-        return df
-    except Exception as e:
-        logging.error(f"Failed to load {path}: {e}")
-        return pd.DataFrame()
-    
 os.makedirs("outputs", exist_ok=True)
 
-# Load data
-df_categories = load_data("data/product_categories.csv")
-df_product = load_data("data/product_items.csv")
-
-# Clean and convert percentage strings to floats
-for df in [df_categories, df_product]:
-    for col in ["Fixed", "Repairable", "End of Life"]:
-        df[col] = df[col].str.replace('%', '').astype(float)
-
-# Sort and select Top 10 categories by Total
-df_categories_top_10 = df_categories.sort_values(by="Total", ascending=True).head(10)
-# Filter products by Top 20 Total values
-df_product_top_20 = df_product.sort_values(by="Total", ascending=False).head(20)
+# KPI sums, Top 10 / Top 20 selections and both tables come from the materialized
+# store, which only applies appended batches instead of rescanning the data.
+# Both CSVs are append-only: the last row for a product or category wins, and
+# the status percentages are already converted to floats.
+summary_store = RepairSummaryStore.open()
+df_categories = summary_store.category_table()
+df_product = summary_store.item_table()
+# Top 10 categories by Total (smallest first)
+df_categories_top_10 = summary_store.top_categories()
+# Top 20 products by Total values
+df_product_top_20 = summary_store.top_products()
 
 # ----Standardize Constants ---
 STATUSES = ["Fixed", "Repairable", "End of Life"]
@@ -89,18 +77,12 @@ ANGULARAXIS = dict(
 # Creating KPI cards
 def build_kpi_block_repairs():
 
-    # Clean numeric columns
-    df_product["Fixed Cnt"] = pd.to_numeric(df_product["Fixed Cnt"], errors="coerce")
-    df_product["Repairable Cnt"] = pd.to_numeric(df_product["Repairable Cnt"], errors="coerce")
-    df_product["End of Life Cnt"] = pd.to_numeric(df_product["End of Life Cnt"], errors="coerce")
-
-    df = df_product.copy()
     # KPI calculations
-    number_of_repairs = int(df["Fixed Cnt"].sum() + df["Repairable Cnt"].sum() + df["End of Life Cnt"].sum())
-    total_fixed = df["Fixed Cnt"].sum()
-    status_fixed_pct = round((total_fixed / number_of_repairs) * 100)
-    n_categories = df["Category"].nunique()
-    n_products = df["Product"].nunique() if "Product" in df.columns else df.shape[0]
+    kpi_values = summary_store.kpis()
+    number_of_repairs = kpi_values["number_of_repairs"]
+    status_fixed_pct = kpi_values["status_fixed_pct"]
+    n_categories = kpi_values["n_categories"]
+    n_products = kpi_values["n_products"]
 
     card_html = '<div class="card-grid">'
 
@@ -0,0 +1,30 @@
+# tests/test_distinct_count.py
+
+import numpy as np
+import pandas as pd
+
+from distinct_count import HyperLogLog, sketch_distinct
+
+
+def test_estimate_is_within_the_advertised_error(tmp_path):
+    n = 50_000
+    values = [f"Product {i}" for i in range(n)]
+    path = tmp_path / "events.csv"
+    # Every value twice, in shuffled order, read in several chunks
+    pd.DataFrame({"Product": np.random.default_rng(0).permutation(values * 2)}).to_csv(path, index=False)
+
+    sketch = sketch_distinct(path, ["Product"], chunksize=7_000, error=0.01)["Product"]
+    # Three standard errors
+    assert abs(sketch.count() - n) <= 3 * sketch.error * n
+
+
+def test_merged_partitions_equal_one_sketch_over_all_rows():
+    left = [f"p{i}" for i in range(0, 6000)]
+    right = [f"p{i}" for i in range(4000, 10000)]
+    merged = HyperLogLog(0.02).update(left).merge(HyperLogLog(0.02).update(right))
+    single = HyperLogLog(0.02).update(left + right)
+    assert np.array_equal(merged.registers, single.registers)
+
+
+def test_small_cardinalities_are_exact_enough():
+    assert HyperLogLog().update(["a", "b", "c", None, "a"]).count() == 3
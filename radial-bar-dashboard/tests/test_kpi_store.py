@@ -0,0 +1,92 @@
+# tests/test_kpi_store.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from kpi_store import RepairSummaryStore
+
+CATEGORIES = [f"Category {i}" for i in range(15)]
+
+
+def make_items(products, rng):
+    counts = rng.integers(0, 200, size=(len(products), 3))
+    totals = counts.sum(axis=1)
+    df = pd.DataFrame({
+        "Product": products,
+        "Category": rng.choice(CATEGORIES, len(products)),
+        "N_products": rng.integers(1, 50, len(products)),
+        "Total": totals,
+        "Percentage": [f"{v:.1f}%" for v in 100 * totals / max(totals.sum(), 1)],
+    })
+    for i, status in enumerate(["Fixed", "Repairable", "End of Life"]):
+        df[status] = [f"{v:.1f}%" for v in 100 * counts[:, i] / np.maximum(totals, 1)]
+    for i, status in enumerate(["Fixed", "Repairable", "End of Life"]):
+        df[f"{status} Cnt"] = counts[:, i]
+    return df
+
+
+def make_categories(categories, rng):
+    items = make_items(categories, rng).drop(columns=["Category", "Percentage"])
+    items = items.rename(columns={"Product": "Category"})
+    return items[["Category", "Total", "N_products", "Fixed", "Repairable", "End of Life",
+                  "Fixed Cnt", "Repairable Cnt", "End of Life Cnt"]]
+
+
+@pytest.fixture
+def paths(tmp_path):
+    rng = np.random.default_rng(0)
+    items, categories = tmp_path / "items.csv", tmp_path / "categories.csv"
+    make_items([f"Product {i}" for i in range(300)], rng).to_csv(items, index=False)
+    make_categories(CATEGORIES, rng).to_csv(categories, index=False)
+    return {"items_path": str(items), "categories_path": str(categories), "path": str(tmp_path / "store.json")}
+
+
+def assert_same_store(store, rebuilt):
+    assert store.kpis() == rebuilt.kpis()
+    pd.testing.assert_frame_equal(store.top_products(), rebuilt.top_products())
+    pd.testing.assert_frame_equal(store.top_categories(), rebuilt.top_categories())
+    for table in ["item_table", "category_table"]:
+        got = getattr(store, table)().sort_values(getattr(store, table)().columns[0], ignore_index=True)
+        expected = getattr(rebuilt, table)().sort_values(getattr(rebuilt, table)().columns[0], ignore_index=True)
+        pd.testing.assert_frame_equal(got, expected)
+
+
+def test_incremental_appends_equal_a_full_rebuild(paths):
+    rng = np.random.default_rng(1)
+    RepairSummaryStore.open(**paths)
+    for batch in range(5):
+        # Changed rows for known products (possibly moving category) and new products
+        products = list(rng.choice([f"Product {i}" for i in range(300 + 40 * batch)], 60, replace=False))
+        products += [f"Product {300 + 40 * batch + i}" for i in range(40)]
+        make_items(products, rng).to_csv(paths["items_path"], mode="a", header=False, index=False)
+        make_categories(list(rng.choice(CATEGORIES, 4, replace=False)) + [f"New {batch}"], rng).to_csv(
+            paths["categories_path"], mode="a", header=False, index=False)
+
+        # Reloaded from the JSON store every time, as viz.py does
+        store = RepairSummaryStore.open(**paths)
+        rebuilt = RepairSummaryStore().build(paths["items_path"], paths["categories_path"])
+        assert_same_store(store, rebuilt)
+
+
+def test_same_size_edit_in_place_triggers_a_rebuild(paths):
+    store = RepairSummaryStore.open(**paths)
+    with open(paths["items_path"], "r+b") as f:
+        # Change one digit of the first row's Total: same size, well before the tail
+        f.readline()
+        start = f.tell()
+        fields = f.readline().split(b",")
+        fields[3] = bytes([fields[3][0] ^ 1]) + fields[3][1:]
+        f.seek(start)
+        f.write(b",".join(fields))
+
+    store = RepairSummaryStore.load(paths["path"])
+    assert store.refresh(paths["items_path"], paths["categories_path"]) == "rebuilt"
+    assert_same_store(store, RepairSummaryStore().build(paths["items_path"], paths["categories_path"]))
+
+
+def test_unreadable_store_is_rebuilt(paths):
+    with open(paths["path"], "w") as f:
+        f.write('{"format": 3}')
+    store = RepairSummaryStore.open(**paths)
+    assert_same_store(store, RepairSummaryStore().build(paths["items_path"], paths["categories_path"]))
@@ -0,0 +1,56 @@
+# tests/test_repair_events.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from repair_events import STATUSES, ingest_repair_events
+
+
+def make_events(n, seed=0):
+    rng = np.random.default_rng(seed)
+    categories = np.array(["Vacuum", "Toaster", "Lamp"])
+    category = categories[rng.integers(0, len(categories), n)]
+    model = rng.integers(0, 20, n)
+    return pd.DataFrame({
+        "Product": [f"{c} - Model {m}" for c, m in zip(category, model)],
+        "Outcome": np.array(STATUSES)[rng.integers(0, len(STATUSES), n)],
+    })
+
+
+def test_chunked_counts_match_a_single_groupby(tmp_path):
+    events = make_events(5000)
+    path = tmp_path / "events.csv"
+    events.to_csv(path, index=False)
+
+    df_product, df_categories = ingest_repair_events(path, chunksize=777).build_tables()
+
+    expected = events.groupby(["Product", "Outcome"]).size().unstack(fill_value=0)[STATUSES]
+    got = df_product.set_index("Product")[[f"{s} Cnt" for s in STATUSES]]
+    got.columns = STATUSES
+    pd.testing.assert_frame_equal(got.sort_index(), expected.sort_index(), check_names=False, check_dtype=False)
+    assert df_categories["Total"].sum() == len(events)
+    assert df_product["Total"].sum() == len(events)
+
+
+def test_missing_products_and_unknown_outcomes_are_skipped(tmp_path):
+    events = pd.DataFrame({
+        "Product": ["Lamp - Model 1", None, "Lamp - Model 1", "Lamp - Model 2"],
+        "Outcome": ["Fixed", "Fixed", "Lost", "End of Life"],
+    })
+    path = tmp_path / "events.csv"
+    events.to_csv(path, index=False)
+
+    aggregator = ingest_repair_events(path)
+    df_product, _ = aggregator.build_tables()
+
+    assert aggregator.n_skipped == 2
+    assert sorted(df_product["Product"]) == ["Lamp - Model 1", "Lamp - Model 2"]
+    assert "nan" not in set(df_product["Product"])
+
+
+def test_a_log_without_valid_events_is_rejected(tmp_path):
+    path = tmp_path / "events.csv"
+    pd.DataFrame({"Product": ["Lamp - Model 1"], "Outcome": ["Lost"]}).to_csv(path, index=False)
+    with pytest.raises(ValueError):
+        ingest_repair_events(path)
@@ -0,0 +1,111 @@
+# scripts/arr_engine.py
+#
+# ARR movements from a per-customer monthly ARR ledger (Customer ID, Month,
+# ARR) instead of the random columns in data_gen.py.
+#
+# Ledger rows are summed per customer-month, rows without ARR dropped, and the
+# rest sorted once by (customer, month). Every classification is then a
+# comparison of each row with its neighbour in that layout:
+#   New           first month a customer has ARR
+#   Reactivation  ARR again after one or more months without
+#   Upgrade       ARR up on the previous month (expansion)
+#   Downgrade     ARR down on the previous month (contraction)
+#   Churn         no ARR the month after, booked in that month
+# Amounts are summed per month with bincount. The first ledger month is the
+# opening balance and gets no movements of its own. NRR and GRR are the ARR
+# kept from the previous month's customers, with and without expansion:
+#   NRR = (start + upgrade - downgrade - churn) / start
+#   GRR = (start - downgrade - churn) / start
+#
+# Writes data/arr_changes.csv (Month, Upgrade, New, Reactivation, Downgrade,
+# Churn, NetGrowth, NRR (%), GRR (%)) for the ARR Changes chart in viz.py.
+#
+# Usage (from the dashboard folder):
+#   python scripts/data_gen.py --ledger 1000000     # optional synthetic ledger
+#   python scripts/arr_engine.py data/arr_ledger.csv
+
+import os
+import argparse
+import logging
+import numpy as np
+import pandas as pd
+
+from cohort_engine import month_periods
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+
+LEDGER_COLUMNS = ["Customer ID", "Month", "ARR"]
+MOVEMENTS = ["Upgrade", "New", "Reactivation", "Downgrade", "Churn"]
+
+
+def customer_months(df):
+    # Sorted (customer, period, ARR) arrays with one row per customer-month that has ARR
+    customer, _ = pd.factorize(df["Customer ID"])
+    period = month_periods(df["Month"])
+    first, n_periods = period.min(), period.max() - period.min() + 1
+    key = customer.astype(np.int64) * n_periods + (period - first)
+    keys, inverse = np.unique(key, return_inverse=True)
+    arr = np.bincount(inverse, weights=df["ARR"].to_numpy(dtype=np.float64), minlength=len(keys))
+    paying = arr > 0
+    keys, arr = keys[paying], arr[paying]
+    return keys // n_periods, keys % n_periods + first, arr
+
+
+def arr_movements(customer, period, arr):
+    # Months and {movement: amount per month} plus opening ARR per month
+    first, last = period.min(), period.max()
+    n_months = last - first + 1
+    month = period - first
+
+    # Neighbours in the (customer, month) layout
+    same = customer[1:] == customer[:-1]
+    adjacent = same & (period[1:] == period[:-1] + 1)
+    follows = np.append(False, adjacent)          # previous month had ARR
+    returning = np.append(False, same) & ~follows  # earlier ARR, but not last month
+    delta = np.append(0.0, np.diff(arr)) * follows
+    churned = ~np.append(adjacent, False) & (period < last)
+
+    def monthly(mask, amount, shift=0):
+        return np.bincount(month[mask] + shift, weights=amount[mask], minlength=n_months + 1)[:n_months]
+
+    opening = np.bincount(month, weights=arr, minlength=n_months)
+    moves = {
+        "Upgrade": monthly(delta > 0, delta),
+        "New": monthly(~np.append(False, same), arr),
+        "Reactivation": monthly(returning, arr),
+        "Downgrade": monthly(delta < 0, -delta),
+        "Churn": monthly(churned, arr, shift=1),
+    }
+    start = np.append(np.nan, opening[:-1])
+    # The first month is the opening balance, not a movement
+    return np.arange(first, last + 1)[1:], {k: v[1:] for k, v in moves.items()}, start[1:]
+
+
+def arr_frame(months, moves, start):
+    labels = pd.PeriodIndex.from_ordinals(months - 1970 * 12, freq="M")
+    # Short month names as in data_gen.py while they are unique, else with the year
+    fmt = "%b" if len(set(labels.year)) == 1 else "%b %y"
+    df = pd.DataFrame({"Month": labels.strftime(fmt)})
+    for name in MOVEMENTS:
+        df[name] = moves[name].round().astype(np.int64)
+    df["NetGrowth"] = df["Upgrade"] + df["New"] + df["Reactivation"] - df["Downgrade"] - df["Churn"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        df["NRR (%)"] = ((start + moves["Upgrade"] - moves["Downgrade"] - moves["Churn"]) / start * 100).round(2)
+        df["GRR (%)"] = ((start - moves["Downgrade"] - moves["Churn"]) / start * 100).round(2)
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build arr_changes.csv from a per-customer monthly ARR ledger")
+    parser.add_argument("ledger", nargs="+", help="CSV file(s) with Customer ID, Month, ARR columns")
+    parser.add_argument("--out", default="data/arr_changes.csv")
+    args = parser.parse_args()
+
+    df_ledger = pd.concat([pd.read_csv(path, usecols=LEDGER_COLUMNS) for path in args.ledger], ignore_index=True)
+    logging.info(f"Loaded {len(df_ledger):,} ledger rows")
+    months, moves, start = arr_movements(*customer_months(df_ledger))
+    df_arr = arr_frame(months, moves, start)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    df_arr.to_csv(args.out, index=False)
+    logging.info(f"Wrote {len(df_arr)} months to {args.out}")
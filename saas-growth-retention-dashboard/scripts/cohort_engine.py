@@ -0,0 +1,98 @@
+# scripts/cohort_engine.py
+#
+# Cohort retention matrix from raw subscription activity instead of the
+# synthetic decay in data_gen.py.
+#
+# Input: one row per customer and active month (Customer ID, Signup Month,
+# Active Month). Months are turned into integer periods (year * 12 + month), a
+# customer's cohort is their signup period and the offset is active - signup.
+# Distinct (customer, offset) pairs are counted into the cohort x offset matrix
+# with a single 2-D bincount, and divided by cohort sizes. Offsets a cohort has
+# not reached yet by the last observed month are left empty, not 0%.
+#
+# Writes data/cohort_retention.csv in the layout the cohort heatmap in viz.py
+# reads: Cohort ("Nov 21"), Month 1 (signup month, 100%), Month 2, ...
+#
+# Usage (from the dashboard folder):
+#   python scripts/data_gen.py --events 1000000     # optional synthetic events
+#   python scripts/cohort_engine.py data/subscription_events.csv --months 6
+
+import os
+import argparse
+import logging
+import numpy as np
+import pandas as pd
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+
+EVENT_COLUMNS = ["Customer ID", "Signup Month", "Active Month"]
+MAX_MONTHS = 6
+
+
+def month_periods(values):
+    # "2022-01" / dates -> year * 12 + month - 1, parsing each distinct value once
+    codes, labels = pd.factorize(values)
+    dates = pd.to_datetime(pd.Series(labels.astype(str)), format="mixed")
+    return (dates.dt.year * 12 + dates.dt.month - 1).to_numpy(dtype=np.int64)[codes]
+
+
+def period_label(period):
+    return pd.Timestamp(year=int(period) // 12, month=int(period) % 12 + 1, day=1).strftime("%b %y")
+
+
+def cohort_retention(df, max_months=MAX_MONTHS, n_cohorts=None):
+    # (cohort periods, retention % matrix of cohort x months since signup)
+    customer, _ = pd.factorize(df["Customer ID"])
+    signup = month_periods(df["Signup Month"])
+    offset = month_periods(df["Active Month"]) - signup
+    keep = (offset >= 0) & (offset < max_months)
+
+    # Every month from the first to the last signup is a cohort, even an empty one
+    cohorts = np.arange(signup.min(), signup.max() + 1)
+    last = max(signup.max(), (signup + offset).max())
+    if n_cohorts:
+        cohorts = cohorts[-n_cohorts:]
+    cohort = signup - cohorts[0]
+    keep &= cohort >= 0
+
+    # A customer counts once per offset however many events they have that month
+    n_customers = int(customer.max()) + 1
+    pairs = pd.unique(customer[keep].astype(np.int64) * max_months + offset[keep])
+    pair_customer = pairs // max_months
+    customer_cohort = np.full(n_customers, -1, dtype=np.int64)
+    customer_cohort[customer] = cohort
+    active = np.bincount(customer_cohort[pair_customer] * max_months + pairs % max_months,
+                         minlength=len(cohorts) * max_months).reshape(len(cohorts), max_months)
+
+    # Cohort size: distinct customers who signed up that month
+    members = customer_cohort[customer_cohort >= 0]
+    sizes = np.bincount(members, minlength=len(cohorts))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        retention = active / sizes[:, None] * 100
+    observed = cohorts[:, None] + np.arange(max_months) <= last
+    retention = np.where(observed & (sizes[:, None] > 0), retention, np.nan)
+    return cohorts, retention
+
+
+def cohort_frame(cohorts, retention):
+    df = pd.DataFrame(retention.round(1), columns=[f"Month {i + 1}" for i in range(retention.shape[1])])
+    df.insert(0, "Cohort", [period_label(p) for p in cohorts])
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build cohort_retention.csv from subscription activity events")
+    parser.add_argument("events", nargs="+", help="CSV file(s) with Customer ID, Signup Month, Active Month columns")
+    parser.add_argument("--months", type=int, default=MAX_MONTHS, help="Months since signup to track")
+    parser.add_argument("--cohorts", type=int, default=None, help="Only the latest N signup cohorts")
+    parser.add_argument("--out", default="data/cohort_retention.csv")
+    args = parser.parse_args()
+
+    df_events = pd.concat([pd.read_csv(path, usecols=EVENT_COLUMNS) for path in args.events], ignore_index=True)
+    logging.info(f"Loaded {len(df_events):,} activity events")
+    cohorts, retention = cohort_retention(df_events, args.months, args.cohorts)
+    df_cohort = cohort_frame(cohorts, retention)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    df_cohort.to_csv(args.out, index=False)
+    logging.info(f"Wrote {len(df_cohort)} cohorts to {args.out}")
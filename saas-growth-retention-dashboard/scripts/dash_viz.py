@@ -1,93 +1,278 @@
-from dash import Dash, html, dcc
+# scripts/dash_viz.py
+#
+# Live Dash version of the SaaS dashboard, built from the same data/*.csv as
+# viz.py. The month-range slider filters the ARR Changes and Expenses charts,
+# and the metric dropdown switches the ARR chart between movements, net growth
+# and NRR/GRR (arr_engine.py output only).
+#
+# Every figure comes from a builder memoized in one bounded LRU cache keyed by
+# (builder, data version, arguments). The cache is warmed with every month
+# range and metric when they fit, so interactions are answered from memory
+# without rebuilding figures. The data is a snapshot that a background thread
+# swaps when a CSV in the data folder is rewritten (see data_refresh.py): the
+# new version is warmed before the swap and the old one purged after it.
+# With --live the KPI cards are updated in place over server-sent events
+# (see kpi_stream.py).
+#
+# Usage (from the dashboard folder):
+#   python scripts/dash_viz.py --port 8050 --cache-size 1024 --refresh 2
+#   python scripts/dash_viz.py --workers 4 --host 0.0.0.0   # forked workers, see serve.py
+#   python scripts/dash_viz.py --live --kpi-interval 1
+
+import argparse
+import logging
+from threading import Lock
+
+from cachetools import LRUCache, cached
+from cachetools.keys import hashkey
+from dash import Dash, html, dcc, Input, Output
 import plotly.graph_objects as go
-import numpy as np
 
-app = Dash(__name__)
-app.title = "Finmark Style SaaS Dashboard"
+from serve import serve
+from data_refresh import SnapshotStore, purge_version, REFRESH_INTERVAL
+from data_context import SaasDataContext, data_version
+from kpi_stream import KpiBroadcaster, register_kpi_stream, card_id, kpi_stream_js, KPI_INTERVAL
+
+CACHE_SIZE = 1024
+
+FONT_FAMILY = "Segoe UI, Arial, sans-serif"
+TITLE_FONT = dict(family=FONT_FAMILY, size=18, color="#333333")
+COLOR_PALETTE = {
+    'Upgrade': '#5B8FF9',
+    'New': '#5AD8A6',
+    'Reactivation': '#9BE3C6',
+    'Downgrade': '#F08BB4',
+    'Churn': '#F6BD16',
+    'NetGrowth': '#7262FD',
+}
+MOVEMENTS = ['Upgrade', 'New', 'Reactivation', 'Downgrade', 'Churn']
+EXPENSE_CATEGORIES = ['R&D', 'Marketing', 'Ops']
+ARR_METRICS = {
+    "movements": "ARR movements",
+    "net": "Net growth",
+    "retention": "NRR / GRR",
+}
+
+
+def titled(fig, title, height=300):
+    fig.update_layout(title=dict(text=f"<b>{title}</b>", x=0.5, xanchor="center", font=TITLE_FONT),
+                      font=dict(family=FONT_FAMILY), height=height,
+                      plot_bgcolor="white", paper_bgcolor="white")
+    return fig
+
+
+def empty_figure(message):
+    fig = go.Figure()
+    fig.add_annotation(text=message, showarrow=False, font=dict(size=16, color="#999999"))
+    fig.update_layout(xaxis=dict(visible=False), yaxis=dict(visible=False),
+                      plot_bgcolor="white", paper_bgcolor="white")
+    return fig
+
 
-# --- Metric Cards ---
-def generate_metric_card(title, value, delta="+4.2%", delta_color="green"):
+# --- Figure builders: (data, *arguments) -> figure ---
+def metric_card(data, title):
+    value = dict(data.metric_values()).get(title, 0)
     return go.Figure(go.Indicator(
         mode="number+delta",
-        value=float(value.strip('$').replace(',', '')),
+        value=float(value),
         number={'prefix': '$', 'font': {'size': 24}},
         delta={'position': "right", 'reference': 0, 'valueformat': '.1f',
-               'increasing': {'color': delta_color}, 'decreasing': {'color': 'red'}},
+               'increasing': {'color': 'green'}, 'decreasing': {'color': 'red'}},
         title={"text": f"<b>{title}</b>"}
     )).update_layout(height=120, margin=dict(t=10, b=10, l=10, r=10))
 
-# --- ARR Changes (Stacked Bar) ---
-def stacked_bar_chart():
-    months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun']
-    upgrade = np.random.randint(5, 10, size=6)
-    downgrade = np.random.randint(1, 3, size=6)
-    churn = np.random.randint(2, 5, size=6)
-    new = np.random.randint(3, 6, size=6)
 
+def arr_chart(data, month_range, metric):
+    df = data.month_slice("arr", month_range)
+    if df.empty:
+        return empty_figure("No ARR data available")
     fig = go.Figure()
-    fig.add_trace(go.Bar(x=months, y=upgrade, name='Upgrade'))
-    fig.add_trace(go.Bar(x=months, y=new, name='New'))
-    fig.add_trace(go.Bar(x=months, y=downgrade, name='Downgrade'))
-    fig.add_trace(go.Bar(x=months, y=churn, name='Churn'))
-    fig.update_layout(barmode='stack', title='<b>ARR Changes</b>', height=300)
-    return fig
+    if metric == "retention":
+        if "NRR (%)" not in df:
+            return empty_figure("No NRR/GRR data available (run arr_engine.py)")
+        for col in ["NRR (%)", "GRR (%)"]:
+            fig.add_trace(go.Scatter(x=df['Month'], y=df[col], mode='lines+markers', name=col))
+        fig.update_layout(yaxis=dict(title='Retention (%)', ticksuffix='%'))
+        return titled(fig, "Net and Gross Revenue Retention")
+    if metric == "net":
+        fig.add_trace(go.Bar(x=df['Month'], y=df['NetGrowth'], name='NetGrowth',
+                             marker_color=COLOR_PALETTE['NetGrowth']))
+        fig.update_layout(yaxis=dict(title='Net Growth', tickprefix='$'))
+        return titled(fig, "ARR Net Growth")
+    for col in [c for c in MOVEMENTS if c in df]:
+        fig.add_trace(go.Bar(x=df['Month'], y=df[col], name=col, marker_color=COLOR_PALETTE[col]))
+    fig.update_layout(barmode='stack', yaxis=dict(title='ARR ($)', tickprefix='$'))
+    return titled(fig, "ARR Changes")
 
-# --- Employee Pie Chart ---
-def employee_pie_chart():
-    labels = ['Engineering', 'Sales', 'HR', 'Marketing', 'Support']
-    values = [34, 10, 4, 6, 8]
-    fig = go.Figure(data=[go.Pie(labels=labels, values=values, hole=.4)])
-    fig.update_layout(title="<b>Employees by Department</b>", height=300)
-    return fig
 
-# --- Expenses Line Chart ---
-def expenses_line_chart():
-    months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun']
-    categories = ['R&D', 'Marketing', 'Ops']
+def expenses_chart(data, month_range):
+    df = data.month_slice("expenses", month_range)
+    if df.empty:
+        return empty_figure("No expense data available")
     fig = go.Figure()
-    for c in categories:
-        fig.add_trace(go.Scatter(x=months, y=np.random.uniform(1000, 6000, size=6),
-                                 mode='lines+markers', name=c))
-    fig.update_layout(title="<b>Expenses</b>", height=300)
-    return fig
+    for col in [c for c in EXPENSE_CATEGORIES if c in df]:
+        fig.add_trace(go.Scatter(x=df['Month'], y=df[col], mode='lines+markers', name=col))
+    fig.update_layout(yaxis=dict(title='Exp ($)', tickprefix='$'))
+    return titled(fig, "Expenses")
 
-# --- Cohort Heatmap ---
-def cohort_heatmap():
-    months = ['Month 1', 'Month 2', 'Month 3', 'Month 4', 'Month 5', 'Month 6']
-    cohorts = ['Nov 21', 'Dec 21', 'Jan 22', 'Feb 22', 'Mar 22', 'Apr 22']
-    z = np.random.choice([100, 97, 91, 86, 88, 84], size=(6, 6))
 
+def cohort_heatmap(data):
+    df = data.frames["cohort"]
+    if df.empty:
+        return empty_figure("No cohort data available")
     fig = go.Figure(data=go.Heatmap(
-        z=z,
-        x=months,
-        y=cohorts,
+        z=df.iloc[:, 1:].values,
+        x=list(df.columns[1:]),
+        y=df['Cohort'],
         colorscale='Blues',
-        zmin=80,
+        zmin=50,
         zmax=100,
-        showscale=True,
-        colorbar=dict(title="Retention")
+        colorbar=dict(title="Retention %")
     ))
-    fig.update_layout(title="<b>Cohort Analysis</b>", height=300)
-    return fig
+    return titled(fig, "Cohort Analysis")
+
+
+def employee_pie_chart(data):
+    df = data.frames["employees"]
+    if df.empty:
+        return empty_figure("No employee data available")
+    fig = go.Figure(data=[go.Pie(labels=df['Department'], values=df['Count'], hole=.4)])
+    return titled(fig, "Employees by Department")
+
+
+def month_ranges(n_months):
+    return [(first, last) for first in range(n_months) for last in range(first, n_months)]
+
+
+def create_app(data_dir="data", cache_size=CACHE_SIZE, refresh_interval=REFRESH_INTERVAL,
+               live=False, kpi_interval=KPI_INTERVAL):
+    cache = LRUCache(maxsize=cache_size)
+    lock = Lock()
+
+    def memoized(build):
+        # The context is not part of the key: the data version identifies it.
+        # Plain dicts skip re-validating the figure on every cache hit.
+        @cached(cache, key=lambda data, version, *args: hashkey(build.__name__, version, *args), lock=lock)
+        def figure(data, version, *args):
+            return build(data, *args).to_plotly_json()
+        return figure
+
+    card_figure = memoized(metric_card)
+    arr_figure = memoized(arr_chart)
+    expenses_figure = memoized(expenses_chart)
+    cohort_figure = memoized(cohort_heatmap)
+    employee_figure = memoized(employee_pie_chart)
+
+    def warm(data, version):
+        # Every view the controls can ask for, or just the full range when they do not all fit
+        ranges = month_ranges(len(data.months))
+        if len(ranges) * (len(ARR_METRICS) + 1) + len(data.metric_values()) + 2 > cache.maxsize:
+            ranges = [(0, len(data.months) - 1)] if data.months else []
+        for month_range in ranges:
+            for metric in ARR_METRICS:
+                arr_figure(data, version, month_range, metric)
+            expenses_figure(data, version, month_range)
+        for title, _ in data.metric_values():
+            card_figure(data, version, title)
+        cohort_figure(data, version)
+        employee_figure(data, version)
+        n_figures = len(ranges) * (len(ARR_METRICS) + 1) + len(data.metric_values()) + 2
+        logging.info(f"Cached {n_figures} figures for data version {version}")
+
+    store = SnapshotStore(lambda: SaasDataContext.load(data_dir), lambda: data_version(data_dir),
+                          refresh_interval, prepare=warm,
+                          on_swap=lambda old, new: purge_version(cache, lock, old))
+    warm(*store.current())
+
+    app = Dash(__name__)
+    app.title = "SaaS Growth, Expense & Retention Dashboard"
+
+    def serve_layout():
+        # Built per page load so a swapped-in dataset shows up without a restart
+        data, version = store.current()
+        last = max(len(data.months) - 1, 0)
+        return html.Div(style={'fontFamily': FONT_FAMILY, 'padding': '20px', 'backgroundColor': '#f5f7fa'}, children=[
+            html.H1("SaaS Growth, Expense & Retention Dashboard", style={'textAlign': 'center'}),
+
+            html.Div(style={'display': 'flex', 'gap': '20px', 'justifyContent': 'center'}, children=[
+                dcc.Graph(id=card_id(title), figure=card_figure(data, version, title), config={'displayModeBar': False})
+                for title, _ in data.metric_values()
+            ]),
+
+            html.Div(style={'display': 'flex', 'gap': '30px', 'alignItems': 'center', 'marginTop': '30px'}, children=[
+                html.Div(style={'flex': '1'}, children=[
+                    html.Label("Months:", htmlFor="monthRange"),
+                    dcc.RangeSlider(id="monthRange", min=0, max=last, step=1, value=[0, last],
+                                    marks={i: month for i, month in enumerate(data.months)}),
+                ]),
+                html.Div(style={'width': '220px'}, children=[
+                    html.Label("ARR metric:", htmlFor="arrMetric"),
+                    dcc.Dropdown(id="arrMetric", value="movements", clearable=False,
+                                 options=[{'label': label, 'value': value} for value, label in ARR_METRICS.items()]),
+                ]),
+            ]),
+
+            html.Div(style={'display': 'grid', 'gridTemplateColumns': '1fr 1fr', 'gap': '20px', 'marginTop': '30px'}, children=[
+                dcc.Graph(id="chart-arr"),
+                dcc.Graph(id="chart-cohort", figure=cohort_figure(data, version)),
+                dcc.Graph(id="chart-employees", figure=employee_figure(data, version)),
+                dcc.Graph(id="chart-expenses"),
+            ]),
+        ])
+
+    app.layout = serve_layout
+
+    @app.callback(Output("chart-arr", "figure"), Input("monthRange", "value"), Input("arrMetric", "value"))
+    def update_arr(month_range, metric):
+        data, version = store.current()
+        return arr_figure(data, version, tuple(month_range) if month_range else None, metric)
+
+    @app.callback(Output("chart-expenses", "figure"), Input("monthRange", "value"))
+    def update_expenses(month_range):
+        data, version = store.current()
+        return expenses_figure(data, version, tuple(month_range) if month_range else None)
+
+    # One producer per process reads the current snapshot; every open page shares its events
+    app.kpis = None
+    if live:
+        app.kpis = KpiBroadcaster(lambda: dict(store.current()[0].metric_values()), kpi_interval)
+        register_kpi_stream(app, app.kpis)
+        app.index_string = app.index_string.replace(
+            "{%renderer%}", "{%renderer%}\n        <script>" + kpi_stream_js + "</script>")
+
+    app.figure_cache = cache
+    app.store = store
+    return app
+
+
+def start_kpis(app):
+    # KPI producer thread, started in each serving process
+    if app.kpis is not None:
+        app.kpis.start()
 
-# --- Layout ---
-app.layout = html.Div(style={'fontFamily': 'Segoe UI, Arial', 'padding': '20px', 'backgroundColor': '#f5f7fa'}, children=[
-    html.H1("SaaS Financial Dashboard", style={'textAlign': 'center'}),
-
-    html.Div(style={'display': 'flex', 'gap': '20px', 'justifyContent': 'center'}, children=[
-        dcc.Graph(figure=generate_metric_card("ARR", "$42964810"), config={'displayModeBar': False}),
-        dcc.Graph(figure=generate_metric_card("Bookings", "$2019600"), config={'displayModeBar': False}),
-        dcc.Graph(figure=generate_metric_card("Cash Balance", "$15150500"), config={'displayModeBar': False}),
-        dcc.Graph(figure=generate_metric_card("Burn Rate", "$600000"), config={'displayModeBar': False}),
-    ]),
-
-    html.Div(style={'display': 'grid', 'gridTemplateColumns': '1fr 1fr', 'gap': '20px', 'marginTop': '30px'}, children=[
-        dcc.Graph(figure=stacked_bar_chart()),
-        dcc.Graph(figure=cohort_heatmap()),
-        dcc.Graph(figure=employee_pie_chart()),
-        dcc.Graph(figure=expenses_line_chart())
-    ])
-])
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+    parser = argparse.ArgumentParser(description="Serve the SaaS growth dashboard with Dash")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Serve with N forked worker processes instead of the development server")
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE, help="Figures kept in memory")
+    parser.add_argument("--refresh", type=float, default=REFRESH_INTERVAL,
+                        help="Seconds between checks of the data folder for new CSVs (0 to disable)")
+    parser.add_argument("--live", action="store_true", help="Push KPI card updates over server-sent events")
+    parser.add_argument("--kpi-interval", type=float, default=KPI_INTERVAL, help="Seconds between KPI checks")
+    parser.add_argument("--debug", action="store_true")
+    args = parser.parse_args()
+
+    app = create_app(args.data_dir, args.cache_size, args.refresh, args.live, args.kpi_interval)
+    if args.workers > 0:
+        # The parent polls for new data and re-forks the workers onto it
+        serve(app, args.host, args.port, args.workers, on_worker_start=lambda: start_kpis(app),
+              refresh=app.store.refresh, refresh_interval=args.refresh)
+    else:
+        app.store.start()
+        start_kpis(app)
+        app.run(debug=args.debug, host=args.host, port=args.port)
@@ -0,0 +1,88 @@
+# scripts/data_context.py
+#
+# Loads the SaaS dashboard CSVs once for the Dash app. The month axis is the
+# ARR Changes file's month order (Jan-Jun from data_gen.py, chronological from
+# arr_engine.py); the month-range filter picks positions on it. Each monthly
+# frame is then sliced on its own month labels, both sides parsed to calendar
+# months: by date when both labels carry a year ("Jan 22"), else by month of
+# year, so "Jan" expense rows still match a "Jan 22"-"Mar 22" ARR range.
+
+import os
+import logging
+import pandas as pd
+
+DATA_FILES = {
+    "metrics": "metrics_summary.csv",
+    "arr": "arr_changes.csv",
+    "employees": "employees_by_dept.csv",
+    "expenses": "expenses.csv",
+    "cohort": "cohort_retention.csv",
+}
+# Month labels written by data_gen.py ("Jan") and arr_engine.py ("Jan 22")
+MONTH_FORMATS = {"%b %y": True, "%b": False}
+
+
+# Helper function for loading CSV files safely
+def load_data(path):
+    try:
+        df = pd.read_csv(path)
+        logging.info(f"Successfully loaded {path}")
+        return df
+    except Exception as e:
+        logging.error(f"Failed to load {path}: {e}")
+        return pd.DataFrame()
+
+
+def parse_months(labels):
+    # Month labels -> (first-of-month dates, whether the labels carry a year), or (None, False)
+    labels = pd.Series(labels, dtype=str)
+    for fmt, has_year in MONTH_FORMATS.items():
+        dates = pd.to_datetime(labels, format=fmt, errors="coerce")
+        if dates.notna().all():
+            return dates, has_year
+    return None, False
+
+
+def data_version(data_dir="data"):
+    # Changes whenever any dashboard CSV is rewritten; keys the cached figures
+    stamps = []
+    for fname in DATA_FILES.values():
+        try:
+            stat = os.stat(os.path.join(data_dir, fname))
+            stamps.append(f"{stat.st_size}-{stat.st_mtime_ns}")
+        except OSError:
+            stamps.append("missing")
+    return "/".join(stamps)
+
+
+class SaasDataContext:
+    def __init__(self, frames):
+        self.frames = frames
+        arr = frames["arr"]
+        self.months = list(pd.unique(arr["Month"])) if "Month" in arr else []
+
+    @classmethod
+    def load(cls, data_dir="data"):
+        return cls({name: load_data(os.path.join(data_dir, fname)) for name, fname in DATA_FILES.items()})
+
+    def month_slice(self, name, month_range):
+        # Rows of a monthly frame within (first, last) positions on the month axis
+        df = self.frames[name]
+        if df.empty or month_range is None:
+            return df
+        first, last = month_range
+        selected = self.months[first:last + 1]
+        axis, axis_has_year = parse_months(selected)
+        dates, has_year = parse_months(df["Month"])
+        if axis is None or dates is None:
+            # Unknown label format: only identical labels can be matched
+            return df[df["Month"].isin(selected)]
+        if has_year and axis_has_year:
+            keep = dates.between(axis.min(), axis.max())
+        else:
+            keep = dates.dt.month.isin(axis.dt.month)
+        return df[keep.to_numpy()]
+
+    def metric_values(self):
+        df = self.frames["metrics"]
+        return list(zip(df["Metric"], df["Value"])) if not df.empty else []
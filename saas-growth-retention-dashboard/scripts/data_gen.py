@@ -1,7 +1,15 @@
 import os
+import argparse
 import numpy as np
 import pandas as pd
 
+parser = argparse.ArgumentParser(description="Generate synthetic SaaS growth data")
+parser.add_argument("--events", type=int, default=0, metavar="N",
+                    help="Also write data/subscription_events.csv with N customers for cohort_engine.py")
+parser.add_argument("--ledger", type=int, default=0, metavar="N",
+                    help="Also write data/arr_ledger.csv with N customers for arr_engine.py")
+args = parser.parse_args()
+
 # Set random seed for reproducibility
 np.random.seed(42)
 
@@ -73,4 +81,40 @@ for cohort in cohorts:
 df_cohort = pd.DataFrame(retention_data, columns=['Cohort', 'Month 1', 'Month 2', 'Month 3', 'Month 4', 'Month 5', 'Month 6'])
 df_cohort.to_csv("data/cohort_retention.csv", index=False)
 
+# --- Subscription Events (optional input for cohort_engine.py) ---
+# One row per customer and month active; each customer churns after a geometric lifetime
+if args.events:
+    signup = np.random.randint(len(cohorts), size=args.events)
+    churn = np.random.uniform(0.02, 0.12, size=args.events)
+    lifetime = np.minimum(np.random.geometric(churn), 2 * len(cohorts) - 1 - signup)
+    customer = np.repeat(np.arange(args.events), lifetime)
+    active = signup[customer] + np.arange(lifetime.sum()) - np.repeat(np.cumsum(lifetime) - lifetime, lifetime)
+    periods = pd.period_range("2021-11", periods=2 * len(cohorts), freq="M").strftime("%Y-%m")
+    df_events = pd.DataFrame({
+        "Customer ID": customer,
+        "Signup Month": periods[signup[customer]],
+        "Active Month": periods[active],
+    })
+    df_events.to_csv("data/subscription_events.csv", index=False)
+
+# --- ARR Ledger (optional input for arr_engine.py) ---
+# Monthly ARR per paying customer: the month before Jan is the opening balance, then
+# customers sign up, expand, contract, churn and sometimes come back
+if args.ledger:
+    ledger_months = pd.period_range("2021-12", periods=len(months) + 1, freq="M").strftime("%Y-%m")
+    signup = np.where(np.random.rand(args.ledger) < 0.7, 0, np.random.randint(1, len(ledger_months), size=args.ledger))
+    arr = np.random.lognormal(np.log(12_000), 0.8, size=args.ledger)
+    active = np.zeros(args.ledger, dtype=bool)
+    ledger = np.zeros((args.ledger, len(ledger_months)))
+    for m in range(len(ledger_months)):
+        draw = np.random.rand(args.ledger)
+        active = np.where(active, draw >= 0.02, (signup == m) | ((signup < m) & (draw < 0.05)))
+        change = np.random.rand(args.ledger)
+        arr *= np.where(change < 0.05, np.random.uniform(1.1, 1.5, size=args.ledger),
+                        np.where(change > 0.97, np.random.uniform(0.6, 0.9, size=args.ledger), 1.0))
+        ledger[:, m] = np.where(active, arr.round(2), 0)
+    customer, month = np.nonzero(ledger)
+    df_ledger = pd.DataFrame({"Customer ID": customer, "Month": ledger_months[month], "ARR": ledger[customer, month]})
+    df_ledger.to_csv("data/arr_ledger.csv", index=False)
+
 print("All synthetic CSVs generated in /data/")
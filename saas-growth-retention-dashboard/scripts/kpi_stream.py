@@ -0,0 +1,125 @@
+# scripts/kpi_stream.py
+#
+# Live KPI cards for dash_viz.py --live: /kpi-stream pushes the ARR,
+# Bookings, Cash Balance and Burn Rate values over server-sent events, and the
+# page updates the cards' Indicator traces in place.
+#
+# One producer thread per serving process polls the KPI source (the current
+# data snapshot) and, when a value changes, encodes a single event holding all
+# values. Every connection then only waits on a shared condition and writes
+# those same bytes, so an extra browser costs an idle thread and a socket
+# write, not a query or a JSON encode. Events carry the full state, so a
+# client that falls behind simply gets the latest values. In the browser each
+# changed card gets one Plotly.restyle of its value, with the previous value
+# as the delta reference; unchanged cards are not touched.
+
+import json
+import time
+import logging
+from threading import Thread, Condition
+
+from flask import Response
+
+KPI_INTERVAL = 1.0
+# Comment lines keep idle connections open through proxies
+KEEPALIVE_SECONDS = 15
+
+
+def card_id(title):
+    # Element id of a metric's card; events are keyed by it
+    return "card-" + "".join(c if c.isalnum() else "-" for c in title)
+
+
+class KpiBroadcaster:
+    def __init__(self, source, interval=KPI_INTERVAL):
+        # source() -> {metric: value}
+        self.source = source
+        self.interval = interval
+        self.condition = Condition()
+        self.event_id = 0
+        self.values = None
+        self.event = None
+        self.thread = None
+
+    def publish(self, values):
+        with self.condition:
+            self.event_id += 1
+            self.values = values
+            payload = json.dumps({card_id(title): value for title, value in values.items()})
+            self.event = f"id: {self.event_id}\ndata: {payload}\n\n".encode()
+            self.condition.notify_all()
+
+    def poll(self):
+        values = {title: float(value) for title, value in self.source().items()}
+        if values != self.values:
+            self.publish(values)
+
+    def run(self):
+        while True:
+            try:
+                self.poll()
+            except Exception:
+                logging.exception("KPI update failed")
+            time.sleep(self.interval)
+
+    def start(self):
+        # Call in every serving process: threads do not survive fork
+        if self.thread is None or not self.thread.is_alive():
+            self.poll()
+            self.thread = Thread(target=self.run, name="kpi-producer", daemon=True)
+            self.thread.start()
+        return self
+
+    def events(self):
+        # Byte stream for one client: the latest event now, then each newer one
+        seen = 0
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.event_id != seen, timeout=KEEPALIVE_SECONDS)
+                event, event_id = self.event, self.event_id
+            if event_id == seen:
+                yield b": keepalive\n\n"
+                continue
+            seen = event_id
+            yield event
+
+
+def register_kpi_stream(app, broadcaster):
+    @app.server.route("/kpi-stream")
+    def kpi_stream():
+        return Response(broadcaster.events(), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+kpi_stream_js = """
+(function () {
+    var shown = {};
+    function apply(values) {
+        if (!window.Plotly) return;
+        Object.keys(values).forEach(function (id) {
+            var value = values[id];
+            if (shown[id] === value) return;
+            var gd = document.querySelector('#' + id + ' .js-plotly-plot');
+            if (!gd || !gd.data) return;
+            var previous = id in shown ? shown[id] : gd.data[0].value;
+            if (previous !== value) {
+                Plotly.restyle(gd, {value: [value], 'delta.reference': [previous]}, [0]);
+            }
+            shown[id] = value;
+        });
+    }
+    var latest = {};
+    var source = new EventSource('/kpi-stream');
+    source.onmessage = function (event) {
+        latest = JSON.parse(event.data);
+        apply(latest);
+    };
+    // Cards render after the first event on a fresh page load
+    var retry = setInterval(function () {
+        apply(latest);
+        if (Object.keys(latest).length && Object.keys(latest).every(function (id) { return id in shown; })) {
+            clearInterval(retry);
+        }
+    }, 500);
+})();
+"""
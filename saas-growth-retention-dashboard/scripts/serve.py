@@ -0,0 +1 @@
+../../dash_serving/serve.py
\ No newline at end of file
@@ -16,6 +16,7 @@ df_cohort = pd.read_csv("data/cohort_retention.csv")
 COLOR_PALETTE = {
     'Upgrade': '#5B8FF9',
     'New': '#5AD8A6',
+    'Reactivation': '#9BE3C6',
     'Downgrade': '#F08BB4',
     'Churn': '#F6BD16',
     'NetGrowth': '#7262FD',
@@ -56,9 +57,12 @@ fig_cards = [to_html(generate_metric_card(row['Metric'], row['Value']), full_htm
 fig_arr = go.Figure()
 
 months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun']
-df_arr['Month'] = pd.Categorical(df_arr['Month'], categories=months, ordered=True)
-df_arr = df_arr.sort_values('Month')
-for col in ['Upgrade', 'New', 'Downgrade', 'Churn']:
+# arr_engine.py output is already in month order and may span other months
+if df_arr['Month'].isin(months).all():
+    df_arr['Month'] = pd.Categorical(df_arr['Month'], categories=months, ordered=True)
+    df_arr = df_arr.sort_values('Month')
+# Reactivation is only in arr_engine.py output
+for col in [c for c in ['Upgrade', 'New', 'Reactivation', 'Downgrade', 'Churn'] if c in df_arr]:
     fig_arr.add_trace(go.Bar(
         name=col,
         x=df_arr['Month'],
@@ -0,0 +1,63 @@
+# tests/test_arr_engine.py
+
+import numpy as np
+import pandas as pd
+
+from arr_engine import MOVEMENTS, arr_frame, arr_movements, customer_months
+
+
+def movements(ledger):
+    return arr_frame(*arr_movements(*customer_months(ledger)))
+
+
+def dense_movements(ledger):
+    # Reference: customer x month ARR matrix, each month compared with the one before
+    period = pd.PeriodIndex(ledger["Month"], freq="M")
+    matrix = ledger.assign(Period=period).pivot_table(index="Customer ID", columns="Period", values="ARR",
+                                                      aggfunc="sum", fill_value=0)
+    matrix = matrix.reindex(columns=pd.period_range(period.min(), period.max(), freq="M"), fill_value=0).to_numpy()
+    matrix = np.where(matrix > 0, matrix, 0)
+    prev, cur = matrix[:, :-1], matrix[:, 1:]
+    seen = np.maximum.accumulate(matrix > 0, axis=1)[:, :-1]
+    return pd.DataFrame({
+        "Upgrade": np.where((prev > 0) & (cur > prev), cur - prev, 0).sum(axis=0),
+        "New": np.where((cur > 0) & ~seen, cur, 0).sum(axis=0),
+        "Reactivation": np.where((cur > 0) & (prev == 0) & seen, cur, 0).sum(axis=0),
+        "Downgrade": np.where((prev > 0) & (cur > 0) & (cur < prev), prev - cur, 0).sum(axis=0),
+        "Churn": np.where((prev > 0) & (cur == 0), prev, 0).sum(axis=0),
+        "Start": prev.sum(axis=0),
+    })
+
+
+def test_hand_made_ledger():
+    ledger = pd.DataFrame({
+        "Customer ID": ["a", "a", "a", "b", "b", "b", "c"],
+        "Month": ["2023-01", "2023-02", "2023-03", "2023-01", "2023-03", "2023-04", "2023-04"],
+        "ARR": [100, 150, 120, 50, 60, 60, 30],
+    })
+    df = movements(ledger)
+    assert df["Month"].tolist() == ["Feb", "Mar", "Apr"]
+    assert df["Upgrade"].tolist() == [50, 0, 0]
+    assert df["Downgrade"].tolist() == [0, 30, 0]
+    assert df["Churn"].tolist() == [50, 0, 120]
+    assert df["Reactivation"].tolist() == [0, 60, 0]
+    assert df["New"].tolist() == [0, 0, 30]
+    # February: start 150, +50 upgrade, -50 churn
+    assert df["NRR (%)"].iloc[0] == 100.0 and df["GRR (%)"].iloc[0] == 66.67
+
+
+def test_random_ledger_matches_month_by_month_comparison():
+    rng = np.random.default_rng(0)
+    n = 30_000
+    ledger = pd.DataFrame({
+        "Customer ID": rng.integers(0, 800, n),
+        "Month": (pd.Period("2022-06", freq="M") + rng.integers(0, 14, n)).astype(str),
+        "ARR": rng.integers(0, 5, n) * 100,
+    })
+    df = movements(ledger)
+    expected = dense_movements(ledger)
+    for name in MOVEMENTS:
+        np.testing.assert_array_equal(df[name].to_numpy(), expected[name].to_numpy(), err_msg=name)
+    nrr = (expected["Start"] + expected["Upgrade"] - expected["Downgrade"] - expected["Churn"]) / expected["Start"] * 100
+    np.testing.assert_allclose(df["NRR (%)"], nrr.round(2))
+    assert df["Month"].iloc[0] == "Jul 22"
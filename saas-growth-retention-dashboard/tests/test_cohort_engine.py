@@ -0,0 +1,45 @@
+# tests/test_cohort_engine.py
+
+import numpy as np
+import pandas as pd
+
+from cohort_engine import cohort_frame, cohort_retention
+
+
+def events(n_customers=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    signup = rng.integers(0, 8, n_customers)
+    rows = []
+    for customer, start in enumerate(signup):
+        months = start + np.flatnonzero(rng.random(8) < 0.6)
+        # Several events in one month count once
+        for month in np.concatenate([[start], months, months[:1]]):
+            rows.append((customer, start, month))
+    df = pd.DataFrame(rows, columns=["Customer ID", "Signup", "Active"])
+    label = lambda m: (pd.Period("2022-01", freq="M") + m).strftime("%Y-%m")
+    return df.assign(**{"Signup Month": df["Signup"].map(label), "Active Month": df["Active"].map(label)})
+
+
+def test_matrix_matches_distinct_customer_counts():
+    df = events()
+    cohorts, retention = cohort_retention(df, max_months=6)
+    offset = df["Active"] - df["Signup"]
+    sizes = df.groupby("Signup")["Customer ID"].nunique()
+    active = df[offset < 6].assign(Offset=offset).groupby(["Signup", "Offset"])["Customer ID"].nunique()
+    expected = (active.unstack().div(sizes, axis=0) * 100).reindex(columns=range(6)).fillna(0).to_numpy()
+    # Offsets past the last observed month (signup 7 + offset 1 > month 7 + 7) are empty, not 0%
+    last = df["Active"].max()
+    reached = np.arange(8)[:, None] + np.arange(6) <= last
+    np.testing.assert_allclose(retention[reached], expected[reached])
+    assert np.isnan(retention[~reached]).all()
+    assert (retention[:, 0] == 100).all()
+
+
+def test_latest_cohorts_and_frame_layout():
+    df = events()
+    cohorts, retention = cohort_retention(df, max_months=4, n_cohorts=3)
+    full_cohorts, full = cohort_retention(df, max_months=4)
+    np.testing.assert_array_equal(retention, full[-3:])
+    frame = cohort_frame(cohorts, retention)
+    assert list(frame.columns) == ["Cohort", "Month 1", "Month 2", "Month 3", "Month 4"]
+    assert frame["Cohort"].tolist() == ["Jun 22", "Jul 22", "Aug 22"]
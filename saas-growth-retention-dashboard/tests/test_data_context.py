@@ -0,0 +1,30 @@
+# tests/test_data_context.py
+
+import pandas as pd
+
+from data_context import SaasDataContext
+
+
+def context(arr_months, expense_months):
+    return SaasDataContext({
+        "arr": pd.DataFrame({"Month": arr_months, "NetGrowth": range(len(arr_months))}),
+        "expenses": pd.DataFrame({"Month": expense_months, "Ops": range(len(expense_months))}),
+    })
+
+
+def test_expenses_without_years_follow_a_yearly_arr_axis():
+    data = context(["Nov 22", "Dec 22", "Jan 23", "Feb 23", "Mar 23"], ["Jan", "Feb", "Mar", "Apr", "Nov", "Dec"])
+    assert data.month_slice("arr", (1, 3))["Month"].tolist() == ["Dec 22", "Jan 23", "Feb 23"]
+    assert data.month_slice("expenses", (1, 3))["Month"].tolist() == ["Jan", "Feb", "Dec"]
+
+
+def test_labels_with_years_are_sliced_by_date():
+    data = context(["Jan 22", "Feb 22", "Mar 22"], ["Dec 21", "Jan 22", "Feb 22", "Jan 23"])
+    assert data.month_slice("expenses", (0, 1))["Month"].tolist() == ["Jan 22", "Feb 22"]
+
+
+def test_data_gen_labels_match_one_to_one():
+    months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun"]
+    data = context(months, months)
+    assert data.month_slice("expenses", (2, 4))["Month"].tolist() == ["Mar", "Apr", "May"]
+    assert data.month_slice("expenses", None)["Month"].tolist() == months